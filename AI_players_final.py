@@ -1,6 +1,8 @@
 """
 CSC111 Winter 2021 Final Project: Building A Checkers AI Player
-This Python module contains the subclasses for the AI players and the random player.
+This Python module contains the subclasses for the AI players and the random player, the
+alpha-beta and Monte-Carlo tree search players, and print_ai_statistics, which plays them
+against each other in a tournament.
 ======================================
 This file is provided solely for the use of the CSC111 Teaching team and for the
 use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
@@ -9,10 +11,21 @@ permission of the aforementioned group.
 This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
 """
 from __future__ import annotations
+import os
 import random
-from typing import Optional
-import checkers_game_tree_v2 as gametree
-import checkers_game_with_pygame_v3 as checkers_game
+from typing import Optional, Union
+import checkers_game_tree_final as gametree
+import checkers_game_with_pygame_final as checkers_game
+from checkers_tournament import Tournament
+from checkers_search import AlphaBetaSearch, SearchResult, MAX_DEPTH
+from checkers_transposition import TABLE_MB
+from checkers_tablebase import Tablebase
+from checkers_mcts import MonteCarloTreeSearch, RootParallelMCTS, MCTSResult, EXPLORATION
+
+# The budgets of the search players in print_ai_statistics. They are counts rather than times,
+# so every game of a tournament is played the same way however busy the computer is.
+TOURNAMENT_SEARCH_NODES = 1000
+TOURNAMENT_MCTS_ITERATIONS = 100
 
 
 class AggressivePlayer(checkers_game.Player):
@@ -40,7 +53,8 @@ class AggressivePlayer(checkers_game.Player):
         """
         # Check if the game tree is empty, if it is, pick a random move from get_valid_moves
         if self._game_tree is None:
-            return helper_random_player(game, previous_move, continuing_from_previous_move)
+            return helper_random_player(game, previous_move, continuing_from_previous_move,
+                                        self.rng)
 
         # Check if there is a previous move, if there is not, then pick a move from the subtrees
         # because it would be the root of the tree
@@ -66,7 +80,8 @@ class AggressivePlayer(checkers_game.Player):
                 return subtree.move
             else:   # there is no subtree that has previous_move
                 self._game_tree = None
-                return helper_random_player(game, previous_move, continuing_from_previous_move)
+                return helper_random_player(game, previous_move, continuing_from_previous_move,
+                                            self.rng)
 
     def helper_find_best_subtree(self, is_white_move: bool) -> gametree.CheckersGameTree:
         """
@@ -112,7 +127,8 @@ class DefensivePlayer(checkers_game.Player):
         """
         # Check if the game tree is empty, if it is, pick a random move from get_valid_moves
         if self._game_tree is None:
-            return helper_random_player(game, previous_move, continuing_from_previous_move)
+            return helper_random_player(game, previous_move, continuing_from_previous_move,
+                                        self.rng)
 
         # Check if there is a previous move, if there is not, then pick a move from the subtrees
         # because it would be the root of the tree
@@ -136,7 +152,8 @@ class DefensivePlayer(checkers_game.Player):
                 return subtree.move
             else:  # there is no subtree that has previous_move
                 self._game_tree = None
-                return helper_random_player(game, previous_move, continuing_from_previous_move)
+                return helper_random_player(game, previous_move, continuing_from_previous_move,
+                                            self.rng)
 
     def helper_find_best_subtree(self, is_white_move: bool) -> gametree.CheckersGameTree:
         """
@@ -167,55 +184,171 @@ class RandomPlayer(checkers_game.Player):
         """
         #   Check whether if the player can can capture again
         if continuing_from_previous_move:
-            if game.is_white_move:  # If it is the white's turn
-                #   Find the piece that captured
-                piece = game.white_pieces[previous_move[2]]
-
-            else:  # It is black's turn
-                #   Find the piece that captured
-                piece = game.black_pieces[previous_move[2]]
-            #   Find possible moves that the piece can make
-            moves = game.get_valid_move_piece(piece)
+            #   Find possible moves that the piece that captured can make
+            moves = game.get_turn_moves(previous_move, continuing_from_previous_move)
             #   Pick a random move from the valid moves
-            move = random.choice(moves[0])
+            move = self.rng.choice(moves)
         else:  # Not making double captures
-            possible_moves = game.get_valid_moves()
-            move = random.choice(possible_moves)
+            # Pick a whole turn, so a multi-jump is one choice
+            possible_moves = game.get_compound_moves()
+            move = self.rng.choice(possible_moves)
         return move
 
 
 def helper_random_player(game: checkers_game.Checkers,
                          previous_move: tuple[str, str, str],
-                         continuing_from_previous_move: bool) -> tuple[str, str, str]:
+                         continuing_from_previous_move: bool,
+                         rng: random.Random = random) -> tuple[str, str, str]:
     """
-    Helper function that makes a random move
+    Helper function that makes a random move, chosen with rng
     """
     if continuing_from_previous_move:
-        if game.is_white_move:  # If it is the white's turn
-            #   Find the piece that captured
-            piece = game.white_pieces[previous_move[2]]
-
-        else:  # It is black's turn
-            #   Find the piece that captured
-            piece = game.black_pieces[previous_move[2]]
-        #   Find possible moves that the piece can make
-        moves = game.get_valid_move_piece(piece)
+        #   Find possible moves that the piece that captured can make
+        moves = game.get_turn_moves(previous_move, continuing_from_previous_move)
         #   Pick a random move from the valid moves
-        move = random.choice(moves[0])
+        move = rng.choice(moves)
     else:  # Not making double captures
-        possible_moves = game.get_valid_moves()
-        move = random.choice(possible_moves)
+        # Pick a whole turn, so a multi-jump is one choice
+        possible_moves = game.get_compound_moves()
+        move = rng.choice(possible_moves)
     return move
 
 
+class AlphaBetaPlayer(checkers_game.Player):
+    """
+    A player that searches ahead with an iterative-deepening alpha-beta search (see
+    checkers_search), so it plays well in positions that aren't in any game tree. It makes
+    whole turns at once, and searches for at most time_limit seconds or node_limit positions
+    per turn, whichever runs out first. The search keeps a transposition table of about
+    table_mb megabytes between turns, or none if table_mb is None, and looks positions up in
+    tablebase if it is given (see checkers_tablebase).
+
+    Instance Attributes:
+        - search: The search used to choose each turn.
+        - last_result: The result of the last search, or None before the first turn.
+    """
+    search: AlphaBetaSearch
+    last_result: Optional[SearchResult]
+
+    def __init__(self, time_limit: Optional[float] = 0.1, node_limit: Optional[int] = None,
+                 max_depth: int = MAX_DEPTH, table_mb: Optional[float] = TABLE_MB,
+                 tablebase: Optional[Tablebase] = None) -> None:
+        self.search = AlphaBetaSearch(time_limit, node_limit, max_depth, table_mb, tablebase)
+        self.last_result = None
+
+    def make_move(self, game: checkers_game.Checkers, previous_move: tuple[str, str, str],
+                  continuing_from_previous_move: bool) -> tuple:
+        """
+        Makes the best turn found by the search, as a compound move
+        """
+        self.last_result = self.search.search(game, previous_move, continuing_from_previous_move)
+        return self.last_result.move
+
+
+class MCTSPlayer(checkers_game.Player):
+    """
+    A player that chooses each turn with a Monte-Carlo tree search (see checkers_mcts), which
+    plays many random games from the current position. It makes whole turns at once, and
+    searches for at most time_limit seconds or iteration_limit iterations per turn, whichever
+    runs out first. The search tree is kept between turns: after the opponent's turn, the
+    search carries on from the part of the tree under it.
+
+    If processes is more than 1, that many searches are run at once in worker processes, and
+    their results are added up (see RootParallelMCTS); the budget is then for each worker.
+    The workers keep running between turns, until close is called.
+
+    Instance Attributes:
+        - search: The search used to choose each turn.
+        - last_result: The result of the last search, or None before the first turn.
+    """
+    search: Union[MonteCarloTreeSearch, RootParallelMCTS]
+    last_result: Optional[MCTSResult]
+
+    def __init__(self, time_limit: Optional[float] = 0.1, iteration_limit: Optional[int] = None,
+                 exploration: float = EXPLORATION, processes: int = 1) -> None:
+        if processes > 1:
+            self.search = RootParallelMCTS(processes, time_limit, iteration_limit, exploration)
+        else:
+            self.search = MonteCarloTreeSearch(time_limit, iteration_limit, exploration)
+        self.last_result = None
+
+    def make_move(self, game: checkers_game.Checkers, previous_move: tuple[str, str, str],
+                  continuing_from_previous_move: bool) -> tuple:
+        """
+        Makes the turn that was tried the most by the search, as a compound move
+        """
+        self.last_result = self.search.search(game, previous_move, continuing_from_previous_move,
+                                              self.rng)
+        # The opponent's turn is looked for under this one next time
+        self.search.advance(self.last_result.move)
+        return self.last_result.move
+
+    def close(self) -> None:
+        """
+        Stops the worker processes of the search, if it has any
+        """
+        if isinstance(self.search, RootParallelMCTS):
+            self.search.close()
+
+
+def random_player(_: Optional[gametree.CheckersGameTree]) -> RandomPlayer:
+    """
+    Returns a new random player. It doesn't use the game tree.
+    """
+    return RandomPlayer()
+
+
+def alpha_beta_player(_: Optional[gametree.CheckersGameTree]) -> AlphaBetaPlayer:
+    """
+    Returns a new alpha-beta player that searches TOURNAMENT_SEARCH_NODES positions per turn.
+    It doesn't use the game tree.
+    """
+    return AlphaBetaPlayer(time_limit=None, node_limit=TOURNAMENT_SEARCH_NODES)
+
+
+def mcts_player(_: Optional[gametree.CheckersGameTree]) -> MCTSPlayer:
+    """
+    Returns a new Monte-Carlo tree search player that runs TOURNAMENT_MCTS_ITERATIONS
+    iterations per turn. It doesn't use the game tree.
+    """
+    return MCTSPlayer(time_limit=None, iteration_limit=TOURNAMENT_MCTS_ITERATIONS)
+
+
+# The player types that play in print_ai_statistics, and how to make each one from the game
+# tree (see checkers_tournament.PlayerFactory)
+AI_PLAYER_TYPES = {'Random Player': random_player,
+                   'Aggressive Player': AggressivePlayer,
+                   'Defensive Player': DefensivePlayer,
+                   'Alpha-Beta Player': alpha_beta_player,
+                   'MCTS Player': mcts_player}
+
+
+def print_ai_statistics(game_tree: Optional[gametree.CheckersGameTree],
+                        games_per_pairing: int = 50, processes: Optional[int] = None,
+                        checkpoint_file: Optional[str] = None) -> None:
+    """
+    Plays a round-robin tournament between the AI player types in AI_PLAYER_TYPES, with
+    games_per_pairing games for each pair of players and colours, and prints the standings.
+    The games are played by processes processes (or one per CPU if it is None). If
+    checkpoint_file is given, the tournament is saved to it as it goes and resumed from it.
+    """
+    if processes is None:
+        processes = os.cpu_count() or 1
+    tournament = Tournament(list(AI_PLAYER_TYPES), games_per_pairing)
+    tournament.play(AI_PLAYER_TYPES, game_tree, processes, checkpoint_file)
+    print(tournament.standings())
+
+
 if __name__ == '__main__':
     import doctest
     doctest.testmod()
     import python_ta
     python_ta.check_all(config={
-        'extra-imports': ["__future__", "typing", "random",
-                          "checkers_game_with_pygame_v3", "checkers_game_tree_v2"],
-        'allowed-io': [],
+        'extra-imports': ["__future__", "typing", "random", "os", "checkers_tournament",
+                          "checkers_search", "checkers_transposition", "checkers_mcts",
+                          "checkers_tablebase",
+                          "checkers_game_with_pygame_final", "checkers_game_tree_final"],
+        'allowed-io': ['print_ai_statistics'],
         'max-nested-blocks': 5,
         'max-line-length': 100,
         'disable': ['E1136']
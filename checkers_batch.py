@@ -0,0 +1,300 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains BatchCheckers, which plays many games of checkers at the same time
+using NumPy arrays, for building game trees and collecting statistics from thousands of games.
+
+Every game in the batch is one row of an array, and every move that could ever be made on the
+board is one column of the move tables. Finding the valid moves, making the chosen moves,
+crowning pieces and checking for a winner are then a few array operations per move for the
+whole batch, instead of a Python loop over each game. The rules are the same as in
+Checkers and run_game: captures must be made, a piece that captures keeps moving while it can
+capture again, and the game is a draw after move_limit moves.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Callable, Dict, List, Optional, Tuple
+import numpy as np
+from checkers_game_with_pygame_final import DIMENSION, MOVE_LIMIT
+from checkers_topology import get_topology, NO_SQUARE
+from checkers_moves import get_move_codec, move_start, move_captured, move_end, is_capture
+
+# The values in BatchCheckers.squares. White pieces are positive and black pieces negative.
+EMPTY = 0
+WHITE_MAN = 1
+WHITE_KING = 2
+BLACK_MAN = -1
+BLACK_KING = -2
+
+# The values in BatchCheckers.winner
+ONGOING = 0
+WHITE_WINS = 1
+BLACK_WINS = 2
+DRAW = 3
+WINNER_NAMES = {WHITE_WINS: 'white', BLACK_WINS: 'black', DRAW: 'draw'}
+
+# Chooses one column of the valid move mask for each game (or -1 for the games that are over).
+MoveChooser = Callable[['BatchCheckers', np.ndarray], np.ndarray]
+
+
+class MoveTable:
+    """Every move that could be made on one size of board, as arrays with one column per move.
+
+    Instance Attributes:
+        - codes: The move code of each move (see checkers_moves).
+        - start: The square each move starts on.
+        - over: The square each move jumps over, or the extra empty column of
+          BatchCheckers.squares (num_squares) if the move is not a capture.
+        - end: The square each move ends on.
+        - captures: Whether each move is a capture.
+        - white_forward: Whether an uncrowned white piece can make each move (towards row 1).
+        - black_forward: Whether an uncrowned black piece can make each move.
+        - white_crown: For each square, whether a white piece ending there is crowned.
+        - black_crown: For each square, whether a black piece ending there is crowned.
+        - column_of: The column of each move code.
+    """
+    codes: np.ndarray
+    start: np.ndarray
+    over: np.ndarray
+    end: np.ndarray
+    captures: np.ndarray
+    white_forward: np.ndarray
+    black_forward: np.ndarray
+    white_crown: np.ndarray
+    black_crown: np.ndarray
+    column_of: Dict[int, int]
+
+    def __init__(self, dimension: int) -> None:
+        topology = get_topology(dimension)
+        num_squares = len(topology.positions)
+        codes = sorted(code for code in get_move_codec(dimension).move_of if code >= 0)
+        self.codes = np.array(codes, dtype=np.int64)
+        self.start = np.array([move_start(code) for code in codes], dtype=np.intp)
+        self.over = np.array([move_captured(code) if is_capture(code) else num_squares
+                              for code in codes], dtype=np.intp)
+        self.end = np.array([move_end(code) for code in codes], dtype=np.intp)
+        self.captures = np.array([is_capture(code) for code in codes], dtype=bool)
+        rows = np.array([row for _, row in topology.coords])
+        self.white_forward = rows[self.end] < rows[self.start]
+        self.black_forward = rows[self.end] > rows[self.start]
+        self.white_crown = rows == 0
+        self.black_crown = rows == dimension - 1
+        self.column_of = {code: i for i, code in enumerate(codes)}
+
+
+# The move tables that have been built so far, by board size.
+_MOVE_TABLES: Dict[int, MoveTable] = {}
+
+
+def get_move_table(dimension: int) -> MoveTable:
+    """Return the MoveTable for a board with the given number of rows and columns.
+    Each table is only built the first time it is asked for.
+    """
+    if dimension not in _MOVE_TABLES:
+        _MOVE_TABLES[dimension] = MoveTable(dimension)
+    return _MOVE_TABLES[dimension]
+
+
+class BatchCheckers:
+    """A batch of games of checkers that are all played one move at a time, together.
+
+    Instance Attributes:
+        - dimension: The number of rows (and columns) of each board.
+        - move_limit: The number of moves after which a game is a draw.
+        - table: The moves that can be made on a board of this size.
+        - squares: squares[g, i] is the piece on square i of game g (EMPTY, WHITE_MAN,
+          WHITE_KING, BLACK_MAN or BLACK_KING). There is one extra column at the end that is
+          always EMPTY, which moves that are not captures "jump over".
+        - is_white_move: Whether white is the current player in each game.
+        - continuing: The square of the piece that has to keep capturing in each game, or
+          NO_SQUARE if the current player can move any piece.
+        - move_count: The number of moves made in each game.
+        - winner: ONGOING, WHITE_WINS, BLACK_WINS or DRAW for each game.
+        - history: One (columns, is_white) pair of arrays for each move made with
+          make_moves: the column of the move made in each game (or -1 if none was made), and
+          whether white made it.
+
+    Representation Invariants:
+        - self.squares.shape[1] == len(get_topology(self.dimension).positions) + 1
+        - (self.squares[:, -1] == EMPTY).all()
+    """
+    dimension: int
+    move_limit: int
+    table: MoveTable
+    squares: np.ndarray
+    is_white_move: np.ndarray
+    continuing: np.ndarray
+    move_count: np.ndarray
+    winner: np.ndarray
+    history: List[Tuple[np.ndarray, np.ndarray]]
+
+    def __init__(self, num_games: int, dimension: int = DIMENSION,
+                 move_limit: int = MOVE_LIMIT) -> None:
+        self.dimension = dimension
+        self.move_limit = move_limit
+        self.table = get_move_table(dimension)
+        topology = get_topology(dimension)
+
+        start = np.zeros(len(topology.positions) + 1, dtype=np.int8)
+        start[[topology.index_of[pos] for pos in topology.white_start]] = WHITE_MAN
+        start[[topology.index_of[pos] for pos in topology.black_start]] = BLACK_MAN
+        self.squares = np.tile(start, (num_games, 1))
+
+        self.is_white_move = np.ones(num_games, dtype=bool)
+        self.continuing = np.full(num_games, NO_SQUARE, dtype=np.intp)
+        self.move_count = np.zeros(num_games, dtype=np.int64)
+        self.winner = np.zeros(num_games, dtype=np.int8)
+        self.history = []
+
+    def __len__(self) -> int:
+        return self.squares.shape[0]
+
+    def is_over(self) -> bool:
+        """Return whether every game in the batch has finished."""
+        return bool((self.winner != ONGOING).all())
+
+    def get_valid_moves(self) -> np.ndarray:
+        """Return a boolean array with one row per game and one column per move of
+        self.table, which is True for the valid moves of the current player. The rows of
+        games that are over are all False.
+        """
+        table = self.table
+        squares = self.squares
+        mover = np.where(self.is_white_move, 1, -1)[:, np.newaxis]
+        pieces = squares[:, table.start]
+
+        can_move = (np.sign(pieces) == mover) & (squares[:, table.end] == EMPTY)
+        can_move &= (np.abs(pieces) == 2) | np.where(self.is_white_move[:, np.newaxis],
+                                                     table.white_forward, table.black_forward)
+        captures = can_move & table.captures & (np.sign(squares[:, table.over]) == -mover)
+
+        # A piece in the middle of a multi-jump can only keep capturing.
+        continuing = self.continuing[:, np.newaxis]
+        captures &= (continuing == NO_SQUARE) | (table.start == continuing)
+        steps = can_move & ~table.captures & (continuing == NO_SQUARE)
+
+        must_capture = captures.any(axis=1)[:, np.newaxis]
+        valid = np.where(must_capture, captures, steps)
+        valid &= (self.winner == ONGOING)[:, np.newaxis]
+        return valid
+
+    def update_winners(self, valid: np.ndarray) -> None:
+        """Record the winner of every game that has just finished, like Checkers.get_winner.
+        valid is the result of get_valid_moves for the current positions.
+        """
+        ongoing = self.winner == ONGOING
+        white_left = (self.squares > 0).any(axis=1)
+        black_left = (self.squares < 0).any(axis=1)
+        stuck = (self.move_count == self.move_limit) | ~valid.any(axis=1)
+
+        self.winner[ongoing & ~black_left] = WHITE_WINS
+        self.winner[ongoing & black_left & ~white_left] = BLACK_WINS
+        self.winner[ongoing & black_left & white_left & stuck] = DRAW
+
+    def make_moves(self, columns: np.ndarray) -> None:
+        """Make one move in each game: the move in column columns[g] of self.table for game g,
+        or no move if columns[g] is -1. Each moved piece is crowned if it reached the other
+        side of the board, and the current player changes unless the piece can capture again,
+        just like a turn in run_game.
+
+        Preconditions:
+            - every move made is valid, as given by get_valid_moves
+        """
+        table = self.table
+        self.history.append((columns.copy(), self.is_white_move.copy()))
+        games = np.nonzero(columns >= 0)[0]
+        moves = columns[games]
+        start, end = table.start[moves], table.end[moves]
+
+        pieces = self.squares[games, start]
+        self.squares[games, start] = EMPTY
+        self.squares[games, table.over[moves]] = EMPTY
+        crowned = np.where(pieces > 0, table.white_crown[end], table.black_crown[end])
+        self.squares[games, end] = np.where(crowned, np.sign(pieces) * 2, pieces)
+        self.move_count[games] += 1
+
+        # Check whether the pieces that captured can capture again.
+        self.continuing[games] = np.where(table.captures[moves], end, NO_SQUARE)
+        captured = games[table.captures[moves]]
+        continued = np.zeros(len(self), dtype=bool)
+        if len(captured) > 0:
+            valid = self.get_valid_moves()
+            continued[captured] = (valid[captured] & table.captures).any(axis=1)
+        self.continuing[games[~continued[games]]] = NO_SQUARE
+        self.is_white_move[games] ^= ~continued[games]
+
+    def play(self, choose: Optional[MoveChooser] = None,
+             rng: Optional[np.random.Generator] = None) -> None:
+        """Play every game in the batch until it is over, choosing each move with choose.
+        If choose is None, every move is chosen at random with rng.
+        """
+        if rng is None:
+            rng = np.random.default_rng()
+        if choose is None:
+            def choose(_: BatchCheckers, valid: np.ndarray) -> np.ndarray:
+                return random_choices(valid, rng)
+
+        valid = self.get_valid_moves()
+        self.update_winners(valid)
+        while not self.is_over():
+            valid[self.winner != ONGOING] = False
+            self.make_moves(choose(self, valid))
+            valid = self.get_valid_moves()
+            self.update_winners(valid)
+
+    def get_results(self, encode_moves: bool = False) -> \
+            List[tuple[str, List[tuple[bool, tuple[str, str, str]]]]]:
+        """Return the result of every game in the batch in the same format as run_game:
+        the winner, and the list of (whether white made the move, move) for every move.
+        If encode_moves is True, the moves are move codes instead of tuples.
+        """
+        move_of = get_move_codec(self.dimension).move_of
+        codes = self.table.codes.tolist()
+        results = [(WINNER_NAMES.get(int(winner), None), []) for winner in self.winner]
+        for columns, is_white in self.history:
+            for g in np.nonzero(columns >= 0)[0].tolist():
+                code = codes[columns[g]]
+                if encode_moves:
+                    results[g][1].append((bool(is_white[g]), code))
+                else:
+                    results[g][1].append((bool(is_white[g]), move_of[code]))
+        return results
+
+
+def random_choices(valid: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+    """Return a random valid column for each row of valid, or -1 for the rows without one.
+
+    >>> valid = np.array([[False, True, True], [False, False, False]])
+    >>> int(random_choices(valid, np.random.default_rng(0))[1])
+    -1
+    """
+    weights = rng.random(valid.shape)
+    weights[~valid] = -1.0
+    columns = weights.argmax(axis=1)
+    columns[~valid.any(axis=1)] = -1
+    return columns
+
+
+def run_batch_games(num_games: int, choose: Optional[MoveChooser] = None,
+                    seed: Optional[int] = None) -> \
+        List[tuple[str, List[tuple[bool, tuple[str, str, str]]]]]:
+    """Play num_games games at once with BatchCheckers and return their results in the same
+    format as run_game. Moves are chosen with choose, or at random (from seed) if it is None.
+    """
+    batch = BatchCheckers(num_games)
+    batch.play(choose, np.random.default_rng(seed))
+    return batch.get_results()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
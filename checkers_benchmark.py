@@ -0,0 +1,376 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains a benchmark suite for the checkers engine, the game tree and the
+CSV files of games. It can be run from the command line, without a display:
+
+    python checkers_benchmark.py run -o results.json
+    python checkers_benchmark.py compare baseline.json results.json
+
+run times every benchmark over fixed corpora of positions and games, made from random games
+with fixed seeds (see game_rng), so every run does exactly the same work. The results are
+written as JSON along with information about the machine. compare reports how much slower or
+faster the median time of each benchmark is than in a stored baseline, and exits with status 1
+if any benchmark got slower by more than the threshold plus the spread of its times in the two
+runs, so noise on a busy machine isn't reported as a regression. If compare is only given the
+baseline, the benchmarks are run first.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+# Keep pygame from printing its banner when the engine is imported, so that the results printed
+# by run are only JSON.
+os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+from checkers_game_with_pygame_final import Checkers, run_game, game_rng
+import checkers_game_tree_final as gametree
+from AI_players_final import RandomPlayer
+
+# The seed of the random games that the corpora are made from.
+CORPUS_SEED = 111
+# The number of games in the corpora, and the number of those games whose positions are used.
+CORPUS_GAMES = 200
+POSITION_GAMES = 20
+# The number of random games played by the run_game benchmark.
+RUN_GAMES = 20
+# How many times each benchmark is timed. The median time is the one that is compared.
+REPEAT = 11
+# Each timing runs a benchmark over and over for at least this many seconds, so that short
+# benchmarks aren't swamped by the timer's own noise.
+MIN_TIME = 0.2
+# A benchmark counts as slower if its median time is more than this fraction above the
+# baseline, plus the spread of its times in both runs (see time_benchmark).
+THRESHOLD = 0.15
+
+
+class Corpus:
+    """The fixed positions and games that the benchmarks use.
+
+    Instance Attributes:
+        - games: The move sequences of random games, as returned by run_game.
+        - positions: Copies of the board before every move of the first few games.
+        - directory: A directory for the CSV files written by the benchmarks.
+    """
+    games: List[List[Tuple[bool, tuple]]]
+    positions: List[Checkers]
+    directory: str
+
+    def __init__(self, num_games: int, position_games: int, directory: str) -> None:
+        self.games = []
+        self.positions = []
+        self.directory = directory
+        for i in range(num_games):
+            if i < position_games:
+                white, black = _RecordingPlayer(self.positions), _RecordingPlayer(self.positions)
+            else:
+                white, black = RandomPlayer(), RandomPlayer()
+            self.games.append(run_game(white, black, rng=game_rng(CORPUS_SEED, i))[1])
+
+
+class _RecordingPlayer(RandomPlayer):
+    """A random player that saves a copy of the board every time it makes a move."""
+    # Private Instance Attributes:
+    #     - _positions: The list the copies of the board are added to.
+    _positions: List[Checkers]
+
+    def __init__(self, positions: List[Checkers]) -> None:
+        self._positions = positions
+
+    def make_move(self, game: Checkers, previous_move: tuple[str, str, str],
+                  continuing_from_previous_move: bool) -> tuple:
+        """Save a copy of game, then make a random move."""
+        self._positions.append(game.copy())
+        return super().make_move(game, previous_move, continuing_from_previous_move)
+
+
+# A benchmark takes the corpus and returns two functions. The first is called before each
+# timing, and isn't timed. Its result is given to the second, which is timed and returns the
+# number of operations it did.
+Benchmark = Callable[[Corpus], Tuple[Callable[[], Any], Callable[[Any], int]]]
+
+
+def bench_get_valid_moves(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Find the valid moves in every position."""
+    def run(positions: List[Checkers]) -> int:
+        for position in positions:
+            position.get_valid_moves()
+        return len(positions)
+
+    return (lambda: corpus.positions, run)
+
+
+def bench_make_move(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Make every valid move in every position, each on its own copy of the position."""
+    moves = [(position, move) for position in corpus.positions
+             for move in position.get_valid_moves()]
+
+    def prepare() -> List[Tuple[Checkers, tuple]]:
+        return [(position.copy(), move) for position, move in moves]
+
+    def run(boards: List[Tuple[Checkers, tuple]]) -> int:
+        for board, move in boards:
+            board.make_move(move)
+        return len(boards)
+
+    return (prepare, run)
+
+
+def bench_get_neighbours(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Find the neighbours of every piece in every position."""
+    pieces = [(position, piece) for position in corpus.positions
+              for piece_dict in (position.white_pieces, position.black_pieces)
+              for piece in piece_dict.values()]
+
+    def run(position_pieces: List[tuple]) -> int:
+        for position, piece in position_pieces:
+            position.get_neighbours(piece)
+        return len(position_pieces)
+
+    return (lambda: pieces, run)
+
+
+def bench_run_game(_: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Play whole games between random players."""
+    def run(_: None) -> int:
+        for i in range(RUN_GAMES):
+            run_game(RandomPlayer(), RandomPlayer(), rng=game_rng(CORPUS_SEED, i))
+        return RUN_GAMES
+
+    return (lambda: None, run)
+
+
+def bench_insert_move_sequence(corpus: Corpus) -> \
+        Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Insert every game into an empty game tree, one game at a time."""
+    def prepare() -> gametree.CheckersGameTree:
+        return gametree.CheckersGameTree(gametree.STARTING_PLAYER, None)
+
+    def run(tree: gametree.CheckersGameTree) -> int:
+        for game in corpus.games:
+            tree.insert_move_sequence(game, 0)
+        return len(corpus.games)
+
+    return (prepare, run)
+
+
+def bench_build_game_tree(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Build a game tree from every game at once."""
+    def run(_: None) -> int:
+        gametree.build_game_tree_from_list(corpus.games)
+        return len(corpus.games)
+
+    return (lambda: None, run)
+
+
+def bench_write_csv(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Write every game to a CSV file."""
+    filename = os.path.join(corpus.directory, 'write.csv')
+
+    def run(_: None) -> int:
+        gametree.write_moves_to_csv(filename, corpus.games)
+        return len(corpus.games)
+
+    return (lambda: None, run)
+
+
+def bench_read_csv(corpus: Corpus) -> Tuple[Callable[[], Any], Callable[[Any], int]]:
+    """Read every game back from a CSV file."""
+    filename = os.path.join(corpus.directory, 'read.csv')
+    gametree.write_moves_to_csv(filename, corpus.games)
+
+    def run(_: None) -> int:
+        gametree.read_moves_from_csv(filename)
+        return len(corpus.games)
+
+    return (lambda: None, run)
+
+
+BENCHMARKS: Dict[str, Benchmark] = {
+    'get_valid_moves': bench_get_valid_moves,
+    'make_move': bench_make_move,
+    'get_neighbours': bench_get_neighbours,
+    'run_game': bench_run_game,
+    'insert_move_sequence': bench_insert_move_sequence,
+    'build_game_tree_from_list': bench_build_game_tree,
+    'write_moves_to_csv': bench_write_csv,
+    'read_moves_from_csv': bench_read_csv,
+}
+
+
+def time_benchmark(benchmark: Benchmark, corpus: Corpus, repeat: int) -> Dict[str, float]:
+    """Time benchmark repeat times and return its results: the best and median times of one
+    operation in microseconds, the spread of the times, and the number of operations in one run
+    of the benchmark. The spread is the distance between the upper and lower quartiles of the
+    times, as a fraction of the median.
+    """
+    prepare, run = benchmark(corpus)
+    times = []
+    operations = 0
+    for _ in range(repeat):
+        total_time = 0.0
+        total_operations = 0
+        while total_time < MIN_TIME:
+            argument = prepare()
+            start = time.perf_counter()
+            operations = run(argument)
+            total_time += time.perf_counter() - start
+            total_operations += operations
+        times.append(total_time / total_operations * 1e6)
+    median = statistics.median(times)
+    if len(times) >= 2:
+        quartiles = statistics.quantiles(times, n=4)
+        spread = (quartiles[2] - quartiles[0]) / median
+    else:
+        spread = 0.0
+    return {'best_us': min(times), 'median_us': median, 'spread': spread,
+            'operations': operations}
+
+
+def machine_info() -> Dict[str, Any]:
+    """Return information about this machine and the version of the code being timed."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                                text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {'platform': platform.platform(), 'machine': platform.machine(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count(),
+            'python': platform.python_implementation() + ' ' + platform.python_version(),
+            'commit': commit}
+
+
+def run_benchmarks(names: Optional[List[str]] = None, repeat: int = REPEAT,
+                   corpus_games: int = CORPUS_GAMES) -> Dict[str, Any]:
+    """Run the benchmarks with the given names (or all of them) and return the results, in
+    the format that is written to the JSON file."""
+    if names is None:
+        names = list(BENCHMARKS)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        corpus = Corpus(corpus_games, min(POSITION_GAMES, corpus_games), directory)
+        for name in names:
+            results[name] = time_benchmark(BENCHMARKS[name], corpus, repeat)
+            print(f'{name:<28}{results[name]["median_us"]:>14.2f} us/op', file=sys.stderr)
+    return {'machine': machine_info(), 'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+            'settings': {'corpus_seed': CORPUS_SEED, 'corpus_games': corpus_games,
+                         'repeat': repeat},
+            'benchmarks': results}
+
+
+def compare_results(baseline: Dict[str, Any], current: Dict[str, Any],
+                    threshold: float = THRESHOLD) -> Tuple[str, List[str]]:
+    """Return a table comparing the median times per operation of the benchmarks in current
+    against baseline, and the names of the benchmarks that got slower by more than threshold
+    plus the spread of their times in both runs. Benchmarks that did a different number of
+    operations in the two runs used different corpora, so they aren't compared. Results
+    without a spread, from older versions of this module, count as having none.
+
+    >>> base = {'benchmarks': {'a': {'median_us': 1.0, 'spread': 0.1, 'operations': 10}}}
+    >>> now = {'benchmarks': {'a': {'median_us': 1.5, 'spread': 0.1, 'operations': 10}}}
+    >>> compare_results(base, now)[1]
+    ['a']
+    >>> compare_results(base, now, threshold=0.4)[1]
+    []
+    """
+    lines = [f'{"Benchmark (us/op)":<28}{"Baseline":>12}{"Current":>12}{"Change":>10}'
+             f'{"Allowed":>10}']
+    regressions = []
+    for name, result in current['benchmarks'].items():
+        new_time = result['median_us']
+        if name not in baseline['benchmarks']:
+            lines.append(f'{name:<28}{"-":>12}{new_time:>12.2f}  (new)')
+            continue
+        old = baseline['benchmarks'][name]
+        if old['operations'] != result['operations']:
+            lines.append(f'{name:<28}  (different corpus, not compared)')
+            continue
+        old_time = old['median_us']
+        change = new_time / old_time - 1
+        allowed = threshold + old.get('spread', 0.0) + result.get('spread', 0.0)
+        line = f'{name:<28}{old_time:>12.2f}{new_time:>12.2f}{change:>+10.1%}{allowed:>+10.1%}'
+        if change > allowed:
+            regressions.append(name)
+            line += '  SLOWER'
+        lines.append(line)
+    if baseline.get('machine') != current.get('machine'):
+        lines.append('Note: the baseline was run on a different machine or version of the code.')
+    return ('\n'.join(lines), regressions)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Run the command line interface described at the top of this module, and return its
+    exit status.
+
+    Without an output file, run prints nothing but the results, so they can be piped to a file:
+
+    >>> command = [sys.executable, __file__, 'run', '-b', 'get_neighbours', '--repeat', '1',
+    ...            '--games', '2']
+    >>> output = subprocess.run(command, capture_output=True, text=True, check=True).stdout
+    >>> list(json.loads(output)['benchmarks'])
+    ['get_neighbours']
+    """
+    parser = argparse.ArgumentParser(description='Benchmarks for the checkers project.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run_parser = commands.add_parser('run', help='run the benchmarks')
+    run_parser.add_argument('-o', '--output', help='the JSON file to write the results to')
+
+    compare_parser = commands.add_parser('compare', help='compare results with a baseline')
+    compare_parser.add_argument('baseline', help='the JSON results to compare against')
+    compare_parser.add_argument('current', nargs='?',
+                                help='the JSON results to compare (by default, run now)')
+    compare_parser.add_argument('--threshold', type=float, default=THRESHOLD,
+                                help='the fraction slower that counts as a regression')
+
+    for sub_parser in (run_parser, compare_parser):
+        sub_parser.add_argument('-b', '--benchmark', action='append', choices=list(BENCHMARKS),
+                                help='a benchmark to run (by default, all of them)')
+        sub_parser.add_argument('--repeat', type=int, default=REPEAT)
+        sub_parser.add_argument('--games', type=int, default=CORPUS_GAMES,
+                                help='the number of games in the corpus')
+    args = parser.parse_args(argv)
+
+    if args.command == 'run' or args.current is None:
+        results = run_benchmarks(args.benchmark, args.repeat, args.games)
+    else:
+        with open(args.current) as file:
+            results = json.load(file)
+
+    if args.command == 'run':
+        if args.output is None:
+            print(json.dumps(results, indent=2))
+        else:
+            with open(args.output, 'w') as file:
+                json.dump(results, file, indent=2)
+        return 0
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    table, regressions = compare_results(baseline, results, args.threshold)
+    print(table)
+    if regressions != []:
+        print(f'{len(regressions)} benchmark(s) got slower: {", ".join(regressions)}')
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
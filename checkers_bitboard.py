@@ -0,0 +1,680 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains a bitboard version of the Checkers class. Instead of keeping the
+pieces in dictionaries keyed by their positions, the white pieces, black pieces and crowned
+pieces are each stored as a single integer, where bit (row * dimension + column) is set if there
+is a piece on that square. Moves are then found with shifts and masks over the whole board at
+once, which is much faster than looking at the pieces one by one.
+
+BitboardCheckers has the same methods and attributes as Checkers, so it can be passed to
+run_game and used by any of the Player subclasses.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Tuple
+from checkers_game_with_pygame_final import Piece, DIMENSION, MOVE_LIMIT, TurnContext, \
+    find_compound_moves, find_turn_moves
+from checkers_topology import BoardTopology, get_topology
+from checkers_moves import MoveCodec, get_move_codec
+from checkers_zobrist import WHITE_MAN, WHITE_KING, BLACK_MAN, BLACK_KING, ZobristKeys, \
+    get_zobrist_keys
+
+def _shift(board: int, delta: int) -> int:
+    """Return board with every bit moved by delta places (towards the top if delta > 0)."""
+    if delta > 0:
+        return board << delta
+    else:
+        return board >> -delta
+
+
+def _bits(board: int) -> Iterator[int]:
+    """Yield the index of every bit that is set in board, lowest first."""
+    while board:
+        low = board & -board
+        yield low.bit_length() - 1
+        board ^= low
+
+
+class BitboardTables:
+    """The masks and move tables that BitboardCheckers uses for one size of board, built from
+    its BoardTopology. Bit (row * dimension + column) of a bitboard is the square in that row
+    and column, both starting from 0.
+
+    Instance Attributes:
+        - dimension: The number of rows (and columns) of the board.
+        - bit_of_position: The bit index of every position.
+        - position_of_bit: The position of every bit index, or '' if the square is not a
+          square that pieces can be on.
+        - board_mask: The bits of all the squares that pieces can be on.
+        - not_right_edge: The squares that are not in the right-most column.
+        - not_left_edge: The squares that are not in the left-most column.
+        - white_crown_row: The squares where white pieces are crowned.
+        - black_crown_row: The squares where black pieces are crowned.
+        - up_right, up_left, down_right, down_left: How many bits a piece moves by in each
+          diagonal direction. Moving towards the top of the board shifts the bits left, and
+          towards the bottom shifts them right.
+        - directions: The four diagonal directions, in the same order as
+          Checkers.get_neighbours (top right, top left, bottom right, bottom left), each as
+          (change in bit index, mask of squares a piece can leave in this direction).
+        - step_moves: step_moves[d][bit] is the move tuple for a piece on bit stepping once in
+          direction d, or None if it would leave the board.
+        - jump_moves: jump_moves[d][bit] is the move tuple for a piece on bit jumping in
+          direction d, or None if it would leave the board.
+        - step_to: The same moves as step_moves, but indexed by the bit the piece lands on.
+        - jump_to: The same moves as jump_moves, but indexed by the bit the piece lands on.
+        - geometry: (board_mask, not_right_edge, not_left_edge, up_right, up_left, down_right,
+          down_left), so the move generators can get them all at once.
+        - zobrist_of_bit: zobrist_of_bit[kind][bit] is the Zobrist number for a piece of the
+          given kind on bit, so that a BitboardCheckers position has the same key as the same
+          position in Checkers.
+        - white_start, black_start: The bitboards of the white and black pieces at the start
+          of a game.
+        - start_key: The XOR of the Zobrist numbers of the pieces at the start of a game.
+
+    The move tables are built once so that finding moves never has to build any strings.
+    """
+    dimension: int
+    bit_of_position: Dict[str, int]
+    position_of_bit: List[str]
+    board_mask: int
+    not_right_edge: int
+    not_left_edge: int
+    white_crown_row: int
+    black_crown_row: int
+    up_right: int
+    up_left: int
+    down_right: int
+    down_left: int
+    directions: Tuple[Tuple[int, int], ...]
+    step_moves: List[List[Optional[tuple]]]
+    jump_moves: List[List[Optional[tuple]]]
+    step_to: List[List[Optional[tuple]]]
+    jump_to: List[List[Optional[tuple]]]
+    geometry: Tuple[int, int, int, int, int, int, int]
+    zobrist_of_bit: List[List[int]]
+    white_start: int
+    black_start: int
+    start_key: int
+
+    def __init__(self, dimension: int) -> None:
+        topology = get_topology(dimension)
+        self.dimension = dimension
+        self.bit_of_position = {topology.positions[square]: row * dimension + col
+                                for square, (col, row) in enumerate(topology.coords)}
+        self.position_of_bit = [''] * (dimension * dimension)
+        for pos, bit in self.bit_of_position.items():
+            self.position_of_bit[bit] = pos
+        bits = self.bit_of_position.values()
+
+        self.board_mask = sum(1 << bit for bit in bits)
+        self.not_right_edge = sum(1 << bit for bit in bits if bit % dimension != dimension - 1)
+        self.not_left_edge = sum(1 << bit for bit in bits if bit % dimension != 0)
+        self.white_crown_row = sum(1 << bit for bit in bits if bit < dimension)
+        self.black_crown_row = sum(1 << bit for bit in bits
+                                   if bit >= dimension * (dimension - 1))
+
+        self.up_right = dimension + 1
+        self.up_left = dimension - 1
+        self.down_right = dimension - 1
+        self.down_left = dimension + 1
+        self.directions = ((self.up_right, self.not_right_edge),
+                           (self.up_left, self.not_left_edge),
+                           (-self.down_right, self.not_right_edge),
+                           (-self.down_left, self.not_left_edge))
+
+        num_bits = dimension * dimension
+        self.step_moves = [[None] * num_bits for _ in self.directions]
+        self.jump_moves = [[None] * num_bits for _ in self.directions]
+        self.step_to = [[None] * num_bits for _ in self.directions]
+        self.jump_to = [[None] * num_bits for _ in self.directions]
+        positions = self.position_of_bit
+        for d, (delta, mask) in enumerate(self.directions):
+            for bit in bits:
+                if mask >> bit & 1 and _shift(1 << bit, delta) & self.board_mask:
+                    step = (positions[bit], '', positions[bit + delta])
+                    self.step_moves[d][bit] = step
+                    self.step_to[d][bit + delta] = step
+                    if mask >> (bit + delta) & 1 and \
+                            _shift(1 << bit, 2 * delta) & self.board_mask:
+                        jump = (positions[bit], positions[bit + delta], positions[bit + 2 * delta])
+                        self.jump_moves[d][bit] = jump
+                        self.jump_to[d][bit + 2 * delta] = jump
+
+        self.geometry = (self.board_mask, self.not_right_edge, self.not_left_edge,
+                         self.up_right, self.up_left, self.down_right, self.down_left)
+
+        zobrist = get_zobrist_keys(dimension)
+        self.zobrist_of_bit = [[0] * num_bits for _ in zobrist.pieces]
+        for kind, numbers in enumerate(zobrist.pieces):
+            for pos, bit in self.bit_of_position.items():
+                self.zobrist_of_bit[kind][bit] = numbers[topology.index_of[pos]]
+
+        self.white_start = sum(1 << self.bit_of_position[pos] for pos in topology.white_start)
+        self.black_start = sum(1 << self.bit_of_position[pos] for pos in topology.black_start)
+        self.start_key = 0
+        for bit in _bits(self.white_start):
+            self.start_key ^= self.zobrist_of_bit[WHITE_MAN][bit]
+        for bit in _bits(self.black_start):
+            self.start_key ^= self.zobrist_of_bit[BLACK_MAN][bit]
+
+
+# The tables that have been built so far, by board size.
+_TABLES: Dict[int, BitboardTables] = {}
+
+
+def get_bitboard_tables(dimension: int) -> BitboardTables:
+    """Return the BitboardTables for a board with the given number of rows and columns.
+    Each set of tables is only built the first time it is asked for.
+
+    >>> tables = get_bitboard_tables(8)
+    >>> tables.jump_moves[0][tables.bit_of_position['c4']]
+    ('c4', 'd5', 'e6')
+    >>> get_bitboard_tables(8) is tables
+    True
+    """
+    if dimension not in _TABLES:
+        _TABLES[dimension] = BitboardTables(dimension)
+    return _TABLES[dimension]
+
+
+class BitboardPiece(Piece):
+    """A piece on a BitboardCheckers board.
+
+    This is only made when a caller asks for a piece through white_pieces or black_pieces, and
+    reads and writes straight through to the board's bitboards, so crowning it crowns the piece
+    on the board.
+
+    Instance Attributes:
+        - white: Whether the color of this piece is white
+        - position: The position of self on the board
+    """
+    # Private Instance Attributes:
+    #   - _board: The board this piece is on.
+    #   - _bit: The bit index of self.position
+    _board: BitboardCheckers
+    _bit: int
+
+    def __init__(self, board: BitboardCheckers, is_white: bool, position: str) -> None:
+        self._board = board
+        self._bit = board.tables.bit_of_position[position]
+        self.white = is_white
+        self.position = position
+
+    @property
+    def is_crowned(self) -> bool:
+        """Whether this piece is crowned or not."""
+        return bool(self._board.kings >> self._bit & 1)
+
+    def crown_piece(self, dimension: int = DIMENSION) -> None:
+        """Crown self if it is on the far row of the board for its color."""
+        self._board.crown_piece(self.position)
+
+
+class PieceView:
+    """A read-only dictionary-like view of the pieces of one color on a BitboardCheckers board,
+    mapping positions to BitboardPiece objects, like Checkers.white_pieces and
+    Checkers.black_pieces.
+    """
+    # Private Instance Attributes:
+    #   - _board: The board that is being viewed.
+    #   - _white: Whether this is a view of the white pieces.
+    _board: BitboardCheckers
+    _white: bool
+
+    def __init__(self, board: BitboardCheckers, white: bool) -> None:
+        self._board = board
+        self._white = white
+
+    def _bitboard(self) -> int:
+        """Return the bitboard of the pieces in this view."""
+        if self._white:
+            return self._board.white
+        return self._board.black
+
+    def __getitem__(self, position: str) -> BitboardPiece:
+        if position not in self:
+            raise KeyError(position)
+        return BitboardPiece(self._board, self._white, position)
+
+    def __contains__(self, position: object) -> bool:
+        bit = self._board.tables.bit_of_position.get(position)
+        return bit is not None and bool(self._bitboard() >> bit & 1)
+
+    def __iter__(self) -> Iterator[str]:
+        positions = self._board.tables.position_of_bit
+        return (positions[bit] for bit in _bits(self._bitboard()))
+
+    def __len__(self) -> int:
+        return bin(self._bitboard()).count('1')
+
+    def __bool__(self) -> bool:
+        board = self._board
+        return (board.white if self._white else board.black) != 0
+
+    def keys(self) -> List[str]:
+        """Return the positions of the pieces in this view."""
+        return list(self)
+
+    def values(self) -> List[BitboardPiece]:
+        """Return the pieces in this view."""
+        return [BitboardPiece(self._board, self._white, pos) for pos in self]
+
+    def items(self) -> List[Tuple[str, BitboardPiece]]:
+        """Return (position, piece) pairs for the pieces in this view."""
+        return [(pos, BitboardPiece(self._board, self._white, pos)) for pos in self]
+
+
+class BitboardCheckers:
+    """A class that represents the game checkers, storing the board as bitboards.
+
+    Instance Attributes:
+        - white: A bitboard of the squares that have a white piece on them.
+        - black: A bitboard of the squares that have a black piece on them.
+        - kings: A bitboard of the squares that have a crowned piece on them.
+        - is_white_move: Whether white is the current player.
+        - zobrist_key: The Zobrist key of this position, the same as Checkers.zobrist_key.
+        - dimension: The number of rows (and columns) of the board, such as 6, 8 or 10.
+        - move_limit: The number of moves after which the game is a draw.
+        - topology: The precomputed tables for a board of this size.
+        - zobrist: The Zobrist numbers for a board of this size.
+        - tables: The bitboard masks and move tables for a board of this size.
+        - codec: Converts moves to and from move codes. Every method that takes a move also
+          accepts its code.
+        - turn: What run_game has worked out about the current move, like Checkers.turn.
+        - white_pieces: The white pieces, as a mapping from positions to pieces.
+        - black_pieces: The black pieces, as a mapping from positions to pieces.
+
+    Representation Invariants:
+        - self.white & self.black == 0
+        - self.kings & ~(self.white | self.black) == 0
+        - (self.white | self.black) & ~self.tables.board_mask == 0
+
+    A game of random moves has the same legal moves and Zobrist keys as on a Checkers board:
+
+    >>> import random
+    >>> from checkers_game_with_pygame_final import Checkers
+    >>> rng = random.Random(111)
+    >>> board, baseline = BitboardCheckers(dimension=8), Checkers(dimension=8)
+    >>> previous_move, continuing, same = ('', '', ''), False, True
+    >>> while baseline.get_winner(0) is None:
+    ...     moves = sorted(baseline.get_turn_moves(previous_move, continuing))
+    ...     same = same and sorted(board.get_turn_moves(previous_move, continuing)) == moves
+    ...     same = same and board.zobrist_key == baseline.zobrist_key
+    ...     previous_move = rng.choice(moves)
+    ...     continuing = baseline.push(previous_move)
+    ...     same = same and board.push(previous_move) == continuing
+    >>> same, board.get_winner(0) == baseline.get_winner(0)
+    (True, True)
+    """
+    white: int
+    black: int
+    kings: int
+    is_white_move: bool
+    dimension: int
+    move_limit: int
+    topology: BoardTopology
+    zobrist: ZobristKeys
+    tables: BitboardTables
+    codec: MoveCodec
+    turn: Optional[TurnContext]
+    white_pieces: PieceView
+    black_pieces: PieceView
+    # Private Instance Attributes:
+    #   - _valid_moves: The valid moves for the current position if they have already been
+    #     found, as (is_white_move, moves), or None if the board has changed since.
+    #   - _undo_stack: The (white, black, kings, is_white_move, _piece_key) before each move
+    #     made with push that has not been undone with pop yet, and the move itself.
+    #   - _piece_key: The XOR of the Zobrist numbers of all the pieces on the board.
+    #   - _compound_moves: The compound moves already found, by position (see
+    #     find_compound_moves).
+    _valid_moves: Optional[Tuple[bool, List[tuple]]]
+    _undo_stack: List[Tuple[int, int, int, bool, int, tuple]]
+    _piece_key: int
+    _compound_moves: Dict[object, List[tuple]]
+
+    def __init__(self, white: Optional[Dict[str, Piece]] = None,
+                 black: Optional[Dict[str, Piece]] = None,
+                 curr_player: Optional[bool] = None, dimension: int = DIMENSION,
+                 move_limit: int = MOVE_LIMIT) -> None:
+        self.dimension = dimension
+        self.move_limit = move_limit
+        self.topology = get_topology(dimension)
+        self.zobrist = get_zobrist_keys(dimension)
+        self.tables = get_bitboard_tables(dimension)
+        self.codec = get_move_codec(dimension)
+        self.turn = None
+        # The views read the bitboards whenever they are used, so they never go out of date
+        self.white_pieces = PieceView(self, True)
+        self.black_pieces = PieceView(self, False)
+
+        # For copying a board from a Checkers game
+        bit_of_position = self.tables.bit_of_position
+        if white is not None and black is not None and curr_player is not None:
+            self.white = sum(1 << bit_of_position[pos] for pos in white)
+            self.black = sum(1 << bit_of_position[pos] for pos in black)
+            self.kings = sum(1 << bit_of_position[pos] for pieces in (white, black)
+                             for pos in pieces if pieces[pos].is_crowned)
+            self.is_white_move = curr_player
+            self._piece_key = 0
+            for kind, board in ((WHITE_MAN, self.white & ~self.kings),
+                                (WHITE_KING, self.white & self.kings),
+                                (BLACK_MAN, self.black & ~self.kings),
+                                (BLACK_KING, self.black & self.kings)):
+                for bit in _bits(board):
+                    self._piece_key ^= self.tables.zobrist_of_bit[kind][bit]
+
+        else:  # For starting a new game.
+            self.white = self.tables.white_start
+            self.black = self.tables.black_start
+            self.kings = 0
+            self.is_white_move = True
+            self._piece_key = self.tables.start_key
+
+        self._valid_moves = None
+        self._undo_stack = []
+        self._compound_moves = {}
+
+    @property
+    def zobrist_key(self) -> int:
+        """The Zobrist key of this position, including whose move it is."""
+        if self.is_white_move:
+            return self._piece_key ^ self.zobrist.white_to_move
+        return self._piece_key
+
+    def clear_cache(self) -> None:
+        """Forget the valid moves found for the current position. This must be called whenever
+        the bitboards are changed."""
+        self._valid_moves = None
+
+    def get_winner(self, move_count: int) -> Optional[str]:
+        """Return the winner of the game, if there is one or if it is a draw.
+        Return None if the move limit has not been reached and there is no winner yet.
+        """
+        if self.black == 0:
+            return 'white'
+        elif self.white == 0:
+            return 'black'
+        elif move_count == self.move_limit or not self._current_moves():
+            return 'draw'
+        else:
+            return None
+
+    def make_move(self, move: tuple[str, str, str]) -> None:
+        """
+        Makes a move based on the tuple, move, in the same format as Checkers.make_move.
+        Preconditions:
+            - move[2] not in self.white_pieces or move[2] not in self.black_pieces
+        """
+        if isinstance(move, int):
+            move = self.codec.move_of[move]
+        tables = self.tables
+        start_bit = tables.bit_of_position[move[0]]
+        end_bit = tables.bit_of_position[move[2]]
+        start = 1 << start_bit
+        end = 1 << end_bit
+        if move[1] != '':
+            self.capture(move[1])
+
+        if self.is_white_move:
+            self.white ^= start | end
+            kind = WHITE_MAN
+        else:
+            self.black ^= start | end
+            kind = BLACK_MAN
+        if self.kings & start:
+            self.kings ^= start | end
+            kind += 1
+        numbers = tables.zobrist_of_bit[kind]
+        self._piece_key ^= numbers[start_bit] ^ numbers[end_bit]
+        self._valid_moves = None
+
+    def capture(self, position: str) -> None:
+        """
+        removes the piece that is on the given position from the game
+        """
+        bit = self.tables.bit_of_position[position]
+        keep = ~(1 << bit)
+        if self.is_white_move:
+            self.black &= keep
+            kind = BLACK_MAN
+        else:
+            self.white &= keep
+            kind = WHITE_MAN
+        if self.kings >> bit & 1:
+            kind += 1
+        self.kings &= keep
+        self._piece_key ^= self.tables.zobrist_of_bit[kind][bit]
+        self._valid_moves = None
+
+    def crown_piece(self, position: str) -> None:
+        """Crowns the piece on the given position if it has reached the other side of the
+        board, like Checkers.crown_piece."""
+        tables = self.tables
+        bit = tables.bit_of_position[position]
+        square = 1 << bit
+        if self.white & square & tables.white_crown_row:
+            kind = WHITE_MAN
+        elif self.black & square & tables.black_crown_row:
+            kind = BLACK_MAN
+        else:
+            return
+        if self.kings & square:
+            return
+        self.kings |= square
+        self._piece_key ^= tables.zobrist_of_bit[kind][bit] ^ tables.zobrist_of_bit[kind + 1][bit]
+        self._valid_moves = None
+
+    def push(self, move: tuple[str, str, str]) -> bool:
+        """Makes the move for the current player, crowns the moved piece if it reached the other
+        side of the board, and changes the current player unless the same piece can capture
+        again, like Checkers.push. Returns whether the same player moves again.
+        """
+        if isinstance(move, int):
+            move = self.codec.move_of[move]
+        self._undo_stack.append((self.white, self.black, self.kings, self.is_white_move,
+                                 self._piece_key, move))
+        self.make_move(move)
+        self.crown_piece(move[2])
+
+        end = 1 << self.tables.bit_of_position[move[2]]
+        white = self.is_white_move
+        if white:
+            opp = self.black
+        else:
+            opp = self.white
+
+        if move[1] != '':
+            up, down = _directions(end, end & self.kings, white)
+            if self._find_jumps(up, down, opp):
+                return True
+        self.is_white_move = not white
+        return False
+
+    def pop(self) -> tuple[str, str, str]:
+        """Undoes the last move made with push and returns it.
+
+        Preconditions:
+            - a move has been made with push that has not been undone yet
+        """
+        self.white, self.black, self.kings, self.is_white_move, self._piece_key, move = \
+            self._undo_stack.pop()
+        self._valid_moves = None
+        return move
+
+    def get_neighbours(self, piece: Piece) -> list:
+        """Returns the pieces diagonal to the piece, in the same format as
+        Checkers.get_neighbours."""
+        tables = self.tables
+        bit = tables.bit_of_position[piece.position]
+        if piece.white:
+            same, diff = self.white, self.black
+        else:
+            same, diff = self.black, self.white
+
+        neighbours_so_far = []
+        for d in range(0, 4):
+            step = tables.step_moves[d][bit]
+            if step is None:
+                neighbours_so_far.append(())
+            else:
+                corner = bit + tables.directions[d][0]
+                if same >> corner & 1:
+                    neighbours_so_far.append(('same', step[2]))
+                elif diff >> corner & 1:
+                    neighbours_so_far.append(('diff', step[2]))
+                else:
+                    neighbours_so_far.append(('none', step[2]))
+        return neighbours_so_far
+
+    def get_valid_moves(self) -> List[tuple]:
+        """Returns all the valid moves for the current player, in the same format as
+        Checkers.get_valid_moves.
+
+        The moves are cached until the board changes, so calling this again for the same
+        position (for example, from get_winner and then from the player) is cheap.
+        """
+        return list(self._current_moves())
+
+    def iter_valid_moves(self) -> Iterator[tuple]:
+        """Yields the valid moves for the current player one at a time, like
+        Checkers.iter_valid_moves. The moves are all found at once with the bitboards, so this
+        only saves copying them."""
+        yield from self._current_moves()
+
+    def get_turn_moves(self, previous_move: tuple[str, str, str],
+                       continuing_from_previous_move: bool) -> List[tuple]:
+        """Returns the moves the current player can make this turn, like
+        Checkers.get_turn_moves."""
+        return find_turn_moves(self, previous_move, continuing_from_previous_move)
+
+    def get_valid_move_codes(self) -> List[int]:
+        """Returns the codes of all the valid moves for the current player, in the same order
+        as get_valid_moves."""
+        code_of = self.codec.code_of
+        return [code_of[move] for move in self._current_moves()]
+
+    def get_compound_moves(self) -> List[tuple]:
+        """Returns all the valid turns for the current player as compound moves, in the same
+        format as Checkers.get_compound_moves."""
+        return list(find_compound_moves(self, self._compound_moves))
+
+    def get_valid_move_piece(self, piece: Piece) -> Tuple[list, bool]:
+        """Returns all the valid moves for a piece, and whether they are captures, in the same
+        format as Checkers.get_valid_move_piece."""
+        bit = 1 << self.tables.bit_of_position[piece.position]
+        if piece.white:
+            opp = self.black
+        else:
+            opp = self.white
+        up, down = _directions(bit, bit if piece.is_crowned else 0, piece.white)
+
+        jumps = self._find_jumps(up, down, opp)
+        if jumps:
+            return (jumps, True)
+        return (self._find_steps(up, down), False)
+
+    def _current_moves(self) -> List[tuple]:
+        """Return the cached valid moves for the current position, finding them first if they
+        have not been found yet. The returned list must not be changed."""
+        cache = self._valid_moves
+        if cache is not None and cache[0] == self.is_white_move:
+            return cache[1]
+
+        moves = self._find_moves()
+        self._valid_moves = (self.is_white_move, moves)
+        return moves
+
+    def _find_moves(self) -> List[tuple]:
+        """Return the valid moves for the current player. Captures must be made if there
+        are any."""
+        # The same as _directions, without the call
+        if self.is_white_move:
+            opp = self.black
+            up, down = self.white & self.kings, self.white
+        else:
+            opp = self.white
+            up, down = self.black, self.black & self.kings
+
+        jumps = self._find_jumps(up, down, opp)
+        if jumps:
+            return jumps
+        return self._find_steps(up, down)
+
+    def _find_jumps(self, up: int, down: int, opp: int) -> List[tuple]:
+        """Return all the captures that can be made by the pieces in up towards the top of
+        the board, and by the pieces in down towards the bottom, over the pieces in opp."""
+        tables = self.tables
+        board_mask, not_right_edge, not_left_edge, up_right, up_left, down_right, down_left = \
+            tables.geometry
+        empty = board_mask & ~(self.white | self.black)
+        jumps = []
+        if up:
+            landing = ((((up & not_right_edge) << up_right) & opp & not_right_edge)
+                       << up_right) & empty
+            if landing:
+                _collect(landing, tables.jump_to[0], jumps)
+            landing = ((((up & not_left_edge) << up_left) & opp & not_left_edge)
+                       << up_left) & empty
+            if landing:
+                _collect(landing, tables.jump_to[1], jumps)
+        if down:
+            landing = ((((down & not_right_edge) >> down_right) & opp & not_right_edge)
+                       >> down_right) & empty
+            if landing:
+                _collect(landing, tables.jump_to[2], jumps)
+            landing = ((((down & not_left_edge) >> down_left) & opp & not_left_edge)
+                       >> down_left) & empty
+            if landing:
+                _collect(landing, tables.jump_to[3], jumps)
+        return jumps
+
+    def _find_steps(self, up: int, down: int) -> List[tuple]:
+        """Return all the moves without captures that can be made by the pieces in up towards
+        the top of the board, and by the pieces in down towards the bottom."""
+        tables = self.tables
+        board_mask, not_right_edge, not_left_edge, up_right, up_left, down_right, down_left = \
+            tables.geometry
+        empty = board_mask & ~(self.white | self.black)
+        steps = []
+        if up:
+            landing = ((up & not_right_edge) << up_right) & empty
+            if landing:
+                _collect(landing, tables.step_to[0], steps)
+            landing = ((up & not_left_edge) << up_left) & empty
+            if landing:
+                _collect(landing, tables.step_to[1], steps)
+        if down:
+            landing = ((down & not_right_edge) >> down_right) & empty
+            if landing:
+                _collect(landing, tables.step_to[2], steps)
+            landing = ((down & not_left_edge) >> down_left) & empty
+            if landing:
+                _collect(landing, tables.step_to[3], steps)
+        return steps
+
+
+def _directions(own: int, kings: int, white: bool) -> Tuple[int, int]:
+    """Return the bitboards of the pieces in own that can move towards the top of the board and
+    of those that can move towards the bottom, where kings are the crowned pieces in own."""
+    if white:
+        return (kings, own)
+    else:
+        return (own, kings)
+
+
+def _collect(landing: int, table: list, moves: list) -> None:
+    """Append table[bit] to moves for every bit that is set in landing."""
+    while landing:
+        low = landing & -landing
+        moves.append(table[low.bit_length() - 1])
+        landing ^= low
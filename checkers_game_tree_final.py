@@ -0,0 +1,638 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+This Python module contains the game tree class that the Aggressive AI and Defensive AI will
+use. It also contains the functions that allow for reading and writing to a CSV file (game tree
+building purposes) and an Exploring Player AI that also builds the game tree.
+Copyright and Usage Information:
+======================================
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Optional
+import random
+import csv
+import multiprocessing
+# May be subject to change later
+from checkers_game_with_pygame_final import Player, Checkers, run_game, game_rng, DIMENSION
+from checkers_moves import NO_MOVE, AnyMove, get_move_codec, is_capture
+START_MOVE = ('', '', '')
+STARTING_PLAYER = True
+# The game tree only stores move codes (see checkers_moves), which are converted with this codec.
+CODEC = get_move_codec(DIMENSION)
+
+
+class CheckersGameTree:
+    """A tree object that stores the possible moves and move sequences within a simplified
+    checkers game.
+    Instance Attributes:
+        - is_white: Whether white will make the next move
+        - move_code: The code of the move made this turn (see checkers_moves).
+        - lost_white_pcs: The average number of pieces white could lose
+        - lost_black_pcs: The average number of pieces black could lose
+        - subtrees: The subtrees of this tree.
+    Representation Invariants:
+        - prev_move is a valid move
+        - all(pos in checkers.VALID_POSITIONS for pos in prev_move)
+        - 0 <= lost_white_pcs <= 6
+        - 0 <= lost_black_pcs <= 6
+    """
+    is_white: bool
+    move_code: int
+    lost_white_pcs: float
+    lost_black_pcs: float
+    subtrees: list[CheckersGameTree]
+    # Game trees can have millions of nodes, so they don't each get a __dict__
+    __slots__ = ('is_white', 'move_code', 'lost_white_pcs', 'lost_black_pcs', 'subtrees')
+
+    def __init__(self, curr_player: bool,
+                 move: Optional[AnyMove]) -> None:
+
+        self.is_white = curr_player
+
+        if move is None:
+            self.move_code = NO_MOVE
+        else:
+            self.move_code = CODEC.encode(move)
+
+        self.lost_black_pcs = 0
+        self.lost_white_pcs = 0
+        self.subtrees = []
+
+    @property
+    def move(self) -> tuple[str, str, str]:
+        """The move made this turn, as a tuple of positions."""
+        return CODEC.move_of[self.move_code]
+
+    def is_empty(self) -> bool:
+        """Returns whether this tree is empty or not."""
+        if self.move_code == NO_MOVE:
+            return True
+        return False
+
+    def add_subtree(self, subtree: CheckersGameTree) -> None:
+        """Adds a subtree to the current tree."""
+        self.subtrees.append(subtree)
+        self.update_lost_pcs()
+
+    def update_lost_pcs(self) -> None:
+        """Updates the self.lost_black_pcs and self.lost_white_pcs.
+        Preconditions:
+            - self.is_empty() is False
+        """
+        if len(self.subtrees) == 1:
+            # Most nodes deep in the tree only have one subtree, so there is nothing to average
+            subtree = self.subtrees[0]
+            self.lost_white_pcs = float(subtree.lost_white_pcs)
+            self.lost_black_pcs = float(subtree.lost_black_pcs)
+            if is_capture(subtree.move_code):
+                if self.is_white is True:
+                    self.lost_black_pcs += 1
+                else:
+                    self.lost_white_pcs += 1
+        elif self.is_white is True:
+            # White is the current player
+
+            # Get the average for all the subtrees
+            lst_of_lost_white = [subtree.lost_white_pcs for subtree in self.subtrees]
+            self.lost_white_pcs = sum(lst_of_lost_white) / len(lst_of_lost_white)
+
+            # Get the average for all the subtrees, plus one for each subtree that as a capture.
+            lost_black_pcs_so_far = []
+            for subtree in self.subtrees:
+                lost_pcs = subtree.lost_black_pcs
+                if is_capture(subtree.move_code):
+                    lost_black_pcs_so_far.append(lost_pcs + 1)
+                else:
+                    lost_black_pcs_so_far.append(lost_pcs)
+
+            self.lost_black_pcs = sum(lost_black_pcs_so_far) / len(lost_black_pcs_so_far)
+        else:
+            # Black is the current player
+            lst_of_lost_black = [subtree.lost_black_pcs for subtree in self.subtrees]
+            self.lost_black_pcs = sum(lst_of_lost_black) / len(lst_of_lost_black)
+
+            lost_white_pcs_so_far = []
+            for subtree in self.subtrees:
+                lost_pcs = subtree.lost_white_pcs
+
+                if is_capture(subtree.move_code):
+                    lost_white_pcs_so_far.append(lost_pcs + 1)
+                else:
+                    lost_white_pcs_so_far.append(lost_pcs)
+
+            self.lost_white_pcs = sum(lost_white_pcs_so_far) / len(lost_white_pcs_so_far)
+
+    def update_all_lost_pcs(self) -> None:
+        """Updates self.lost_black_pcs and self.lost_white_pcs for every node of this tree,
+        from the leaves up.
+
+        insert_move_sequence only updates the nodes it adds, so after many insertions the
+        averages higher up the tree can be out of date; this brings them all up to date.
+        """
+        # Every node is after its parent in this list, so going through it backwards updates
+        # the subtrees of each node before the node itself.
+        nodes = []
+        stack = [self]
+        while stack != []:
+            tree = stack.pop()
+            if tree.subtrees != []:
+                nodes.append(tree)
+                stack.extend(tree.subtrees)
+        for tree in reversed(nodes):
+            tree.update_lost_pcs()
+
+    def merge(self, other: CheckersGameTree) -> None:
+        """Adds every move sequence in other to this tree, as if the games in other had been
+        inserted after the games in this tree. Subtrees of other that are not in this tree are
+        moved into it, not copied. The lost pieces are not updated (see update_all_lost_pcs).
+
+        Preconditions:
+            - self.move_code == other.move_code
+            - self.is_white == other.is_white
+        """
+        for subtree in other.subtrees:
+            own_subtree = self.find_subtree_by_move(subtree.move_code)
+            if own_subtree is None:
+                self.subtrees.append(subtree)
+            else:
+                own_subtree.merge(subtree)
+
+    def insert_move_sequence(self, move_list: list[tuple[bool, AnyMove]], i: int) -> None:
+        """Inserts a move sequence into the game tree. The moves can be tuples or move codes.
+        Preconditions:
+            - 0 <= i < len(move_list)
+            - The last element in move_list represents the last move made in the game.
+            - All moves in move_list are valid moves.
+        """
+
+        if i >= len(move_list):
+            return None
+
+        # 1. Find the subtree corresponding to the current move.
+        subtree = self.find_subtree_by_move(move_list[i][1])
+
+        # 2. Check if that subtree exists (i.e in the game tree)
+        if subtree is None:
+            # Subtree is not in the game tree
+
+            if i == len(move_list) - 1:
+                # Expecting this to be the last item in move_list.
+                new_tree = CheckersGameTree(not move_list[i][0],  # Next player
+                                            move_list[i][1])  # previous player's move
+            else:
+                new_tree = CheckersGameTree(move_list[i + 1][0],  # Next player
+                                            move_list[i][1])  # previous player's move
+
+            assert move_list[i][0] == self.is_white  # Make sure we have the same player.
+
+            # Add the rest of the move_list as subtrees to the new subtree we just made
+            new_tree.insert_move_sequence(move_list, i + 1)
+
+            # Add the new tree as a subtree.
+            self.add_subtree(new_tree)
+
+        else:
+            # Subtree is in the game tree. We need to continue recursing through the game
+            # tree without making any changes.
+            subtree.insert_move_sequence(move_list, i + 1)
+
+    def insert_move_sequences(self, list_of_games: list[list[tuple[bool, AnyMove]]]) -> None:
+        """Inserts many move sequences into the game tree at once. The moves can be tuples or
+        move codes.
+
+        This makes the same tree as calling insert_move_sequence for each game in order, but
+        without recursion, and once a game leaves the tree the rest of its moves are added
+        without being looked for. The lost pieces are only worked out once, for the whole
+        tree, at the end (see update_all_lost_pcs), instead of every time a subtree is added.
+
+        >>> games = exploring_player_runner(20, seed=13)[1]
+        >>> one_at_a_time, at_once = CheckersGameTree(True, None), CheckersGameTree(True, None)
+        >>> for game in games:
+        ...     one_at_a_time.insert_move_sequence(game, 0)
+        >>> one_at_a_time.update_all_lost_pcs()
+        >>> at_once.insert_move_sequences(games)
+        >>> str(one_at_a_time) == str(at_once)
+        True
+
+        Preconditions:
+            - self is the root of the game tree (the games start from this tree's position)
+            - All moves in list_of_games are valid moves.
+        """
+        encode = CODEC.encode
+        for move_list in list_of_games:
+            tree = self
+            i = 0
+            # Follow the moves that are already in the tree
+            while i < len(move_list):
+                code = encode(move_list[i][1])
+                for subtree in tree.subtrees:
+                    if subtree.move_code == code:
+                        tree = subtree
+                        break
+                else:
+                    break
+                i += 1
+
+            # The rest of the moves are new, so they don't need to be looked for
+            while i < len(move_list):
+                if i == len(move_list) - 1:
+                    new_tree = CheckersGameTree(not move_list[i][0], move_list[i][1])
+                else:
+                    new_tree = CheckersGameTree(move_list[i + 1][0], move_list[i][1])
+                tree.subtrees.append(new_tree)
+                tree = new_tree
+                i += 1
+
+        self.update_all_lost_pcs()
+
+    def find_subtree_by_move(self, move: AnyMove) -> Optional[CheckersGameTree]:
+        """Finds the subtree corresponding to the input move, which can be a tuple or a move code.
+        Return None if there is no such subtree.
+        """
+        code = CODEC.encode(move)
+        for subtree in self.subtrees:
+            if subtree.move_code == code:
+                return subtree
+
+        return None
+
+    def __str__(self) -> str:
+        """Return a string representation of this tree.
+        """
+        return self._str_indented(0)
+
+    def _str_indented(self, depth: int) -> str:
+        """Return an indented string representation of this tree.
+        The indentation level is specified by the <depth> parameter.
+        """
+        if self.is_white:
+            turn_desc = "White's move"
+        else:
+            turn_desc = "Black's move"
+
+        move_desc = f'{self.move}, B: {self.lost_black_pcs}, W: {self.lost_white_pcs} ' \
+                    f'-> {turn_desc}\n'
+        s = '  ' * depth + move_desc
+        if self.subtrees == []:
+            return s
+        else:
+            for subtree in self.subtrees:
+                s += subtree._str_indented(depth + 1)
+            return s
+
+
+class ExploringPlayer(Player):
+    """
+    A player that makes moves that have not been made before using a GameTree.
+    Instance Attribute:
+        - _game_tree: The game tree that ExploringPlayer uses to make moves
+    """
+    game_tree: CheckersGameTree
+
+    def __init__(self, game_tree: CheckersGameTree):
+        self.game_tree = game_tree
+
+    def make_move(self, game: Checkers, previous_move: tuple[str, str, str],
+                  continuing_from_previous_move: bool) -> tuple[str, str, str]:
+        """Makes a random move that is not in the game_tree. If all valid moves are in the
+        game tree, it makes a random move."""
+        if self.game_tree is not None and previous_move != ('', '', ''):
+            self.game_tree = self.game_tree.find_subtree_by_move(previous_move)
+        # Already found by run_game for its winner check (see TurnContext)
+        valid_moves = game.get_turn_moves(previous_move, continuing_from_previous_move)
+        if self.game_tree is not None:
+            explored = {subtree.move_code for subtree in self.game_tree.subtrees}
+            moves_not_in_game_tree = [move for move in valid_moves
+                                      if CODEC.code_of[move] not in explored]
+            if moves_not_in_game_tree != []:
+                return self.rng.choice(moves_not_in_game_tree)
+        return self.rng.choice(valid_moves)
+
+
+def exploring_player_runner(n: int, batch_size: int = 0, processes: int = 1,
+                            seed: Optional[int] = None, first_game: int = 0,
+                            shards: Optional[int] = None) -> \
+        tuple[CheckersGameTree, list[list[tuple[bool, int]]]]:
+    """Runs run_games n times to build up the game tree using ExploringPlayers and a blank
+    game tree.
+    Returns two items, the built up game tree and a list of lists. Each sublist within the
+    list represents all the moves played in one game and who made each move. The format of the
+    sublist is the same format as the list returned in run_game() from
+    checkers_game_with_pygame_final.py with encode_moves=True, so each move is a move code.
+
+    If batch_size is more than 0, the games are played batch_size at a time with
+    checkers_batch instead (see _batch_exploring_runner), which needs NumPy.
+
+    If shards is more than 1, the games are split into that many shards, which are played by
+    a pool of processes processes (see parallel_exploring_runner). shards is processes if it
+    is not given. The games of one shard don't see the trees of the others, so the games (and
+    the tree) depend on the number of shards, but not on the number of processes.
+
+    Each game makes its random moves with its own generator, game_rng(seed, game number),
+    where the games are numbered from first_game. If seed is not given, a random one is used.
+    The lost pieces of the returned tree are up to date (see update_all_lost_pcs), so it is
+    the same as the tree that its games are loaded into by build_game_tree_from_list.
+
+    >>> game_tree, games = exploring_player_runner(10, seed=5)
+    >>> str(game_tree) == str(build_game_tree_from_list(games))
+    True
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if shards is None:
+        shards = processes
+    if shards > 1:
+        return parallel_exploring_runner(n, processes, batch_size, seed, first_game, shards)
+    if batch_size > 0:
+        return _batch_exploring_runner(n, batch_size, seed, first_game)
+
+    all_move_sequences = []
+    game_tree = CheckersGameTree(True, None)
+    white_player = ExploringPlayer(game_tree)
+    black_player = ExploringPlayer(game_tree)
+    for i in range(0, n):
+        move_sequence = run_game(white_player, black_player, encode_moves=True,
+                                 rng=game_rng(seed, first_game + i))[1]
+        game_tree.insert_move_sequence(move_sequence, 0)
+        all_move_sequences.append(move_sequence)
+        white_player.game_tree = game_tree
+        black_player.game_tree = game_tree
+    game_tree.update_all_lost_pcs()
+    return (game_tree, all_move_sequences)
+
+
+def _batch_exploring_runner(n: int, batch_size: int, seed: int, first_game: int) -> \
+        tuple[CheckersGameTree, list[list[tuple[bool, int]]]]:
+    """Does the same as exploring_player_runner, but plays batch_size games at a time with
+    BatchCheckers. The games in a batch share one generator, made from seed and the number of
+    the first game in the batch.
+
+    Each game follows its own moves down the game tree, and while it is still in the tree it
+    makes a random move that is not in the tree yet, if there is one. The games in a batch are
+    only added to the tree once the whole batch is over.
+    """
+    # Imported here, so that the rest of this module can be used without NumPy
+    import numpy as np
+    from checkers_batch import BatchCheckers, random_choices
+
+    all_move_sequences = []
+    game_tree = CheckersGameTree(True, None)
+    for first in range(0, n, batch_size):
+        rng = np.random.default_rng([seed, first_game + first])
+        batch = BatchCheckers(min(batch_size, n - first))
+        table = batch.table
+        # The node of the game tree that each game has reached, or None if it has left the tree
+        nodes = [game_tree] * len(batch)
+
+        def choose(_: BatchCheckers, valid: np.ndarray) -> np.ndarray:
+            unexplored = valid.copy()
+            for g, node in enumerate(nodes):
+                if node is not None:
+                    unexplored[g, [table.column_of[subtree.move_code]
+                                   for subtree in node.subtrees]] = False
+            columns = np.where(unexplored.any(axis=1), random_choices(unexplored, rng),
+                               random_choices(valid, rng))
+            for g, node in enumerate(nodes):
+                if node is not None and columns[g] >= 0:
+                    nodes[g] = node.find_subtree_by_move(int(table.codes[columns[g]]))
+            return columns
+
+        batch.play(choose, rng)
+        for _, move_sequence in batch.get_results(encode_moves=True):
+            game_tree.insert_move_sequence(move_sequence, 0)
+            all_move_sequences.append(move_sequence)
+    game_tree.update_all_lost_pcs()
+    return (game_tree, all_move_sequences)
+
+
+def parallel_exploring_runner(n: int, processes: int, batch_size: int = 0,
+                              seed: Optional[int] = None, first_game: int = 0,
+                              shards: Optional[int] = None) -> \
+        tuple[CheckersGameTree, list[list[tuple[bool, int]]]]:
+    """Does the same as exploring_player_runner, but splits the n games into shards shards
+    (processes shards if it is not given) and plays them at the same time in a pool of
+    processes processes.
+
+    Each shard is a range of game numbers, starting from first_game, and builds its own game
+    tree starting from a blank one. Each game uses the same generator as it would in a serial
+    run (see game_rng), but it only sees the games of its own shard, so the games are not the
+    same as in a serial run unless there is one shard. The trees are then merged in order of
+    the shards and their lost pieces brought up to date, so the result only depends on the
+    number of shards: it is the same as playing the shards one after another with
+    explore_shard and building one tree from all their games, which is what is done when
+    processes is 1. The returned move sequences are in the same order. A shard can also be
+    played again on its own, on any machine.
+
+    Preconditions:
+        - processes >= 1
+        - shards is None or shards >= 1
+
+    >>> serial = parallel_exploring_runner(12, 1, seed=3, shards=3)
+    >>> parallel = parallel_exploring_runner(12, 3, seed=3)
+    >>> serial[1] == parallel[1] and str(serial[0]) == str(parallel[0])
+    True
+    """
+    if seed is None:
+        seed = random.getrandbits(32)
+    if shards is None:
+        shards = processes
+    shard_list = []
+    for i in range(shards):
+        num_games = n // shards + (i < n % shards)
+        shard_list.append((first_game, num_games, batch_size, seed))
+        first_game += num_games
+
+    if processes > 1:
+        with multiprocessing.Pool(min(processes, shards)) as pool:
+            results = pool.map(explore_shard, shard_list)
+    else:
+        results = [explore_shard(shard) for shard in shard_list]
+
+    game_tree = CheckersGameTree(True, None)
+    all_move_sequences = []
+    for shard_tree, move_sequences in results:
+        game_tree.merge(shard_tree)
+        all_move_sequences.extend(move_sequences)
+    game_tree.update_all_lost_pcs()
+    return (game_tree, all_move_sequences)
+
+
+def explore_shard(shard: tuple[int, int, int, int]) -> \
+        tuple[CheckersGameTree, list[list[tuple[bool, int]]]]:
+    """Plays one shard of parallel_exploring_runner: shard is (the number of its first game,
+    the number of games, batch_size, seed), and the game tree and move sequences of those
+    games are returned.
+    """
+    first_game, num_games, batch_size, seed = shard
+    return exploring_player_runner(num_games, batch_size, seed=seed, first_game=first_game,
+                                   shards=1)
+
+
+def write_moves_to_csv(filename: str, list_of_games: list[list[tuple[bool, AnyMove]]]) -> None:
+    """This function takes in a csv file and list of lists, where each sublist represents
+    the moves made in a single game, and writes this list of lists into the csv file.
+    The moves can be tuples or move codes. Each move is written as the single integer
+    code * 2 + is_white (see move_to_cell).
+    Precondition:
+        - filename is a valid file path to a file that exists
+        - list_of_games != []
+        - all(moves != [] for moves in list_of_games)
+        - The move sequences in list_of_games are all the moves in a single game, from start to
+        finish.
+        - Every move in move in the sublists of list_of_games are valid moves.
+    """
+    with open(filename, 'w', newline='') as csvfile:
+        writer = csv.writer(csvfile)
+
+        for move_seq in list_of_games:
+            move_list = [move_to_cell(move[0], move[1]) for move in move_seq]
+            writer.writerow(move_list)
+
+
+def read_moves_from_csv(filename: str, as_codes: bool = False) -> \
+        list[list[tuple[bool, AnyMove]]]:
+    """Returns a list of lists, where each sublist represents the moves made
+    in a single game, read from a csv file with the path filename.
+    If as_codes is True, the moves are move codes instead of tuples.
+    Files written in the older "(1, 'a4  b3')" format can still be read."""
+
+    list_of_games = []
+
+    with open(filename, newline='') as csvfile:
+        reader = csv.reader(csvfile)
+
+        for row in reader:
+            if as_codes and row != [] and not row[0].startswith('('):
+                # Each cell is code * 2 + is_white (see move_to_cell)
+                move_sequence = [(bool(cell & 1), cell >> 1) for cell in map(int, row)]
+            else:
+                move_sequence = [cell_to_move(cell, as_codes) for cell in row]
+            list_of_games.append(move_sequence)
+
+    return list_of_games
+
+
+def move_to_cell(is_white: bool, move: AnyMove) -> str:
+    """Converts a move and the player who made it into a csv cell.
+
+    >>> cell_to_move(move_to_cell(True, ('c4', 'd3', 'e2')), False)
+    (True, ('c4', 'd3', 'e2'))
+    """
+    return str(CODEC.encode(move) * 2 + int(is_white))
+
+
+def cell_to_move(cell: str, as_codes: bool) -> tuple[bool, AnyMove]:
+    """Converts a csv cell into the player who made the move and the move, as a move code if
+    as_codes is True and as a tuple otherwise.
+
+    >>> cell_to_move("(1, 'a4  b3')", False)
+    (True, ('a4', '', 'b3'))
+    """
+    if cell.startswith('('):
+        # The older format, where each cell is like "(1, 'a4  b3')"
+        is_white = bool(int(cell[1]))
+        code = CODEC.code_of[str_to_move(cell[5: 11])]
+    else:
+        is_white = bool(int(cell) % 2)
+        code = int(cell) // 2
+    if as_codes:
+        return (is_white, code)
+    return (is_white, CODEC.move_of[code])
+
+
+def move_to_str(move: tuple[str, str, str]) -> str:
+    """Takes in a move and converts it to a string"""
+    if move[1] == '':
+        capture = '  '
+    else:
+        capture = move[1]
+
+    return move[0] + capture + move[2]
+
+
+def str_to_move(str_move: str) -> tuple[str, str, str]:
+    """Takes in a string and converts into a move."""
+    if str_move[2: 4] == '  ':
+        capture = ''
+    else:
+        capture = str_move[2: 4]
+
+    return (str_move[0: 2], capture, str_move[4:])
+
+
+def build_game_tree_from_list(list_of_games: list[list[tuple[bool, AnyMove]]]) -> \
+        CheckersGameTree:
+    """Returns a built up game tree using the move sequences in list_of_games. list_of_games
+    is a list of lists, where each sublist is the move sequence from a single game.
+    The games are all loaded at once with insert_move_sequences.
+    Precondition:
+        - list_of_games != []
+        - all(moves != [] for moves in list_of_games)
+        - The move sequences in list_of_games are all the moves in a single game, from start to
+        finish.
+        - Every move in move in the sublists of list_of_games are valid moves.
+    """
+    game_tree = CheckersGameTree(STARTING_PLAYER, None)
+    game_tree.insert_move_sequences(list_of_games)
+    return game_tree
+
+# if __name__ == '__main__':
+#     # Draw
+#     moves = [(True, ('d5', '', 'c4')), (False, ('c2', '', 'd3')), (True, ('e6', '', 'd5')),
+#              (False, ('e2', '', 'f3')), (True, ('c4', 'd3', 'e2')), (False, ('f1', 'e2', 'd3')),
+#              (True, ('f5', '', 'e4')), (False, ('d3', 'e4', 'f5')), (True, ('d5', '', 'e4')),
+#              (False, ('f3', 'e4', 'd5')), (True, ('c6', 'd5', 'e4')), (False, ('a2', '', 'b3')),
+#              (True, ('b5', '', 'a4')), (False, ('d1', '', 'e2')), (True, ('a4', 'b3', 'c2')),
+#              (False, ('b1', 'c2', 'd3')), (True, ('e4', 'd3', 'c2')), (False, ('f5', '', 'e6')),
+#              (True, ('c2', '', 'd1')), (False, ('e2', '', 'd3')), (True, ('d1', '', 'e2')),
+#              (False, ('d3', '', 'e4')), (True, ('e2', '', 'd3')), (False, ('e6', '', 'f5')),
+#              (True, ('a6', '', 'b5')), (False, ('f5', '', 'e6')), (True, ('d3', 'e4', 'f5')),
+#              (False, ('e6', '', 'd5')), (True, ('b5', '', 'c4')), (False, ('d5', 'c4', 'b3')),
+#              (True, ('f5', '', 'e6')), (False, ('b3', '', 'c2')), (True, ('e6', '', 'f5')),
+#              (False, ('c2', '', 'b1')), (True, ('f5', '', 'e4'))]
+#
+#     # White Wins
+#     moves_2 = [(True, ('f5', '', 'e4')), (False, ('e2', '', 'd3')), (True, ('b5', '', 'c4')),
+#                (False, ('d3', 'c4', 'b5')), (True, ('c6', 'b5', 'a4')), (False, ('c2', '', 'd3')),
+#                (True, ('e4', 'd3', 'c2')), (False, ('b1', 'c2', 'd3')), (True, ('a6', '', 'b5')),
+#                (False, ('d3', '', 'c4')), (True, ('b5', 'c4', 'd3')), (False, ('f1', '', 'e2')),
+#                (True, ('d3', 'e2', 'f1')), (False, ('d1', '', 'c2')), (True, ('e6', '', 'f5')),
+#                (False, ('c2', '', 'd3')), (True, ('d5', '', 'c4')), (False, ('d3', 'c4', 'b5')),
+#                (True, ('f5', '', 'e4')), (False, ('a2', '', 'b3')), (True, ('a4', 'b3', 'c2')),
+#                (False, ('b5', '', 'c6')), (True, ('e4', '', 'f3')), (False, ('c6', '', 'b5')),
+#                (True, ('f3', '', 'e2')), (False, ('b5', '', 'c4')), (True, ('e2', '', 'd1')),
+#                (False, ('c4', '', 'd5')), (True, ('d1', '', 'e2')), (False, ('d5', '', 'c4')),
+#                (True, ('e2', '', 'd3')), (False, ('c4', 'd3', 'e2')), (True, ('f1', 'e2', 'd3'))]
+#
+#     # Black Wins
+#     moves_3 = [(True, ('d5', '', 'c4')), (False, ('c2', '', 'd3')), (True, ('c4', '', 'b3')),
+#                (False, ('a2', 'b3', 'c4')), (True, ('b5', '', 'a4')), (False, ('c4', '', 'b5')),
+#                (True, ('a6', 'b5', 'c4')), (False, ('d3', 'c4', 'b5')), (True, ('a4', '', 'b3')),
+#                (False, ('e2', '', 'd3')), (True, ('c6', 'b5', 'a4')), (False, ('f1', '', 'e2')),
+#                (True, ('e6', '', 'd5')), (False, ('d3', '', 'c4')), (True, ('d5', '', 'e4')),
+#                (False, ('e2', '', 'd3')), (True, ('e4', 'd3', 'c2')), (False, ('b1', 'c2', 'd3')),
+#                (True, ('f5', '', 'e4')), (False, ('d3', 'e4', 'f5')), (True, ('b3', '', 'c2')),
+#                (False, ('d1', 'c2', 'b3')), (True, ('a4', 'b3', 'c2')), (False, ('c4', '', 'd5')),
+#                (True, ('c2', '', 'b1')), (False, ('d5', '', 'e6')), (True, ('b1', '', 'a2')),
+#                (False, ('e6', '', 'd5')), (True, ('a2', '', 'b3')), (False, ('f5', '', 'e6')),
+#                (True, ('b3', '', 'a4')), (False, ('d5', '', 'c4')), (True, ('a4', '', 'b3')),
+#                (False, ('c4', 'b3', 'a2'))]
+#
+#     test_tree = CheckersGameTree(STARTING_PLAYER, START_MOVE)
+#     test_tree.insert_move_sequence(moves, 0)
+#     test_tree.insert_move_sequence(moves_2, 0)
+#     test_tree.insert_move_sequence(moves_3, 0)
+#     print(test_tree)
+#
+#     # Test Case 2:
+#     tree, move_lists = exploring_player_runner(10)
+#     print(move_lists)
+#     write_moves_to_csv('data/test_csv.csv', move_lists)
+#     move_lists_2 = read_moves_from_csv('data/test_csv.csv')
+#     print(move_lists_2)
+#     # Need to clear the test_csv.csv file before running this assert.
+#     assert move_lists_2 == move_lists
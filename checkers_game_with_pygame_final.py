@@ -14,11 +14,17 @@ permission of the aforementioned group.
 This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
 """
 
-from typing import Dict, Optional, Tuple, List
+from typing import Dict, Generator, Iterator, Optional, Tuple, List
+import json
+import os
 import random
 import pygame
 from pygame.colordict import THECOLORS
 import time
+from checkers_topology import BoardTopology, get_topology, NO_SQUARE
+from checkers_zobrist import ZobristKeys, get_zobrist_keys, piece_kind
+from checkers_moves import AnyMove, MoveCodec, get_move_codec, is_compound
+from checkers_tablebase import get_tablebase
 
 DIMENSION = 6
 RECT_SIZE = 100
@@ -28,8 +34,13 @@ START_POS_WHITE = {'a6', 'b5', 'c6', 'd5', 'e6', 'f5'}
 VALID_POSITIONS = [letter + str(2 * x) for x in range(1, 4) for letter in 'ace'] + \
                   [letter + str(2 * x + 1) for x in range(0, 3) for letter in 'bdf']
 PLAYER_COLORS = ('white', 'black')
+# The tables for the DIMENSION x DIMENSION board that the pygame interface draws
+TOPOLOGY = get_topology(DIMENSION)
+ZOBRIST = get_zobrist_keys(DIMENSION)
 
 MOVE_LIMIT = 35
+# The most positions a board remembers the compound moves of before it forgets them all.
+COMPOUND_MEMO_SIZE = 50000
 PLAYER_TYPES = ['Random Player', 'Aggressive Player', 'Defensive Player', 'Human Player']
 
 
@@ -53,15 +64,17 @@ class Piece:
         self.white = is_white
         self.position = start_pos
 
-    def crown_piece(self) -> None:
-        """This method changes the crown attribute so that self is now crowned.
+    def crown_piece(self, dimension: int = DIMENSION) -> None:
+        """This method changes the crown attribute so that self is now crowned, if self is
+    on the last row for its color of a board with the given number of rows.
     self can now move in all diagonal adjacent squares.
     """
+        row = int(self.position[1:])
         if self.white is True:
-            if self.position in ['b1', 'd1', 'f1']:
+            if row == 1:
                 self.is_crowned = True
         else:
-            if self.position in ['a6', 'c6', 'e6']:
+            if row == dimension:
                 self.is_crowned = True
 
 
@@ -71,20 +84,69 @@ class Checkers:
       - white_pieces: A dictionary mapping positions of the white pieces to the pieces themselves.
       - black_pieces: A dictionary mapping positions of the black pieces to the pieces themselves.
       - is_white_move: Whether white is the current player.
+      - dimension: The number of rows (and columns) of the board, such as 6, 8 or 10.
+      - move_limit: The number of moves after which the game is a draw.
+      - topology: The precomputed tables for a board of this size.
+      - zobrist: The Zobrist numbers for a board of this size.
+      - codec: Converts moves to and from move codes (see checkers_moves) for a board of this
+        size. Every method that takes a move also accepts its code.
+      - zobrist_key: A 64-bit Zobrist key of this position (see checkers_zobrist). It is kept
+        up to date by make_move, capture, crown_piece, push and pop.
+      - turn: What run_game has worked out about the current move (see TurnContext), or None
+        if the board isn't being played on by run_game.
+
+  Besides single moves, the board can list whole turns as compound moves (see
+  get_compound_moves), so that a multi-jump is one choice instead of one choice per jump.
+
+  The board also keeps track of which pieces can capture, updating only the squares near each
+  move, so whether the current player has to capture is known without looking at every piece.
   Representation Invariants:
       - all(pos == self.white_pieces[pos].position for pos in self.white_pieces)
       - all(pos == self.black_pieces[pos].position for pos in self.black_pieces)
-      - 0 <= len(self.white_pieces) <= 6
-      - 0 <= len(self.black_pieces) <= 6
+      - 0 <= len(self.white_pieces) <= len(self.topology.white_start)
+      - 0 <= len(self.black_pieces) <= len(self.topology.black_start)
   """
     white_pieces: Dict[str, Piece]
     black_pieces: Dict[str, Piece]
     is_white_move: bool
+    dimension: int
+    move_limit: int
+    topology: BoardTopology
+    zobrist: ZobristKeys
+    codec: MoveCodec
+    turn: Optional['TurnContext']
     screen: pygame.Surface
+    # Private Instance Attributes:
+    #   - _piece_key: The XOR of the Zobrist numbers of all the pieces on the board. The side to
+    #     move is added in zobrist_key, so that changing is_white_move is always O(1).
+    #   - _occupied: _occupied[is_white] has bit i set if there is a piece of that color on
+    #     square i (see checkers_topology).
+    #   - _crowned: Has bit i set if the piece on square i is crowned.
+    #   - _capturers: _capturers[is_white] has bit i set if the piece of that color on square i
+    #     has a capture it can make.
+    #   - _undo_stack: One entry for each move made with push that has not been undone with
+    #     pop yet. Each entry is (move, the captured piece or None, whether the moved piece was
+    #     crowned by the move, whether it was white's move before the move, and the _piece_key
+    #     and bitmasks before the move).
+    #   - _compound_moves: The compound moves already found, by position (see
+    #     find_compound_moves).
+    _piece_key: int
+    _occupied: List[int]
+    _crowned: int
+    _capturers: List[int]
+    _undo_stack: List[Tuple[tuple, Optional[Piece], bool, bool, int, tuple]]
+    _compound_moves: Dict[object, List[tuple]]
 
     def __init__(self, white: Optional[Dict[str, Piece]] = None,
                  black: Optional[Dict[str, Piece]] = None,
-                 curr_player: Optional[bool] = None) -> None:
+                 curr_player: Optional[bool] = None, dimension: int = DIMENSION,
+                 move_limit: int = MOVE_LIMIT) -> None:
+        self.dimension = dimension
+        self.move_limit = move_limit
+        self.topology = get_topology(dimension)
+        self.zobrist = get_zobrist_keys(dimension)
+        self.codec = get_move_codec(dimension)
+        self.turn = None
 
         # Mainly for being able to copy the board
         if white is not None and black is not None and curr_player is not None:
@@ -94,13 +156,44 @@ class Checkers:
 
         else:  # For starting a new game.
             self.white_pieces = {pos: Piece(is_white=True, start_pos=pos)
-                                 for pos in START_POS_WHITE}
+                                 for pos in self.topology.white_start}
 
             self.black_pieces = {pos: Piece(is_white=False, start_pos=pos)
-                                 for pos in START_POS_BLACK}
+                                 for pos in self.topology.black_start}
 
             self.is_white_move = True
 
+        self._undo_stack = []
+        self._compound_moves = {}
+        self._piece_key = 0
+        for pieces in (self.white_pieces, self.black_pieces):
+            for pos, piece in pieces.items():
+                self._piece_key ^= self._piece_number(piece, pos)
+
+        self._occupied = [0, 0]
+        self._crowned = 0
+        for pieces in (self.white_pieces, self.black_pieces):
+            for pos, piece in pieces.items():
+                bit = 1 << self.topology.index_of[pos]
+                self._occupied[piece.white] |= bit
+                if piece.is_crowned:
+                    self._crowned |= bit
+        self._capturers = [0, 0]
+        self._refresh_capturers(self._occupied[False] | self._occupied[True])
+
+    @property
+    def zobrist_key(self) -> int:
+        """The Zobrist key of this position, including whose move it is."""
+        if self.is_white_move:
+            return self._piece_key ^ self.zobrist.white_to_move
+        return self._piece_key
+
+    def copy(self) -> 'Checkers':
+        """Return a copy of this board that does not share any pieces with it."""
+        white = {pos: _copy_piece(piece) for pos, piece in self.white_pieces.items()}
+        black = {pos: _copy_piece(piece) for pos, piece in self.black_pieces.items()}
+        return Checkers(white, black, self.is_white_move, self.dimension, self.move_limit)
+
     def set_screen(self, screen: pygame.Surface) -> None:
         """
         Sets the ..
@@ -115,11 +208,36 @@ class Checkers:
             return 'white'
         elif len(self.white_pieces) == 0:
             return 'black'
-        elif move_count == MOVE_LIMIT or self.get_valid_moves() == []:
+        elif move_count == self.move_limit or not self.has_valid_move():
             return 'draw'
         else:
             return None
 
+    def probe_tablebase(self, move_count: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """Return the winner of the game with perfect play from here ('white', 'black' or
+        'draw', like get_winner) and the number of moves until it ends, from the endgame
+        tablebases (see checkers_tablebase). Return None if this position isn't in them:
+        it has too many pieces, the tablebases haven't been generated, or the current player
+        is in the middle of a multi-jump in a game played by run_game.
+        If move_count, the number of moves made so far, is given, a win that would come after
+        the move limit is a draw.
+        """
+        turn = self.turn
+        if turn is not None and turn.key == self.zobrist_key and turn.piece is not None:
+            return None
+        return get_tablebase(self.dimension).probe(self, move_count)
+
+    def has_capture(self) -> bool:
+        """Return whether the current player has a capture they can make (and so must make one).
+        """
+        return self._capturers[self.is_white_move] != 0
+
+    def has_valid_move(self) -> bool:
+        """Return whether the current player has any valid move, without finding them all."""
+        for _ in self.iter_valid_moves():
+            return True
+        return False
+
     def make_move(self, move: tuple[str, str, str]) -> None:
         """
         Makes a move based on the tuple, move.
@@ -130,25 +248,17 @@ class Checkers:
         Preconditions:
             - move[2] not in self.white_pieces or move[2] not in self.black_pieces
         """
-        if self.is_white_move:
-            piece = self.white_pieces[move[0]]
-            if move[1] != '':
-                #   the piece on that position is captured and removed from the game
-                self.capture(move[1])
-
-            self.white_pieces[move[2]] = piece
-            piece.position = move[2]
-            self.white_pieces.pop(move[0])
+        if isinstance(move, int):
+            move = self.codec.move_of[move]
+        if move[1] != '':
+            #   the piece on that position is captured and removed from the game
+            self._take_piece(move[1])
 
+        if self.is_white_move:
+            self._move_piece(self.white_pieces, move)
         else:
-            piece = self.black_pieces[move[0]]
-            if move[1] != '':
-                #   the piece on that position is captured and removed from the game
-                self.capture(move[1])
-
-            self.black_pieces[move[2]] = piece
-            piece.position = move[2]
-            self.black_pieces.pop(move[0])
+            self._move_piece(self.black_pieces, move)
+        self._update_capturers(move)
 
     def make_move_pygame(self, move: tuple[str, str, str], screen) -> None:
         """
@@ -160,74 +270,197 @@ class Checkers:
         Preconditions:
             - move[2] not in self.white_pieces or move[2] not in self.black_pieces
         """
+        self.make_move(move)
         if self.is_white_move:
-            piece = self.white_pieces[move[0]]
-            if move[1] != '':
-                #   the piece on that position is captured and removed from the game
-                self.capture(move[1])
-                # handles the pygame
-                y, x = pos_to_square(move[1])
-                rect = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
-                                   (RECT_SIZE, RECT_SIZE))
-                pygame.draw.rect(screen, (84, 84, 84), rect, width=0)
-            self.white_pieces[move[2]] = piece
-            piece.position = move[2]
-            self.white_pieces.pop(move[0])
-
-            # handles the pygame
-            y, x = pos_to_square(move[0])
-            rect2 = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
-                                (RECT_SIZE, RECT_SIZE))
-            pygame.draw.rect(screen, (84, 84, 84), rect2, width=0)
-
-            # draws the piece again
-            if piece.is_crowned:
-                draw_crown(move, screen, (245, 245, 245))
-            else:
-                y, x = pos_to_square(move[2])
-                start = (
-                    OFFSET + RECT_SIZE // 2 + y * RECT_SIZE,
-                    OFFSET + RECT_SIZE // 2 + x * RECT_SIZE)
-                pygame.draw.circle(screen, (0, 0, 0), start, 31, 1)
-                pygame.draw.circle(screen, (245, 245, 245), start, 30, 0)
+            piece = self.white_pieces[move[2]]
+            color = (245, 245, 245)
         else:
-            piece = self.black_pieces[move[0]]
-            if move[1] != '':
-                #   the piece on that position is captured and removed from the game
-                self.capture(move[1])
-                # handles the pygame
-                y, x = pos_to_square(move[1])
-                rect = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
-                                   (RECT_SIZE, RECT_SIZE))
-                pygame.draw.rect(screen, (84, 84, 84), rect, width=0)
-            self.black_pieces[move[2]] = piece
-            piece.position = move[2]
-            self.black_pieces.pop(move[0])
+            piece = self.black_pieces[move[2]]
+            color = (50, 50, 50)
 
+        if move[1] != '':
             # handles the pygame
-            y, x = pos_to_square(move[0])
-            rect2 = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
-                                (RECT_SIZE, RECT_SIZE))
-            pygame.draw.rect(screen, (84, 84, 84), rect2, width=0)
+            y, x = pos_to_square(move[1])
+            rect = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
+                               (RECT_SIZE, RECT_SIZE))
+            pygame.draw.rect(screen, (84, 84, 84), rect, width=0)
 
-            # draws the piece again
-            if piece.is_crowned:
-                draw_crown(move, screen, (50, 50, 50))
-            else:
-                y, x = pos_to_square(move[2])
-                start = (OFFSET + RECT_SIZE // 2 + y * RECT_SIZE,
-                         OFFSET + RECT_SIZE // 2 + x * RECT_SIZE)
-                pygame.draw.circle(screen, (0, 0, 0), start, 31, 1)
-                pygame.draw.circle(screen, (50, 50, 50), start, 30, 0)
+        # handles the pygame
+        y, x = pos_to_square(move[0])
+        rect2 = pygame.Rect((OFFSET + y * RECT_SIZE, OFFSET + x * RECT_SIZE),
+                            (RECT_SIZE, RECT_SIZE))
+        pygame.draw.rect(screen, (84, 84, 84), rect2, width=0)
+
+        # draws the piece again
+        if piece.is_crowned:
+            draw_crown(move, screen, color)
+        else:
+            y, x = pos_to_square(move[2])
+            start = (OFFSET + RECT_SIZE // 2 + y * RECT_SIZE,
+                     OFFSET + RECT_SIZE // 2 + x * RECT_SIZE)
+            pygame.draw.circle(screen, (0, 0, 0), start, 31, 1)
+            pygame.draw.circle(screen, color, start, 30, 0)
 
     def capture(self, position: str) -> None:
         """
         removes the piece that is on the given position from the game
         """
+        self._take_piece(position)
+        self._refresh_capturers(self.topology.nearby[self.topology.index_of[position]])
+
+    def crown_piece(self, position: str) -> None:
+        """Crowns the piece on the given position if it has reached the other side of the
+        board. Use this instead of Piece.crown_piece so that zobrist_key stays up to date.
+        """
+        if position in self.white_pieces:
+            piece = self.white_pieces[position]
+        else:
+            piece = self.black_pieces[position]
+        if not piece.is_crowned:
+            old_number = self._piece_number(piece, position)
+            piece.crown_piece(self.dimension)
+            if piece.is_crowned:
+                self._piece_key ^= old_number ^ self._piece_number(piece, position)
+                bit = 1 << self.topology.index_of[position]
+                self._crowned |= bit
+                self._refresh_capturers(bit)
+
+    def _take_piece(self, position: str) -> Piece:
+        """Removes the current player's opponent's piece on the given position and returns it,
+        without updating which pieces can capture."""
         if self.is_white_move:
-            self.black_pieces.pop(position)
+            piece = self.black_pieces.pop(position)
+        else:
+            piece = self.white_pieces.pop(position)
+        self._piece_key ^= self._piece_number(piece, position)
+        keep = ~(1 << self.topology.index_of[position])
+        self._occupied[piece.white] &= keep
+        self._crowned &= keep
+        return piece
+
+    def _move_piece(self, pieces: Dict[str, Piece], move: tuple[str, str, str]) -> Piece:
+        """Moves the piece in pieces from move[0] to move[2] and returns it, without updating
+        which pieces can capture."""
+        piece = pieces.pop(move[0])
+        pieces[move[2]] = piece
+        piece.position = move[2]
+        self._piece_key ^= self._piece_number(piece, move[0]) ^ self._piece_number(piece, move[2])
+        start = 1 << self.topology.index_of[move[0]]
+        changed = start | (1 << self.topology.index_of[move[2]])
+        self._occupied[piece.white] ^= changed
+        if self._crowned & start:
+            self._crowned ^= changed
+        return piece
+
+    def _piece_number(self, piece: Piece, position: str) -> int:
+        """Return the Zobrist number for piece being on the given position."""
+        kind = piece_kind(piece.white, piece.is_crowned)
+        return self.zobrist.pieces[kind][self.topology.index_of[position]]
+
+    def _update_capturers(self, move: tuple[str, str, str]) -> None:
+        """Updates which pieces can capture after a piece was moved from move[0] to move[2],
+        capturing the piece on move[1] if it is not ''."""
+        index_of = self.topology.index_of
+        nearby = self.topology.nearby
+        squares = nearby[index_of[move[0]]] | nearby[index_of[move[2]]]
+        if move[1] != '':
+            squares |= nearby[index_of[move[1]]]
+        self._refresh_capturers(squares)
+
+    def _refresh_capturers(self, squares: int) -> None:
+        """Updates whether the pieces on the squares in the bitmask squares can capture."""
+        occupied = self._occupied
+        everything = occupied[False] | occupied[True]
+        capturers = self._capturers
+        capturers[False] &= ~squares
+        capturers[True] &= ~squares
+        squares &= everything
+        jump_masks = self.topology.jump_masks
+        while squares:
+            bit = squares & -squares
+            squares ^= bit
+            white = occupied[True] & bit != 0
+            diff = occupied[not white]
+            jumps = jump_masks[bit.bit_length() - 1]
+            for i in _square_directions(white, self._crowned & bit != 0):
+                if jumps[i] is not None and diff & jumps[i][0] and not everything & jumps[i][1]:
+                    capturers[white] |= bit
+                    break
+
+    def push(self, move: tuple[str, str, str]) -> bool:
+        """Makes the move for the current player, crowns the moved piece if it reached the other
+        side of the board, and changes the current player unless the same piece can capture
+        again, just like a turn in run_game. Returns whether the same player moves again.
+
+        The move can be undone with pop, so a hypothetical line of play can be explored
+        without copying the board.
+        """
+        if isinstance(move, int):
+            move = self.codec.move_of[move]
+        was_white_move = self.is_white_move
+        old_state = (self._piece_key, tuple(self._occupied), self._crowned,
+                     tuple(self._capturers))
+        if was_white_move:
+            own_pieces, other_pieces = self.white_pieces, self.black_pieces
+        else:
+            own_pieces, other_pieces = self.black_pieces, self.white_pieces
+
+        captured = None
+        if move[1] != '':
+            captured = self._take_piece(move[1])
+        piece = self._move_piece(own_pieces, move)
+
+        crowned = False
+        if not piece.is_crowned:
+            self.crown_piece(move[2])
+            crowned = piece.is_crowned
+        self._update_capturers(move)
+
+        is_continued = captured is not None and \
+            self._capturers[was_white_move] >> self.topology.index_of[move[2]] & 1 == 1
+        if not is_continued:
+            self.is_white_move = not was_white_move
+
+        self._undo_stack.append((move, captured, crowned, was_white_move, old_state))
+        return is_continued
+
+    def pop(self) -> tuple[str, str, str]:
+        """Undoes the last move made with push and returns it.
+
+        Preconditions:
+            - a move has been made with push that has not been undone yet
+
+        Undoing a whole game of random moves gets back to the start:
+
+        >>> game, rng = Checkers(), random.Random(3)
+        >>> start = (board_snapshot(game), game.zobrist_key, game.get_valid_moves())
+        >>> played, continuing = [('', '', '')], False
+        >>> while game.get_winner(len(played) - 1) is None:
+        ...     played.append(rng.choice(game.get_turn_moves(played[-1], continuing)))
+        ...     continuing = game.push(played[-1])
+        >>> [game.pop() for _ in played[1:]] == played[:0:-1]
+        True
+        >>> (board_snapshot(game), game.zobrist_key, game.get_valid_moves()) == start
+        True
+        """
+        move, captured, crowned, was_white_move, old_state = self._undo_stack.pop()
+        self.is_white_move = was_white_move
+        self._piece_key, occupied, self._crowned, capturers = old_state
+        self._occupied = list(occupied)
+        self._capturers = list(capturers)
+        if was_white_move:
+            own_pieces, other_pieces = self.white_pieces, self.black_pieces
         else:
-            self.white_pieces.pop(position)
+            own_pieces, other_pieces = self.black_pieces, self.white_pieces
+
+        piece = own_pieces.pop(move[2])
+        own_pieces[move[0]] = piece
+        piece.position = move[0]
+        if crowned:
+            piece.is_crowned = False
+        if captured is not None:
+            other_pieces[move[1]] = captured
+        return move
 
     def get_neighbours(self, piece: Piece) -> list:
         """Returns the pieces diagonal to the piece. The list contains tuples where the
@@ -235,35 +468,27 @@ class Checkers:
         The first index in the tuple says 'none' if there is no piece, 'same' if the
         piece is the same colour, diff if the piece is a different colour. The second index contains
         the position"""
-        position = piece.position
-        # Gets the coordinates of the corners
-        top_right = chr(ord(position[0]) + 1) + str(int(position[1]) + 1)
-        top_left = chr(ord(position[0]) - 1) + str(int(position[1]) + 1)
-        bottom_right = chr(ord(position[0]) + 1) + str(int(position[1]) - 1)
-        bottom_left = chr(ord(position[0]) - 1) + str(int(position[1]) - 1)
-        # Puts the corners in a list
-        corners = [top_right, top_left, bottom_right, bottom_left]
+        positions = self.topology.positions
+        # The squares at the top right, top left, bottom right and bottom left corners
+        corners = self.topology.neighbours[self.topology.index_of[piece.position]]
+        if piece.white:
+            same_pieces, diff_pieces = self.white_pieces, self.black_pieces
+        else:
+            same_pieces, diff_pieces = self.black_pieces, self.white_pieces
         neighbours_so_far = []
-        for i in range(0, 4):
+        for corner in corners:
             # Means that it is not on the game board
-            if corners[i] not in VALID_POSITIONS:
+            if corner == NO_SQUARE:
                 neighbours_so_far.append(())
+                continue
+            position = positions[corner]
+            if position in same_pieces:
+                neighbours_so_far.append(('same', position))
+            elif position in diff_pieces:
+                neighbours_so_far.append(('diff', position))
             # The space is not occupied
-            elif (corners[i] not in self.white_pieces and
-                  corners[i] not in self.black_pieces):
-                neighbours_so_far.append(('none', corners[i]))
-            # The space is occupied by a white piece
-            elif corners[i] in self.white_pieces:
-                if piece.white:
-                    neighbours_so_far.append(('same', corners[i]))
-                else:
-                    neighbours_so_far.append(('diff', corners[i]))
-            # The space is occupied by a black piece
-            elif corners[i] in self.black_pieces:
-                if piece.white:
-                    neighbours_so_far.append(('diff', corners[i]))
-                else:
-                    neighbours_so_far.append(('same', corners[i]))
+            else:
+                neighbours_so_far.append(('none', position))
         return neighbours_so_far
 
     def get_valid_moves(self) -> List[tuple]:
@@ -272,81 +497,391 @@ class Checkers:
         otherwise, it contains the position of the piece captured, and the third is the final
         position
         """
+        return list(self.iter_valid_moves())
 
-        capture_moves = []
-        non_capture_moves = []
-        if self.is_white_move:
-            pieces_to_check = [self.white_pieces[piece] for piece in self.white_pieces]
-        else:
-            pieces_to_check = [self.black_pieces[piece] for piece in self.black_pieces]
-        for piece in pieces_to_check:
-            moves, is_capture = self.get_valid_move_piece(piece)
-            if is_capture:
-                capture_moves.extend(moves)
-            else:
-                non_capture_moves.extend(moves)
-        if capture_moves != []:
-            return capture_moves
+    def iter_valid_moves(self) -> Iterator[tuple]:
+        """Yields the valid moves for the current player one at a time, in the same format as
+        get_valid_moves, so a caller that only needs the first few moves can stop early.
+
+        Captures come first; since captures must be made, no other moves are yielded if there
+        are any. The pieces are visited in order of their squares. Moves may be pushed and
+        popped between yields, as long as the board is back to the same position when the next
+        move is asked for.
+        """
+        white = self.is_white_move
+        if white:
+            pieces = self.white_pieces
         else:
-            return non_capture_moves
+            pieces = self.black_pieces
+        positions = self.topology.positions
+
+        capturers = self._capturers[white]
+        if capturers != 0:
+            # Only the pieces that are known to have a capture need to be looked at.
+            while capturers:
+                low = capturers & -capturers
+                capturers ^= low
+                yield from self._piece_captures(pieces[positions[low.bit_length() - 1]])
+            return
+
+        # Found from the bitmasks, so that no lists are made for the pieces that have moves
+        own = self._occupied[white]
+        everything = self._occupied[False] | self._occupied[True]
+        neighbours = self.topology.neighbours
+        while own:
+            low = own & -own
+            own ^= low
+            square = low.bit_length() - 1
+            corners = neighbours[square]
+            for i in _square_directions(white, self._crowned & low != 0):
+                if corners[i] != NO_SQUARE and not everything >> corners[i] & 1:
+                    yield (positions[square], '', positions[corners[i]])
+
+    def get_turn_moves(self, previous_move: tuple[str, str, str],
+                       continuing_from_previous_move: bool) -> List[tuple]:
+        """Returns the moves the current player can make this turn, given the arguments a
+        Player's make_move is called with (see find_turn_moves). The returned list must not be
+        changed."""
+        return find_turn_moves(self, previous_move, continuing_from_previous_move)
+
+    def get_valid_move_codes(self) -> List[int]:
+        """Returns the codes of all the valid moves for a player (see checkers_moves), in the
+        same order as get_valid_moves."""
+        code_of = self.codec.code_of
+        return [code_of[move] for move in self.get_valid_moves()]
+
+    def get_compound_moves(self) -> List[tuple]:
+        """Returns all the valid turns for the current player as compound moves: tuples of
+        the single moves of the turn, in order. A turn without a multi-jump is a tuple of one
+        move, and a multi-jump is one tuple with every capture in it.
+        """
+        return list(find_compound_moves(self, self._compound_moves))
 
     def get_valid_move_piece(self, piece) -> Tuple[list, bool]:
         """Returns all the valid moves for a piece. The valid moves are stored as a tuple,
         where the first index is the initial position, the second is empty if no capture is made
         otherwise, it contains the position of the piece captured, and the third is the final
         position"""
+        capture_moves = self._piece_captures(piece)
+        if capture_moves != []:
+            return (capture_moves, True)
+        else:
+            return (self._piece_steps(piece), False)
+
+    def _piece_captures(self, piece: Piece) -> list:
+        """Returns all the captures that piece can make."""
+        square = self.topology.index_of[piece.position]
+        corners = self.topology.neighbours[square]
+        landings = self.topology.jumps[square]
+        positions = self.topology.positions
+        diff = self._occupied[not piece.white]
+        everything = self._occupied[False] | self._occupied[True]
+
         capture_moves = []
+        for i in _square_directions(piece.white, piece.is_crowned):
+            if landings[i] != NO_SQUARE and diff >> corners[i] & 1 and \
+                    not everything >> landings[i] & 1:
+                capture_moves.append((piece.position, positions[corners[i]],
+                                      positions[landings[i]]))
+        return capture_moves
+
+    def _piece_steps(self, piece: Piece) -> list:
+        """Returns all the moves without a capture that piece can make."""
+        corners = self.topology.neighbours[self.topology.index_of[piece.position]]
+        positions = self.topology.positions
+        everything = self._occupied[False] | self._occupied[True]
+
         non_capture_moves = []
-        corners = self.get_neighbours(piece)
-        # Checks the bottom two corners to see find valid moves.
-        if piece.white and not piece.is_crowned:
-            start = 2
-            end = 4
-        # Checks the top to corners to see valid moves
-        elif not (piece.white or piece.is_crowned):
-            start = 0
-            end = 2
-        # Checks all diagonals
+        for i in _square_directions(piece.white, piece.is_crowned):
+            if corners[i] != NO_SQUARE and not everything >> corners[i] & 1:
+                non_capture_moves.append((piece.position, '', positions[corners[i]]))
+        return non_capture_moves
+
+
+def find_compound_moves(game: Checkers, memo: Dict[object, List[tuple]]) -> List[tuple]:
+    """Return all the valid turns for the current player of game as compound moves (see
+    Checkers.get_compound_moves). game can be any board with push and pop, such as a
+    BitboardCheckers board.
+
+    The jumps are followed depth first with push and pop, and the turns found from each
+    position (and from each square a multi-jump can continue from) are saved in memo by
+    Zobrist key, so positions reached again are not searched again. The returned list must
+    not be changed.
+    """
+    key = game.zobrist_key
+    if key in memo:
+        return memo[key]
+
+    turns = []
+    for move in game.get_turn_moves(('', '', ''), False):
+        if move[1] == '':
+            turns.append((move,))
         else:
-            start = 0
-            end = 4
-        for i in range(start, end):
-            corner = corners[i]
-            if corner == ():
-                continue
-            elif corner[0] == 'none':
-                non_capture_moves.append((piece.position, '', corner[1]))
-            elif corner[0] == 'diff':
-                letter = chr(ord(corner[1][0]) - ord(piece.position[0]) + ord(corner[1][0]))
-                num = str(int(corner[1][1]) - int(piece.position[1]) + int(corner[1][1]))
-                check = letter + num
-                if check not in self.white_pieces and check not in self.black_pieces and \
-                        check in VALID_POSITIONS:
-                    capture_moves.append((piece.position, corner[1], check))
-        if capture_moves != []:
-            return (capture_moves, True)
+            if game.push(move):
+                turns.extend((move,) + rest for rest in find_jump_paths(game, move[2], memo))
+            else:
+                turns.append((move,))
+            game.pop()
+
+    if len(memo) >= COMPOUND_MEMO_SIZE:
+        memo.clear()
+    memo[key] = turns
+    return turns
+
+
+def find_turn_moves(game: Checkers, previous_move: tuple[str, str, str],
+                    continuing_from_previous_move: bool) -> List[tuple]:
+    """Return the moves the current player of game can make this turn: the captures the piece
+    on previous_move[2] can continue with if continuing_from_previous_move, and all the valid
+    moves otherwise. game can be any board with the same methods as Checkers.
+
+    If run_game has already found the moves for this position (see TurnContext), they are
+    returned without being found again.
+    """
+    turn = game.turn
+    if turn is not None and turn.key == game.zobrist_key \
+            and (turn.piece is not None) == continuing_from_previous_move:
+        return turn.legal_moves()
+    if continuing_from_previous_move:
+        if game.is_white_move:
+            piece = game.white_pieces[previous_move[2]]
+        else:
+            piece = game.black_pieces[previous_move[2]]
+        return game.get_valid_move_piece(piece)[0]
+    return game.get_valid_moves()
+
+
+def find_jump_paths(game: Checkers, position: str, memo: Dict[object, List[tuple]]) -> \
+        List[tuple]:
+    """Return every way the piece on position can finish the multi-jump it is making, as
+    tuples of captures.
+
+    Preconditions:
+        - the piece on position belongs to the current player and has a capture it can make
+    """
+    key = (game.zobrist_key, position)
+    if key in memo:
+        return memo[key]
+
+    if game.is_white_move:
+        piece = game.white_pieces[position]
+    else:
+        piece = game.black_pieces[position]
+    paths = []
+    for move in game.get_valid_move_piece(piece)[0]:
+        if game.push(move):
+            paths.extend((move,) + rest for rest in find_jump_paths(game, move[2], memo))
         else:
-            return (non_capture_moves, False)
+            paths.append((move,))
+        game.pop()
+
+    memo[key] = paths
+    return paths
+
+
+def _square_directions(white: bool, crowned: bool) -> Tuple[int, ...]:
+    """Returns the indices of the directions a piece of the given color and crown can move in,
+    out of the four directions in the order used by Checkers.get_neighbours."""
+    # Uncrowned white pieces move towards the bottom, and uncrowned black pieces towards the top.
+    if crowned:
+        return (0, 1, 2, 3)
+    elif white:
+        return (2, 3)
+    else:
+        return (0, 1)
+
+
+def _copy_piece(piece: Piece) -> Piece:
+    """Return a new piece with the same color, position and crown as piece."""
+    new_piece = Piece(piece.white, piece.position)
+    new_piece.is_crowned = piece.is_crowned
+    return new_piece
+
+
+class TurnContext:
+    """What run_game knows about one move of a game, worked out once and shared by the
+    players. run_game stores it in the board's turn attribute, so players can get the legal
+    moves with Checkers.get_turn_moves instead of finding them again.
+
+    Instance Attributes:
+        - move_count: The number of moves made in the game so far.
+        - previous_move: The move made before this one, or ('', '', '') at the start.
+        - piece: The piece that must continue capturing, or None if this is a new turn.
+        - key: The Zobrist key of the board when this move started. The legal moves are only
+          used while the board is still in this position.
+    """
+    move_count: int
+    previous_move: tuple[str, str, str]
+    piece: Optional[Piece]
+    key: int
+    # Private Instance Attributes:
+    #   - _game: The board the game is played on.
+    #   - _moves: The legal moves of this move, or None if they have not been found yet.
+    _game: Checkers
+    _moves: Optional[List[tuple]]
+    # One is made for every move of every game, so they don't each get a __dict__
+    __slots__ = ('move_count', 'previous_move', 'piece', 'key', '_game', '_moves')
+
+    def __init__(self, game: Checkers, move_count: int, previous_move: tuple[str, str, str],
+                 piece: Optional[Piece] = None, moves: Optional[List[tuple]] = None) -> None:
+        """Make the context of the next move of game. If piece is given, it must continue
+        capturing, and moves may be given as the captures it can make."""
+        self._game = game
+        self.move_count = move_count
+        self.previous_move = previous_move
+        self.piece = piece
+        self.key = game.zobrist_key
+        self._moves = moves
+
+    def legal_moves(self) -> List[tuple]:
+        """Return the moves the current player can make, finding them the first time this is
+        called. The returned list must not be changed."""
+        if self._moves is None:
+            if self.piece is None:
+                self._moves = self._game.get_valid_moves()
+            else:
+                self._moves = self._game.get_valid_move_piece(self.piece)[0]
+        return self._moves
+
+    def get_winner(self) -> Optional[str]:
+        """Return the winner of the game, like Checkers.get_winner. In the middle of a
+        multi-jump, both players still have pieces and the piece has a capture to make, so
+        only the move limit is checked; otherwise the board checks, which only looks for as
+        many moves as it needs to."""
+        game = self._game
+        if self.piece is None:
+            return game.get_winner(self.move_count)
+        elif self.move_count == game.move_limit:
+            return 'draw'
+        else:
+            return None
 
 
 class Player:
     """
     An abstract class representing a checkers player.
     This class will be used to create subclasses of different players
+
+    Instance Attributes:
+        - rng: Where the player's random choices come from. run_game sets this to the game's own
+          generator when it is given one (see game_rng); otherwise it is the random module.
     """
+    rng: random.Random = random
 
     def make_move(self, game: Checkers, previous_move: tuple[str, str, str],
                   continuing_from_previous_move: bool) -> tuple[str, str, str]:
         """
-        Make a move based on the given checkers game
+        Make a move based on the given checkers game. The move can also be a compound move
+        (see Checkers.get_compound_moves), which plays the player's whole turn at once.
         Preconditions:
             - There should at least be one valid moves.
         """
         raise NotImplementedError
 
-def run_game(white: Player, black: Player) -> tuple[str, list[tuple[bool, tuple[str, str, str]]]]:
+def game_rng(run_seed: int, game_index: int) -> random.Random:
+    """Return the random number generator of game number game_index in a run with the given
+    seed. Every game of a run gets its own generator, so any game can be played again on its
+    own, and a run can be split up without changing its games.
+
+    >>> game_rng(111, 5).random() == game_rng(111, 5).random()
+    True
+    >>> game_rng(111, 5).random() == game_rng(111, 6).random()
+    False
+    """
+    return random.Random(f'{run_seed}/{game_index}')
+
+
+class GameStats:
+    """How long the parts of one or more games took, in seconds. Pass one to run_game or
+    run_game_pygame to fill it in, and add the stats of many games together with add.
+
+    Instance Attributes:
+        - games: The number of games these stats are for.
+        - plies: The number of single moves made.
+        - white_turns: The number of times white's Player.make_move was called.
+        - black_turns: The number of times black's Player.make_move was called.
+        - white_player_time: The time spent in white's Player.make_move.
+        - black_player_time: The time spent in black's Player.make_move.
+        - engine_time: The time spent in Checkers.make_move.
+        - crowning_time: The time spent crowning pieces and checking if a capture continues.
+        - move_generation_time: The time spent finding the legal moves of each move (see
+          TurnContext). The winner check and the player share these moves, so they are timed
+          on their own, before the winner check, and are not part of either.
+        - winner_time: The time spent checking if the game is over, apart from finding the
+          legal moves.
+
+    >>> stats = GameStats()
+    >>> stats.white_player_time, stats.engine_time = 3.0, 1.0
+    >>> stats.add(stats)
+    >>> stats.total_time()
+    8.0
+    """
+    games: int
+    plies: int
+    white_turns: int
+    black_turns: int
+    white_player_time: float
+    black_player_time: float
+    engine_time: float
+    crowning_time: float
+    move_generation_time: float
+    winner_time: float
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.plies = 0
+        self.white_turns = 0
+        self.black_turns = 0
+        self.white_player_time = 0.0
+        self.black_player_time = 0.0
+        self.engine_time = 0.0
+        self.crowning_time = 0.0
+        self.move_generation_time = 0.0
+        self.winner_time = 0.0
+
+    def add(self, other: 'GameStats') -> None:
+        """Add the counts and times of other to these stats."""
+        for name in self.__annotations__:
+            setattr(self, name, getattr(self, name) + getattr(other, name))
+
+    def total_time(self) -> float:
+        """Return the total time of all the timed parts of the games."""
+        return self.white_player_time + self.black_player_time + self.engine_time \
+            + self.crowning_time + self.move_generation_time + self.winner_time
+
+    def __str__(self) -> str:
+        """Return a table of the time spent in each part of the games."""
+        total = max(self.total_time(), 1e-12)
+        lines = [f'{self.games} game(s), {self.plies} moves, {total:.4f} s']
+        for label, seconds in [('White player', self.white_player_time),
+                               ('Black player', self.black_player_time),
+                               ('Checkers.make_move', self.engine_time),
+                               ('Crowning and continuing', self.crowning_time),
+                               ('Finding legal moves', self.move_generation_time),
+                               ('get_winner', self.winner_time)]:
+            lines.append(f'{label:<26}{seconds:>10.4f} s{seconds / total:>8.1%}')
+        return '\n'.join(lines)
+
+
+def run_game(white: Player, black: Player, game_board: Optional[Checkers] = None,
+             encode_moves: bool = False, rng: Optional[random.Random] = None,
+             stats: Optional[GameStats] = None) -> \
+        tuple[str, list[tuple[bool, tuple[str, str, str]]]]:
     """
     Runs the checkers game and returns a tuple.
+    If game_board is given, the game is played on it instead of on a new Checkers board. This
+    can be any board with the same methods as Checkers, such as a BitboardCheckers board.
+    If encode_moves is True, the moves in the returned list are move codes (see checkers_moves)
+    instead of tuples. Players may return either, or a compound move, which is played (and
+    returned in the list) one single move at a time.
+    If rng is given, both players make their random choices with it (see game_rng), so the
+    game is the same every time it is played with the same rng seed.
+    If stats is given, the time spent in each part of the game is added to it (see GameStats).
+    Nothing is timed otherwise.
+    While the game is played, the board's turn attribute is the TurnContext of the current
+    move, so the legal moves are only found once per move.
+    The moves are played by play_turns, so every game follows the same rules however its
+    players are asked for their moves.
     The first element of the tuple is the winner of the game, corresponding to the return
     values of the get_winner() method in Checkers().
     The second element is a list of tuples, corresponding to the moves made in the game.
@@ -356,100 +891,327 @@ def run_game(white: Player, black: Player) -> tuple[str, list[tuple[bool, tuple[
         of Checkers().
     """
 
-    game_board = Checkers()
+    if game_board is None:
+        game_board = Checkers()
+    if rng is not None:
+        white.rng = rng
+        black.rng = rng
+    timing = stats is not None
+    start = 0.0
+    turns = play_turns(game_board, encode_moves, stats)
+
+    try:
+        previous_move, is_continued = next(turns)
+        while True:
+            if timing:
+                start = time.perf_counter()
+            if game_board.is_white_move:
+                move = white.make_move(game_board, previous_move, is_continued)
+            else:
+                move = black.make_move(game_board, previous_move, is_continued)
+            if timing:
+                _record_turn(stats, game_board.is_white_move, time.perf_counter() - start)
+            previous_move, is_continued = turns.send(move)
+    except StopIteration as game_over:
+        return game_over.value
+
+
+def play_turns(game_board: Checkers, encode_moves: bool = False,
+               stats: Optional[GameStats] = None) -> \
+        Generator[tuple[tuple[str, str, str], bool], AnyMove,
+                  tuple[str, list[tuple[bool, AnyMove]]]]:
+    """
+    Plays a game on game_board one choice at a time, with the same rules and arguments as
+    run_game. Whenever the current player (game_board.is_white_move) has to choose a move,
+    this yields (previous_move, continuing_from_previous_move), the arguments of
+    Player.make_move, and the move they chose must be sent back. When the game is over, the
+    generator returns (winner, moves) like run_game.
+    This lets games be played without calling the players directly, for example by
+    checkers_server, where the moves come from other processes.
+    """
+    codec = get_move_codec(game_board.dimension)
+    move_of = codec.move_of
     moves_so_far = []
     is_continued = False
     previous_move = ('', '', '')
-
-    while game_board.get_winner(len(moves_so_far)) is None:
-        if game_board.is_white_move:
-            move = white.make_move(game_board, previous_move, is_continued)
+    # The rest of the current compound move, last move first
+    pending_moves = []
+    timing = stats is not None
+    start = 0.0
+    turn = TurnContext(game_board, 0, previous_move)
+
+    while True:
+        game_board.turn = turn
+        if timing:
+            start = time.perf_counter()
+            turn.legal_moves()
+            end = time.perf_counter()
+            stats.move_generation_time += end - start
+            winner = turn.get_winner()
+            stats.winner_time += time.perf_counter() - end
         else:
-            move = black.make_move(game_board, previous_move, is_continued)
-        is_continued = False
-
-        game_board.make_move(move)
-        # alternate crowning
-        if game_board.is_white_move:
-            piece = game_board.white_pieces[move[2]]
-            if not piece.is_crowned and move[2][1] == '1':
-                piece.crown_piece()
+            winner = turn.get_winner()
+        if winner is not None:
+            break
 
+        if pending_moves:
+            move = pending_moves.pop()
+        else:
+            move = yield (previous_move, is_continued)
+            if type(move) is tuple and type(move[0]) is not str:
+                # A compound move (see is_compound)
+                pending_moves = list(reversed(move))
+                move = pending_moves.pop()
+        if isinstance(move, int):
+            move = move_of[move]
+
+        if timing:
+            start = time.perf_counter()
+            game_board.make_move(move)
+            end = time.perf_counter()
+            stats.engine_time += end - start
         else:
-            piece = game_board.black_pieces[move[2]]
-            if not piece.is_crowned and move[2][1] == '6':
-                piece.crown_piece()
+            game_board.make_move(move)
+        # alternate crowning
+        game_board.crown_piece(move[2])
         if move[1] != '':
-            is_continued = game_board.get_valid_move_piece(piece)[1]
-        moves_so_far.append((game_board.is_white_move, move))
+            if game_board.is_white_move:
+                piece = game_board.white_pieces[move[2]]
+            else:
+                piece = game_board.black_pieces[move[2]]
+            continuation, is_continued = game_board.get_valid_move_piece(piece)
+        else:
+            is_continued = False
+        if timing:
+            stats.crowning_time += time.perf_counter() - end
+        if encode_moves:
+            moves_so_far.append((game_board.is_white_move, codec.code_of[move]))
+        else:
+            moves_so_far.append((game_board.is_white_move, move))
 
-        if is_continued is not True:
+        previous_move = move
+        if is_continued:
+            # The captures found above are the only moves the piece can make next
+            turn = TurnContext(game_board, len(moves_so_far), move, piece, continuation)
+        else:
             # Change who is current player
             game_board.is_white_move = not game_board.is_white_move
+            turn = TurnContext(game_board, len(moves_so_far), move)
 
-        previous_move = move
+    game_board.turn = None
+    if timing:
+        stats.games += 1
+        stats.plies += len(moves_so_far)
+    return (winner, moves_so_far)
 
-    return (game_board.get_winner(len(moves_so_far)), moves_so_far)
+
+def _record_turn(stats: GameStats, is_white: bool, seconds: float) -> None:
+    """Add one call of the white or black player's make_move, which took seconds, to
+    stats."""
+    if is_white:
+        stats.white_turns += 1
+        stats.white_player_time += seconds
+    else:
+        stats.black_turns += 1
+        stats.black_player_time += seconds
 
 
-def run_game_pygame(white: Player, black: Player) -> tuple[str, list]:
+def run_game_pygame(white: Player, black: Player, stats: Optional[GameStats] = None,
+                    headless: bool = False, move_delay: float = 1.0,
+                    frame_dir: Optional[str] = None, snapshot_file: Optional[str] = None) -> \
+        tuple[str, list]:
     """
     Runs the game
+    The moves are played by play_turns, like in run_game, and the board is drawn again after
+    every move.
+    If stats is given, the time spent in each part of the game is added to it (see GameStats).
+    Drawing the board and the pauses between moves are not counted.
+    The game pauses for move_delay seconds before each move that isn't a human's, and for twice
+    as long at the end. If headless is True, the board is drawn without a window (see
+    use_headless_display), and the game runs at full speed without pausing or waiting for
+    window events, so neither player can be a HumanPlayer.
+    If frame_dir or snapshot_file is given, the board after every move is saved to it (see
+    GameRecorder).
     """
+    if headless:
+        if isinstance(white, HumanPlayer) or isinstance(black, HumanPlayer):
+            raise ValueError('a human player needs a window to play in')
+        use_headless_display()
+        move_delay = 0.0
 
     game_board = Checkers()
     moves_so_far = []
-    is_continued = False
-    previous_move = ''
-    move_count = 0
+    # The rest of the current compound move, last move first
+    pending_moves = []
 
     size = (800, 800)
     allow = [pygame.MOUSEBUTTONDOWN, pygame.quit()]
     screen = initialize_screen(size, allow)
     game_board.set_screen(screen)
-    create_board(game_board, screen)
-
-    while game_board.get_winner(move_count) is None:
-        event = pygame.event.wait()
-        if event.type == pygame.QUIT:
-            pygame.display.quit()
-        moves_left(MOVE_LIMIT - move_count - 1, screen)
-        if not (game_board.is_white_move and isinstance(white, HumanPlayer)) and not (
-                not game_board.is_white_move and isinstance(black, HumanPlayer)):
-            time.sleep(1)
-        if game_board.is_white_move:
-            move = white.make_move(game_board, previous_move, is_continued)
+    create_board(game_board, screen, wait=not headless)
+    recorder = GameRecorder(frame_dir, snapshot_file)
+    recorder.record(game_board, screen, 0, None)
+    timing = stats is not None
+    start = 0.0
+    turns = play_turns(game_board, stats=stats)
+    previous_move, is_continued = next(turns)
+    winner = None
+
+    while winner is None:
+        if not headless:
+            event = pygame.event.wait()
+            if event.type == pygame.QUIT:
+                pygame.display.quit()
+        moves_left(game_board.move_limit - len(moves_so_far) - 1, screen)
+        if move_delay > 0 and not (game_board.is_white_move and isinstance(white, HumanPlayer)) \
+                and not (not game_board.is_white_move and isinstance(black, HumanPlayer)):
+            time.sleep(move_delay)
+        if pending_moves != []:
+            move = pending_moves.pop()
         else:
-            move = black.make_move(game_board, previous_move, is_continued)
-
-        game_board.make_move_pygame(move, screen)
+            if timing:
+                start = time.perf_counter()
+            if game_board.is_white_move:
+                move = white.make_move(game_board, previous_move, is_continued)
+            else:
+                move = black.make_move(game_board, previous_move, is_continued)
+            if timing:
+                _record_turn(stats, game_board.is_white_move, time.perf_counter() - start)
+            if is_compound(move):
+                pending_moves = list(reversed(move))
+                move = pending_moves.pop()
+        move = game_board.codec.decode(move)
+        moves_so_far.append(move)
 
-        # alternate crowning
-        if game_board.is_white_move:
-            piece = game_board.white_pieces[move[2]]
-            if not piece.is_crowned and move[2][1] == '1':
-                piece.crown_piece()
-                draw_crown(move, screen, (245, 245, 245))
+        try:
+            previous_move, is_continued = turns.send(move)
+        except StopIteration as game_over:
+            winner = game_over.value[0]
+        draw_board(game_board, screen)
+        pygame.display.update()
+        recorder.record(game_board, screen, len(moves_so_far), move)
 
-        else:
-            piece = game_board.black_pieces[move[2]]
-            if not piece.is_crowned and move[2][1] == '6':
-                piece.crown_piece()
-                draw_crown(move, screen, (50, 50, 50))
-        if move[1] != '':
-            is_continued = game_board.get_valid_move_piece(piece)[1]
-        if is_continued is not True:
-            # Change who is current player
-            game_board.is_white_move = not game_board.is_white_move
-        move_count += 1
+    recorder.close()
+    if move_delay > 0:
+        time.sleep(2 * move_delay)
+    pygame.display.quit()
+    return (winner, moves_so_far)
 
-        moves_so_far.append(move)
-        previous_move = move
 
-        pygame.display.update()
-    time.sleep(2)
+def replay_game(moves: list, frame_dir: Optional[str] = None,
+                snapshot_file: Optional[str] = None) -> Optional[str]:
+    """Draw every position of a game that has already been played, without a window and
+    without pausing, and return the winner (or None if moves stops before the end of the
+    game). moves is the list of moves returned by run_game_pygame; for a list returned by
+    run_game, pass [move for _, move in moves]. The positions are saved to frame_dir and
+    snapshot_file like in run_game_pygame.
+    """
+    use_headless_display()
+    screen = initialize_screen((800, 800), [])
+    game = Checkers()
+    recorder = GameRecorder(frame_dir, snapshot_file)
+    draw_board(game, screen)
+    recorder.record(game, screen, 0, None)
+    turns = play_turns(game)
+    next(turns)
+    winner = None
+    for move_count, move in enumerate(moves, 1):
+        try:
+            turns.send(move)
+        except StopIteration as game_over:
+            winner = game_over.value[0]
+        draw_board(game, screen)
+        recorder.record(game, screen, move_count, move)
+    recorder.close()
     pygame.display.quit()
-    return (game_board.get_winner(move_count), moves_so_far)
+    return winner
+
+
+def replay_moves(moves: list) -> Checkers:
+    """Return a new board with the moves in moves (like the list returned by
+    run_game_pygame) played on it, with the same rules as run_game."""
+    game = Checkers()
+    turns = play_turns(game)
+    next(turns)
+    for move in moves:
+        turns.send(move)
+    game.turn = None
+    return game
+
+
+def use_headless_display() -> None:
+    """Make pygame draw to memory instead of opening a window, with SDL's dummy video driver,
+    so games can be drawn and saved without a display. This must be called before the display
+    is initialized."""
+    os.environ['SDL_VIDEODRIVER'] = 'dummy'
+
+
+def board_snapshot(game: Checkers) -> Dict[str, object]:
+    """Return the state of game as a dictionary that can be saved as JSON.
+
+    >>> board_snapshot(Checkers())['white']
+    ['a6', 'b5', 'c6', 'd5', 'e6', 'f5']
+    """
+    return {'white_to_move': game.is_white_move,
+            'white': sorted(game.white_pieces),
+            'black': sorted(game.black_pieces),
+            'crowned': sorted(pos for pieces in (game.white_pieces, game.black_pieces)
+                              for pos, piece in pieces.items() if piece.is_crowned)}
+
+
+class GameRecorder:
+    """Saves the board after every move of a game that is being drawn, as numbered PNG frames
+    and as JSON lines of board snapshots (see board_snapshot). A snapshot line also has the
+    number of moves made and the last move.
+
+    Instance Attributes:
+        - frame_dir: The directory the frames are saved in, or None if they are not saved.
+    """
+    frame_dir: Optional[str]
+    # Private Instance Attributes:
+    #   - _snapshots: The file the snapshots are written to, or None if they are not saved.
+    _snapshots: Optional[object]
+
+    def __init__(self, frame_dir: Optional[str] = None,
+                 snapshot_file: Optional[str] = None) -> None:
+        self.frame_dir = frame_dir
+        if frame_dir is not None:
+            os.makedirs(frame_dir, exist_ok=True)
+        self._snapshots = None
+        if snapshot_file is not None:
+            self._snapshots = open(snapshot_file, 'w')
+
+    def record(self, game: Checkers, screen: pygame.Surface, move_count: int,
+               move: Optional[tuple]) -> None:
+        """Save the board of game, drawn on screen, after move_count moves, the last of which
+        was move."""
+        if self.frame_dir is not None:
+            pygame.image.save(screen, os.path.join(self.frame_dir, f'frame_{move_count:04d}.png'))
+        if self._snapshots is not None:
+            snapshot = board_snapshot(game)
+            snapshot['move_count'] = move_count
+            snapshot['move'] = move
+            self._snapshots.write(json.dumps(snapshot) + '\n')
+
+    def close(self) -> None:
+        """Finish saving the game."""
+        if self._snapshots is not None:
+            self._snapshots.close()
+            self._snapshots = None
+
+
+def draw_moves(moves: list, screen: pygame.Surface) -> None:
+    """Draw the board after the moves in moves (like the list returned by run_game_pygame)
+    have been played, with the arrows for going back and forward a move underneath it."""
+    draw_board(replay_moves(moves), screen)
+
+    # The arrows, in the space below the board
+    x = OFFSET + 3 * RECT_SIZE
+    y = OFFSET + DIMENSION * RECT_SIZE
+    pygame.draw.rect(screen, THECOLORS['white'], pygame.Rect(0, y + 1, 800, 100), width=0)
+    pygame.draw.polygon(screen, (0, 0, 0), [(x - 40, y + 40), (x - 1, y + 20), (x - 1, y + 60)])
+    pygame.draw.polygon(screen, (0, 0, 0), [(x + 40, y + 40), (x + 1, y + 20), (x + 1, y + 60)])
+    pygame.display.flip()
 
 
 def draw_crown(move: tuple[str, str, str], screen: pygame.Surface,
@@ -506,9 +1268,22 @@ def draw_text(screen: pygame.Surface, text: str, pos: tuple[int, int], size: int
                 pygame.Rect(pos, (pos[0] + width, pos[1] + height)))
 
 
-def create_board(game: Checkers, screen: pygame.Surface) -> None:
+def create_board(game: Checkers, screen: pygame.Surface, wait: bool = True) -> None:
     """
     creates board
+    If wait is True, this waits for a window event once the board is shown.
+    """
+    draw_board(game, screen)
+    pygame.display.flip()
+    if wait:
+        pygame.event.wait()
+    # pygame.display.quit()
+
+
+def draw_board(game: Checkers, screen: pygame.Surface) -> None:
+    """
+    Draws the squares of the board and all the pieces of game on it, with the crowned pieces
+    as crowns.
     """
 
     # draws the squares
@@ -523,15 +1298,17 @@ def create_board(game: Checkers, screen: pygame.Surface) -> None:
                        (RECT_SIZE * DIMENSION + 4, RECT_SIZE * DIMENSION + 4))
     pygame.draw.rect(screen, (0, 0, 0), rect, width=3)
 
-    for piece in game.black_pieces.keys():
-        draw_piece(screen, piece, 'black')
-
-    for piece in game.white_pieces.keys():
-        draw_piece(screen, piece, 'white')
+    for pos, piece in game.black_pieces.items():
+        if piece.is_crowned:
+            draw_crown(('', '', pos), screen, (50, 50, 50))
+        else:
+            draw_piece(screen, pos, 'black')
 
-    pygame.display.flip()
-    pygame.event.wait()
-    # pygame.display.quit()
+    for pos, piece in game.white_pieces.items():
+        if piece.is_crowned:
+            draw_crown(('', '', pos), screen, (245, 245, 245))
+        else:
+            draw_piece(screen, pos, 'white')
 
 
 def draw_piece(screen: pygame.Surface, pos: str, color: str):
@@ -555,7 +1332,7 @@ def pos_to_square(pos: str) -> tuple:
     """
     posiiton to tuple
     """
-    return ((ord(pos[0]) - 97), int(pos[1]) - 1)
+    return TOPOLOGY.coords[TOPOLOGY.index_of[pos]]
 
 
 def square_to_pos(pos: tuple[int, int]) -> str:
@@ -563,11 +1340,8 @@ def square_to_pos(pos: tuple[int, int]) -> str:
     posiiton to tuple
     """
 
-    x = ((pos[0] - OFFSET) // RECT_SIZE) + 1
-    y = ((pos[1] - OFFSET) // RECT_SIZE) + 1
-
-    if pos[0] >= OFFSET and pos[1] >= OFFSET and x <= 6 and y <= 6:
-        return chr(96 + x) + str(y)
+    if pos[0] >= OFFSET and pos[1] >= OFFSET:
+        return TOPOLOGY.position_at((pos[0] - OFFSET) // RECT_SIZE, (pos[1] - OFFSET) // RECT_SIZE)
     else:
         return ''
 
@@ -601,10 +1375,11 @@ def position_to_index(pos: tuple[int, int]) -> Optional[tuple[int, int]]:
 
 
 def find_pieces_between(pos1: str, pos2: str, game: Checkers) -> str:
-    y = str((int(pos1[1]) + int(pos2[1])) // 2)
-    x = chr((ord(pos1[0]) + ord(pos2[0])) // 2)
-
-    coordinate = x + y
+    topology = game.topology
+    between = topology.between.get((topology.index_of[pos1], topology.index_of[pos2]))
+    if between is None:
+        return ''
+    coordinate = topology.positions[between]
 
     if game.is_white_move and coordinate in game.black_pieces.keys():
         return coordinate
@@ -646,7 +1421,8 @@ class HumanPlayer(Player):
                     other_piece = find_pieces_between(self.clicked, self.released, game)
                     move = (self.clicked, other_piece, self.released)
 
-                    if move in game.get_valid_moves():
+                    if move in game.get_turn_moves(previous_move,
+                                                   continuing_from_previous_move):
                         return move
                     else:
                         self._clicking: False
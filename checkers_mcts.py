@@ -0,0 +1,527 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains a Monte-Carlo tree search of checkers positions, used by MCTSPlayer
+in AI_players_final.
+
+The search grows a tree of whole turns (see Checkers.get_compound_moves) from the current
+position. Each iteration walks down the tree, choosing the turn with the best UCT score (how
+often it has won, plus a bonus for turns that haven't been tried much), adds one new turn to
+the tree, plays random turns from there to the end of the game, and counts the result for every
+turn on the way down. The turn that was tried the most is played. The tree is kept from one
+move to the next: after the opponent's turn, the search carries on from the part of the tree
+under it, like AggressivePlayer walks its game tree with find_subtree_by_move. Games follow the
+same rules as run_game and checkers_search.
+
+RootParallelMCTS runs a separate search in each of several worker processes, each with its own
+random playouts, and adds up how often each turn was tried by all of them before choosing one.
+This uses every core for one move, which threads can't do in CPython. The processes are started
+once and kept for the whole game, each with its own tree.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import math
+import multiprocessing
+import random
+import time
+from multiprocessing.connection import Connection
+from typing import Dict, List, Optional, Tuple
+from checkers_game_with_pygame_final import Checkers, Piece, TurnContext, game_rng
+from checkers_search import root_turns, current_move_count
+
+# The exploration constant of UCT. Larger values try more of the turns that haven't done well.
+EXPLORATION = 1.4
+# What a game is worth to a player who wins or draws it. A lost game is worth nothing.
+WIN = 1.0
+DRAW = 0.5
+
+
+class MCTSNode:
+    """A position in the tree of a Monte-Carlo tree search, reached by a turn.
+
+    Instance Attributes:
+        - turn: The turn that reached this position, as a compound move, or None for the root
+          of a search that didn't start from a turn it knows.
+        - key: The Zobrist key of this position.
+        - move_count: The number of moves made in the game when this position is reached.
+        - is_white: Whether white made turn, so the results of this node are white's.
+        - visits: The number of iterations that have gone through this node.
+        - value: The total worth (see WIN and DRAW) of those iterations to the player who
+          made turn.
+        - children: The positions after each turn from this one that has been tried.
+        - untried: The turns from this position that haven't been tried yet, or None if the
+          turns from it haven't been found yet. The game is over in this position if both
+          children and untried are empty.
+
+    Representation Invariants:
+        - 0 <= self.value <= self.visits
+        - sum(child.visits for child in self.children) <= self.visits
+    """
+    turn: Optional[tuple]
+    key: int
+    move_count: int
+    is_white: bool
+    visits: int
+    value: float
+    children: List[MCTSNode]
+    untried: Optional[List[tuple]]
+    # Search trees can have hundreds of thousands of nodes, so they don't each get a __dict__
+    __slots__ = ('turn', 'key', 'move_count', 'is_white', 'visits', 'value', 'children',
+                 'untried')
+
+    def __init__(self, turn: Optional[tuple], key: int, move_count: int, is_white: bool) -> None:
+        self.turn = turn
+        self.key = key
+        self.move_count = move_count
+        self.is_white = is_white
+        self.visits = 0
+        self.value = 0.0
+        self.children = []
+        self.untried = None
+
+    def find_child_by_move(self, move: tuple[str, str, str], key: int) -> Optional[MCTSNode]:
+        """Return the child whose turn ended with move and reached the position with the given
+        Zobrist key, or None if there is no such child. A multi-jump is found by its last
+        capture, which is the previous_move passed to Player.make_move after it."""
+        for child in self.children:
+            if child.turn[-1] == move and child.key == key:
+                return child
+        return None
+
+    def best_child(self, exploration: float) -> MCTSNode:
+        """Return the child with the highest UCT score.
+
+        Preconditions:
+            - self.children != []
+        """
+        log_visits = math.log(self.visits)
+        best, best_score = self.children[0], -1.0
+        for child in self.children:
+            score = child.value / child.visits + \
+                exploration * math.sqrt(log_visits / child.visits)
+            if score > best_score:
+                best, best_score = child, score
+        return best
+
+    def size(self) -> int:
+        """Return the number of nodes in this tree."""
+        return 1 + sum(child.size() for child in self.children)
+
+
+class MCTSResult:
+    """The result of a Monte-Carlo tree search of one position.
+
+    Instance Attributes:
+        - move: The turn that was tried the most, as a compound move.
+        - visits: The number of times each turn from the position was tried, including
+          iterations from earlier searches that are still in the tree.
+        - value: The average worth (see WIN and DRAW) of move to the player making it.
+        - iterations: The number of iterations of this search.
+        - seconds: How long the search took.
+    """
+    move: tuple
+    visits: Dict[tuple, int]
+    value: float
+    iterations: int
+    seconds: float
+
+    def __init__(self, move: tuple, visits: Dict[tuple, int], value: float, iterations: int,
+                 seconds: float) -> None:
+        self.move = move
+        self.visits = visits
+        self.value = value
+        self.iterations = iterations
+        self.seconds = seconds
+
+
+class MonteCarloTreeSearch:
+    """A Monte-Carlo tree search with UCT selection and random playouts, with a time and
+    iteration budget for each move, that keeps its tree from one move to the next.
+
+    Instance Attributes:
+        - time_limit: The most seconds to search each position for, or None for no limit.
+        - iteration_limit: The most iterations for each move, or None for no limit.
+        - exploration: The exploration constant of UCT.
+        - root: The node of the position of the current (or last) search, or None before the
+          first search.
+
+    Representation Invariants:
+        - self.time_limit is not None or self.iteration_limit is not None
+        - self.time_limit is None or self.time_limit > 0
+        - self.iteration_limit is None or self.iteration_limit > 0
+    """
+    time_limit: Optional[float]
+    iteration_limit: Optional[int]
+    exploration: float
+    root: Optional[MCTSNode]
+
+    def __init__(self, time_limit: Optional[float] = 0.1, iteration_limit: Optional[int] = None,
+                 exploration: float = EXPLORATION) -> None:
+        self.time_limit = time_limit
+        self.iteration_limit = iteration_limit
+        self.exploration = exploration
+        self.root = None
+
+    def search(self, game: Checkers, previous_move: tuple[str, str, str] = ('', '', ''),
+               continuing_from_previous_move: bool = False,
+               rng: random.Random = random) -> MCTSResult:
+        """Search the position of game, given the arguments of Player.make_move, until the
+        budget runs out, and return the turn that was tried the most. The random choices of
+        the playouts are made with rng. game is left as it was.
+
+        Precondition:
+            - the current player of game has a move they can make
+        """
+        start = time.perf_counter()
+        root = self.set_position(game, previous_move, continuing_from_previous_move)
+        if root.untried is None:
+            root.untried = root_turns(game, previous_move, continuing_from_previous_move)
+            rng.shuffle(root.untried)
+
+        if root.children == [] and len(root.untried) == 1:
+            # The only turn doesn't need to be searched
+            turn = root.untried[0]
+            return MCTSResult(turn, {turn: 0}, DRAW, 0, time.perf_counter() - start)
+
+        iterations = 0
+        deadline = None if self.time_limit is None else start + self.time_limit
+        # At least one iteration is run, so the root has a turn to choose
+        while iterations == 0 or iterations != self.iteration_limit and \
+                (deadline is None or time.perf_counter() < deadline):
+            self._iterate(game, root, rng)
+            iterations += 1
+
+        best = max(root.children, key=lambda child: child.visits)
+        return MCTSResult(best.turn, {child.turn: child.visits for child in root.children},
+                          best.value / best.visits if best.visits > 0 else DRAW, iterations,
+                          time.perf_counter() - start)
+
+    def set_position(self, game: Checkers, previous_move: tuple[str, str, str],
+                     continuing_from_previous_move: bool) -> MCTSNode:
+        """Make the node of the position of game the root, without searching it, and return
+        it (see _find_root). search does this first."""
+        self.root = self._find_root(game, previous_move, continuing_from_previous_move)
+        return self.root
+
+    def advance(self, turn: tuple) -> None:
+        """Make the child of the root reached by turn the root, so the next search carries on
+        from it. The rest of the tree is thrown away."""
+        if self.root is not None:
+            for child in self.root.children:
+                if child.turn == turn:
+                    self.root = child
+                    return
+        self.root = None
+
+    def _find_root(self, game: Checkers, previous_move: tuple[str, str, str],
+                   continuing_from_previous_move: bool) -> MCTSNode:
+        """Return the node of the current position of game: the root, or the child of the root
+        reached by the opponent's turn that ended with previous_move, if the tree has it, and a
+        new node otherwise."""
+        key = game.zobrist_key
+        move_count = current_move_count(game)
+        root = self.root
+        if root is not None and not continuing_from_previous_move:
+            if root.key == key and root.move_count == move_count:
+                return root
+            child = root.find_child_by_move(previous_move, key)
+            if child is not None and child.move_count == move_count:
+                return child
+        return MCTSNode(None, key, move_count, not game.is_white_move)
+
+    def _iterate(self, game: Checkers, root: MCTSNode, rng: random.Random) -> None:
+        """Run one iteration of the search from root, which is the position of game."""
+        path = [root]
+        node = root
+        pushed = 0
+        # Selection: walk down the tree while every turn of the node has been tried
+        while node.untried == [] and node.children != []:
+            node = node.best_child(self.exploration)
+            for move in node.turn:
+                game.push(move)
+            pushed += len(node.turn)
+            path.append(node)
+
+        # Expansion and playout
+        winner = self._game_result(game, node)
+        if winner is None:
+            if node.untried is None:
+                node.untried = game.get_compound_moves().copy()
+                rng.shuffle(node.untried)
+            if node.untried == []:
+                # The player to move has no moves
+                winner = 'draw'
+            else:
+                node = self._expand(game, node)
+                pushed += len(node.turn)
+                path.append(node)
+                winner = self._game_result(game, node)
+        if winner is None:
+            winner = self._playout(game, node.move_count, rng)
+
+        for _ in range(pushed):
+            game.pop()
+
+        # Backpropagation
+        for node in path:
+            node.visits += 1
+            if winner == 'draw':
+                node.value += DRAW
+            elif (winner == 'white') == node.is_white:
+                node.value += WIN
+
+    def _expand(self, game: Checkers, node: MCTSNode) -> MCTSNode:
+        """Add the last untried turn of node, which is the position of game, to the tree, play
+        it on game and return its node."""
+        turn = node.untried.pop()
+        is_white = game.is_white_move
+        for move in turn:
+            game.push(move)
+        child = MCTSNode(turn, game.zobrist_key, node.move_count + len(turn), is_white)
+        node.children.append(child)
+        return child
+
+    def _game_result(self, game: Checkers, node: MCTSNode) -> Optional[str]:
+        """Return the winner of the game in the position of node, which is the position of
+        game, like Checkers.get_winner, or None if the game isn't over or if it is only over
+        because the player to move has no moves."""
+        if node.move_count > game.move_limit:
+            # The game reached the move limit in the middle of the turn, while the other
+            # player still had pieces (or the turn would have ended)
+            return 'draw'
+        elif len(game.black_pieces) == 0:
+            return 'white'
+        elif len(game.white_pieces) == 0:
+            return 'black'
+        elif node.move_count == game.move_limit:
+            return 'draw'
+        return None
+
+    def _playout(self, game: Checkers, move_count: int, rng: random.Random) -> str:
+        """Play random turns on game, which is in a position after move_count moves, until
+        the game is over, and return the winner. game is left as it was."""
+        pushed = 0
+        try:
+            while True:
+                if len(game.black_pieces) == 0:
+                    return 'white'
+                elif len(game.white_pieces) == 0:
+                    return 'black'
+                turns = game.get_compound_moves()
+                if move_count >= game.move_limit or turns == []:
+                    return 'draw'
+                turn = rng.choice(turns)
+                if move_count + len(turn) > game.move_limit:
+                    return 'draw'
+                for move in turn:
+                    game.push(move)
+                pushed += len(turn)
+                move_count += len(turn)
+        finally:
+            for _ in range(pushed):
+                game.pop()
+
+
+class RootParallelMCTS:
+    """Monte-Carlo tree searches of the same position in several worker processes at once,
+    whose results are added up (root parallelization). Each worker keeps its own
+    MonteCarloTreeSearch, and so its own tree, from one move to the next, and gets its own
+    random number generator for each move.
+
+    It has the same search and advance methods as MonteCarloTreeSearch. The workers are
+    started when it is made, and keep running until close is called (or the program ends),
+    so it can be used in a with statement.
+
+    Instance Attributes:
+        - processes: The number of worker processes.
+        - time_limit: The most seconds each worker searches each position for, or None for no
+          limit.
+        - iteration_limit: The most iterations of each worker for each move, or None for no
+          limit.
+
+    Representation Invariants:
+        - self.processes >= 1
+        - self.time_limit is not None or self.iteration_limit is not None
+
+    With an iteration limit, each worker searches exactly like a MonteCarloTreeSearch with
+    the same generator:
+
+    >>> game = Checkers()
+    >>> with RootParallelMCTS(1, None, 50) as parallel:
+    ...     result = parallel.search(game, rng=random.Random(8))
+    >>> seed = random.Random(8).getrandbits(64)
+    >>> serial = MonteCarloTreeSearch(None, 50).search(game, rng=game_rng(seed, 0))
+    >>> result.visits == serial.visits
+    True
+    """
+    processes: int
+    time_limit: Optional[float]
+    iteration_limit: Optional[int]
+    # Private Instance Attributes:
+    #   - _connections: The end of the pipe to each worker that this process uses.
+    #   - _workers: The worker processes.
+    #   - _played: The turns passed to advance since the last search that was sent to the
+    #     workers, in order, which they advance their trees by before the next search. Each
+    #     is (state, turn), where state is the board_state of the position the turn was played
+    #     from if the workers were never sent it, because it only had one turn, and None
+    #     otherwise.
+    #   - _unsent: The board_state of the last position searched, if it only had one turn, so
+    #     it was not sent to the workers, and None otherwise.
+    _connections: List[Connection]
+    _workers: List[multiprocessing.Process]
+    _played: List[Tuple[Optional[tuple], tuple]]
+    _unsent: Optional[tuple]
+
+    def __init__(self, processes: Optional[int] = None, time_limit: Optional[float] = 0.1,
+                 iteration_limit: Optional[int] = None,
+                 exploration: float = EXPLORATION) -> None:
+        """Start processes workers, or one for each CPU if processes is None."""
+        if processes is None:
+            processes = multiprocessing.cpu_count()
+        self.processes = processes
+        self.time_limit = time_limit
+        self.iteration_limit = iteration_limit
+        self._connections = []
+        self._workers = []
+        self._played = []
+        self._unsent = None
+        for i in range(processes):
+            connection, worker_connection = multiprocessing.Pipe()
+            worker = multiprocessing.Process(
+                target=_run_worker,
+                args=(worker_connection, i, time_limit, iteration_limit, exploration),
+                daemon=True)
+            worker.start()
+            worker_connection.close()
+            self._connections.append(connection)
+            self._workers.append(worker)
+
+    def search(self, game: Checkers, previous_move: tuple[str, str, str] = ('', '', ''),
+               continuing_from_previous_move: bool = False,
+               rng: random.Random = random) -> MCTSResult:
+        """Search the position of game in every worker, given the arguments of
+        Player.make_move, and return the turn that was tried the most by all of them together.
+        The seed of the workers' generators is chosen with rng.
+
+        Precondition:
+            - the current player of game has a move they can make
+        """
+        start = time.perf_counter()
+        state = board_state(game, previous_move, continuing_from_previous_move)
+        turns = root_turns(game, previous_move, continuing_from_previous_move)
+        if len(turns) == 1:
+            # The only turn doesn't need to be searched. The workers are told about this
+            # position with the next search, so they can keep their trees.
+            self._unsent = state
+            return MCTSResult(turns[0], {turns[0]: 0}, DRAW, 0, time.perf_counter() - start)
+
+        self._unsent = None
+        seed = rng.getrandbits(64)
+        for connection in self._connections:
+            connection.send((state, self._played, seed))
+        self._played = []
+
+        # Added up in the order of the workers, so the result doesn't depend on which worker
+        # finishes first
+        visits = {}
+        values = {}
+        iterations = 0
+        for connection in self._connections:
+            children, worker_iterations = connection.recv()
+            iterations += worker_iterations
+            for turn, turn_visits, turn_value in children:
+                visits[turn] = visits.get(turn, 0) + turn_visits
+                values[turn] = values.get(turn, 0.0) + turn_value
+        best = max(visits, key=lambda turn: visits[turn])
+        return MCTSResult(best, visits, values[best] / visits[best], iterations,
+                          time.perf_counter() - start)
+
+    def advance(self, turn: tuple) -> None:
+        """Make the workers carry on from the position after turn in their next search."""
+        self._played.append((self._unsent, turn))
+        self._unsent = None
+
+    def close(self) -> None:
+        """Stop the workers."""
+        for connection in self._connections:
+            connection.send(None)
+            connection.close()
+        for worker in self._workers:
+            worker.join()
+        self._connections = []
+        self._workers = []
+
+    def __enter__(self) -> RootParallelMCTS:
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.close()
+
+
+def board_state(game: Checkers, previous_move: tuple[str, str, str],
+                continuing_from_previous_move: bool) -> tuple:
+    """Return what a worker of RootParallelMCTS needs to search the position of game, given
+    the arguments of Player.make_move, as a tuple that is small to send to it."""
+    white = [(pos, piece.is_crowned) for pos, piece in game.white_pieces.items()]
+    black = [(pos, piece.is_crowned) for pos, piece in game.black_pieces.items()]
+    return (white, black, game.is_white_move, game.dimension, game.move_limit,
+            current_move_count(game), previous_move, continuing_from_previous_move)
+
+
+def board_from_state(state: tuple) -> Checkers:
+    """Return a board in the position of state, made by board_state, with its turn attribute
+    set like run_game would, so the search knows how many moves have been made."""
+    white, black, is_white_move, dimension, move_limit, move_count, previous_move, \
+        continuing = state
+    pieces = []
+    for is_white, positions in ((True, white), (False, black)):
+        side = {}
+        for pos, is_crowned in positions:
+            piece = Piece(is_white, pos)
+            piece.is_crowned = is_crowned
+            side[pos] = piece
+        pieces.append(side)
+    game = Checkers(pieces[0], pieces[1], is_white_move, dimension, move_limit)
+    piece = None
+    if continuing:
+        piece = pieces[not is_white_move][previous_move[2]]
+    game.turn = TurnContext(game, move_count, previous_move, piece)
+    return game
+
+
+def _run_worker(connection: Connection, index: int, time_limit: Optional[float],
+                iteration_limit: Optional[int], exploration: float) -> None:
+    """Search positions sent by a RootParallelMCTS, as worker number index, until it sends
+    None. For each position, send back (turn, visits, total value) for every turn from it, and
+    the number of iterations."""
+    search = MonteCarloTreeSearch(time_limit, iteration_limit, exploration)
+    while True:
+        request = connection.recv()
+        if request is None:
+            break
+        state, played, seed = request
+        for played_state, turn in played:
+            if played_state is not None:
+                # This position wasn't searched, so the tree hasn't got to it yet
+                search.set_position(board_from_state(played_state), played_state[6],
+                                    played_state[7])
+            search.advance(turn)
+        game = board_from_state(state)
+        result = search.search(game, state[6], state[7], game_rng(seed, index))
+        children = [(child.turn, child.visits, child.value) for child in search.root.children]
+        connection.send((children, result.iterations))
+    connection.close()
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
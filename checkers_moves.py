@@ -0,0 +1,165 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains a compact integer encoding of checkers moves.
+
+Everywhere else in the project a move is a tuple of three positions, like ('c4', 'd3', 'e2').
+A move code packs the same move into one small int using square numbers (see
+checkers_topology):
+
+    bits 0 - 6:   the square the piece starts on
+    bits 7 - 13:  the square of the captured piece, or NO_CAPTURE
+    bits 14 - 20: the square the piece ends on
+    bits 21 and up: flags, such as CAPTURE_FLAG
+
+A compound move is a whole turn: a tuple of single moves (tuples or codes), such as the
+capture ('a2', 'b3', 'c4') followed by ('c4', 'd5', 'e6'). Players can return compound moves,
+and run_game plays them one single move at a time (see is_compound).
+
+Codes take much less memory than tuples of strings and can be compared in a single step, so
+they are used by the game tree and for saving games. MoveCodec converts between the two, using
+tables built once per board size, so converting a move is a single dictionary lookup.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Dict, Tuple, Union
+from checkers_topology import get_topology, NO_SQUARE
+
+# The code of the empty move ('', '', ''), used before the first move of a game.
+NO_MOVE = -1
+# Stored in place of the captured square if the move is not a capture.
+NO_CAPTURE = 127
+SQUARE_BITS = 7
+SQUARE_MASK = (1 << SQUARE_BITS) - 1
+CAPTURE_FLAG = 1 << (3 * SQUARE_BITS)
+
+# A move in either form.
+AnyMove = Union[tuple, int]
+# A whole turn: every single move of it, in order.
+CompoundMove = Tuple[AnyMove, ...]
+
+
+def pack_move(start: int, captured: int, end: int) -> int:
+    """Return the code of the move from square start to square end, capturing the piece on
+    square captured (or NO_SQUARE if there is no capture).
+
+    >>> move_start(pack_move(3, NO_SQUARE, 7)), move_end(pack_move(3, NO_SQUARE, 7))
+    (3, 7)
+    >>> is_capture(pack_move(3, NO_SQUARE, 7)), is_capture(pack_move(3, 7, 11))
+    (False, True)
+    """
+    if captured == NO_SQUARE:
+        return start | (NO_CAPTURE << SQUARE_BITS) | (end << 2 * SQUARE_BITS)
+    return start | (captured << SQUARE_BITS) | (end << 2 * SQUARE_BITS) | CAPTURE_FLAG
+
+
+def move_start(code: int) -> int:
+    """Return the square the piece starts on in the move with the given code."""
+    return code & SQUARE_MASK
+
+
+def move_captured(code: int) -> int:
+    """Return the square of the captured piece in the move with the given code, or NO_SQUARE
+    if it is not a capture."""
+    if code & CAPTURE_FLAG:
+        return (code >> SQUARE_BITS) & SQUARE_MASK
+    return NO_SQUARE
+
+
+def move_end(code: int) -> int:
+    """Return the square the piece ends on in the move with the given code."""
+    return (code >> 2 * SQUARE_BITS) & SQUARE_MASK
+
+
+def is_capture(code: int) -> bool:
+    """Return whether the move with the given code is a capture."""
+    return code & CAPTURE_FLAG != 0
+
+
+def is_compound(move: Union[AnyMove, CompoundMove]) -> bool:
+    """Return whether move is a compound move, rather than a single move or move code.
+
+    >>> is_compound(('a2', 'b3', 'c4')), is_compound((('a2', 'b3', 'c4'),))
+    (False, True)
+    >>> is_compound(5), is_compound((5, 9))
+    (False, True)
+    """
+    return isinstance(move, tuple) and move != () and not isinstance(move[0], str)
+
+
+class MoveCodec:
+    """Converts moves between tuples of positions and move codes for one size of board.
+
+    Every move that could ever be made on the board is converted once when the codec is made.
+    The tuples returned by decode are shared, so decoding many moves doesn't make new tuples.
+
+    Instance Attributes:
+        - code_of: The code of every possible move tuple, including ('', '', '').
+        - move_of: The move tuple of every possible code, including NO_MOVE.
+    """
+    code_of: Dict[tuple, int]
+    move_of: Dict[int, tuple]
+
+    def __init__(self, dimension: int) -> None:
+        topology = get_topology(dimension)
+        positions = topology.positions
+        self.code_of = {('', '', ''): NO_MOVE}
+        for start in range(len(positions)):
+            for d in range(4):
+                step = topology.neighbours[start][d]
+                if step != NO_SQUARE:
+                    self.code_of[(positions[start], '', positions[step])] = \
+                        pack_move(start, NO_SQUARE, step)
+                jump = topology.jumps[start][d]
+                if jump != NO_SQUARE:
+                    self.code_of[(positions[start], positions[step], positions[jump])] = \
+                        pack_move(start, step, jump)
+        self.move_of = {code: move for move, code in self.code_of.items()}
+
+    def encode(self, move: AnyMove) -> int:
+        """Return the code of move. move may already be a code, in which case it is returned
+        unchanged.
+
+        >>> codec = get_move_codec(6)
+        >>> codec.decode(codec.encode(('c4', 'd3', 'e2')))
+        ('c4', 'd3', 'e2')
+        >>> codec.encode(('', '', '')) == NO_MOVE
+        True
+        """
+        if isinstance(move, int):
+            return move
+        return self.code_of[move]
+
+    def decode(self, move: AnyMove) -> tuple:
+        """Return the move tuple of move. move may already be a tuple, in which case it is
+        returned unchanged."""
+        if isinstance(move, int):
+            return self.move_of[move]
+        return move
+
+
+# The codecs that have been made so far, by board size.
+_CODECS: Dict[int, MoveCodec] = {}
+
+
+def get_move_codec(dimension: int) -> MoveCodec:
+    """Return the MoveCodec for a board with the given number of rows and columns.
+    Each codec is only made the first time it is asked for.
+    """
+    if dimension not in _CODECS:
+        _CODECS[dimension] = MoveCodec(dimension)
+    return _CODECS[dimension]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,155 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains the move ordering used by the alpha-beta search in checkers_search.
+
+Alpha-beta search can skip most of the moves of a position once it has found a move that is
+good enough, so the sooner the best move is searched, the less is searched. MoveOrderer guesses
+which moves are best from what the search has already found out:
+    1. The best move stored in the transposition table for the position, if there is one.
+    2. Captures, the ones that capture the most pieces first.
+    3. Killer moves: moves that were good enough to stop the search of another position the
+       same number of turns into the search. Positions that close to each other often have the
+       same good moves.
+    4. All other moves, by their history score: how often (and how deep in the search) each
+       move from a square to a square was good enough to stop a search.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Dict, Iterable, Iterator, List, Optional
+
+# The number of killer moves kept for each ply.
+KILLERS_PER_PLY = 2
+
+
+def capture_count(move: tuple) -> int:
+    """Return the number of pieces captured by move, which is either a single move or a
+    compound move.
+
+    >>> capture_count(('a6', '', 'b5'))
+    0
+    >>> capture_count((('a6', 'b5', 'c4'), ('c4', 'd3', 'e2')))
+    2
+    """
+    if isinstance(move[0], str):
+        return int(move[1] != '')
+    return sum(hop[1] != '' for hop in move)
+
+
+def history_key(move: tuple, is_white: bool) -> tuple[bool, str, str]:
+    """Return the key of move, which is either a single move or a compound move, in the
+    history table: the player who makes it, the square it starts on and the square it ends on.
+
+    >>> history_key((('a6', 'b5', 'c4'), ('c4', 'd3', 'e2')), True)
+    (True, 'a6', 'e2')
+    """
+    if isinstance(move[0], str):
+        return (is_white, move[0], move[2])
+    return (is_white, move[0][0], move[-1][2])
+
+
+class MoveOrderer:
+    """Orders the moves of positions in a search so the moves most likely to be best come first
+    (see the module docstring). The moves can be single moves, like the ones returned by
+    Checkers.get_valid_moves, or compound moves, like the ones returned by
+    Checkers.get_compound_moves.
+
+    Instance Attributes:
+        - killers: The killer moves of each ply, newest first.
+        - history: The history score of each move, by history_key.
+
+    Representation Invariants:
+        - all(len(moves) <= KILLERS_PER_PLY for moves in self.killers)
+        - all(score > 0 for score in self.history.values())
+
+    >>> orderer = MoveOrderer()
+    >>> moves = [('a6', '', 'b5'), ('c6', '', 'd5'), ('e6', '', 'f5')]
+    >>> orderer.record_cutoff(('e6', '', 'f5'), 1, 3, True)
+    >>> list(orderer.order(moves, 1, True, ('c6', '', 'd5')))
+    [('c6', '', 'd5'), ('e6', '', 'f5'), ('a6', '', 'b5')]
+    """
+    killers: List[List[tuple]]
+    history: Dict[tuple[bool, str, str], int]
+
+    def __init__(self) -> None:
+        self.killers = []
+        self.history = {}
+
+    def new_search(self) -> None:
+        """Start a new search. The killer moves are forgotten, since the plies of the new
+        search are different positions, and the history scores are halved, so what was found
+        in this search counts for more than what was found in earlier ones."""
+        self.killers = []
+        self.history = {key: score // 2 for key, score in self.history.items() if score > 1}
+
+    def order(self, moves: Iterable[tuple], ply: int, is_white: bool,
+              table_move: Optional[tuple] = None) -> Iterator[tuple]:
+        """Yield the moves in moves, made by white if is_white, in the order they should be
+        searched, ply turns into the search. table_move is the best move stored in the
+        transposition table for the position, if there is one.
+
+        table_move is only yielded if it is one of moves, and it is yielded before the other
+        moves are copied or sorted, so if it is all the search needs, that work is skipped.
+        moves can be any iterable, but a list is best: anything else has to be read in full
+        to check that table_move is one of its moves. A list given as moves is not changed.
+
+        >>> orderer = MoveOrderer()
+        >>> moves = [('a6', '', 'b5'), ('c6', '', 'd5')]
+        >>> ordered = orderer.order(moves, 0, True, ('c6', '', 'd5'))
+        >>> next(ordered)
+        ('c6', '', 'd5')
+        >>> list(orderer.order(moves, 0, True, ('e6', '', 'f5')))
+        [('a6', '', 'b5'), ('c6', '', 'd5')]
+        """
+        if not isinstance(moves, list):
+            moves = list(moves)
+        if table_move is not None and table_move in moves:
+            yield table_move
+            moves = [move for move in moves if move != table_move]
+        if len(moves) <= 1:
+            yield from moves
+            return
+
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        history = self.history
+
+        def sort_key(move: tuple) -> tuple[int, int, int]:
+            if move in killers:
+                killer = KILLERS_PER_PLY - killers.index(move)
+            else:
+                killer = 0
+            return (-capture_count(move), -killer, -history.get(history_key(move, is_white), 0))
+
+        # sorted keeps the original order of moves that are equally good
+        yield from sorted(moves, key=sort_key)
+
+    def record_cutoff(self, move: tuple, ply: int, depth: int, is_white: bool) -> None:
+        """Record that move, made by white if is_white, was good enough to stop the search of a
+        position ply turns into the search that was searching depth turns deep. Captures are
+        not recorded, since they are searched first anyway."""
+        if capture_count(move) > 0:
+            return
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[KILLERS_PER_PLY:]
+
+        key = history_key(move, is_white)
+        self.history[key] = self.history.get(key, 0) + depth * depth
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,389 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains an alpha-beta search of checkers positions, used by
+AlphaBetaPlayer in AI_players_final.
+
+The search looks at whole turns (see Checkers.get_compound_moves), so a multi-jump is one move
+of the search, and plays them on the board itself with push and pop. It searches one turn
+deep, then two, and so on (iterative deepening) until its time or node budget runs out, and
+always has the best move of the deepest search it finished, so it can be stopped at any time.
+Positions at the end of the search are scored by material and by how far the uncrowned pieces
+have advanced. Games follow the same rules as run_game: a player with no pieces left loses,
+and the game is a draw when the move limit is reached or the player to move has no moves.
+
+The results of searching each position are kept in a transposition table (see
+checkers_transposition), which is kept from one search to the next. Kings often go back and
+forth between the same squares, and turns can be played in different orders, so the search
+reaches many positions more than once.
+
+If the search is given endgame tablebases (see checkers_tablebase), positions with few enough
+pieces are looked up in them instead of being searched.
+
+The moves of each position are searched in the order given by a MoveOrderer (see
+checkers_ordering), which puts the move from the transposition table first, then the longest
+captures, then the moves that were best in similar positions.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import time
+from typing import List, Optional
+from checkers_game_with_pygame_final import Checkers, find_jump_paths
+from checkers_ordering import MoveOrderer
+from checkers_tablebase import Tablebase
+from checkers_transposition import TranspositionTable, holds_for, TABLE_MB, EXACT, \
+    LOWER_BOUND, UPPER_BOUND, DEPTH, BOUND, SCORE, MOVE, NEEDED
+
+# The score of winning the game. Wins found sooner score a little more, so the search goes for
+# the quickest win (and the slowest loss).
+WIN_SCORE = 100000
+MAN_VALUE = 100
+KING_VALUE = 160
+# The score of each row an uncrowned piece has advanced towards being crowned.
+ADVANCE_VALUE = 4
+# The deepest search, in turns, if the budget doesn't run out first.
+MAX_DEPTH = 64
+# How many positions are searched between checks of the time budget.
+CHECK_EVERY = 256
+# The depth stored in the transposition table for a position whose search only reached
+# finished games, so its score is right however deep it is searched.
+RESOLVED_DEPTH = 1000
+
+
+class SearchTimeout(Exception):
+    """Raised inside a search when its time or node budget has run out."""
+
+
+class SearchResult:
+    """The result of searching one position.
+
+    Instance Attributes:
+        - move: The best turn found, as a compound move, or None if there are no moves.
+        - score: The score of move for the player to move, from the deepest finished search.
+        - depth: The depth, in turns, of the deepest finished search.
+        - nodes: The number of positions searched.
+        - seconds: How long the search took.
+    """
+    move: Optional[tuple]
+    score: int
+    depth: int
+    nodes: int
+    seconds: float
+
+    def __init__(self, move: Optional[tuple], score: int, depth: int, nodes: int,
+                 seconds: float) -> None:
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.seconds = seconds
+
+
+def evaluate(game: Checkers) -> int:
+    """Return the score of game for the player to move, counting material and how far each
+    uncrowned piece has advanced.
+
+    >>> evaluate(Checkers())
+    0
+    """
+    score = 0
+    last_row = game.dimension
+    for pos, piece in game.white_pieces.items():
+        if piece.is_crowned:
+            score += KING_VALUE
+        else:
+            # White pieces are crowned on row 1
+            score += MAN_VALUE + ADVANCE_VALUE * (last_row - int(pos[1:]))
+    for pos, piece in game.black_pieces.items():
+        if piece.is_crowned:
+            score -= KING_VALUE
+        else:
+            score -= MAN_VALUE + ADVANCE_VALUE * (int(pos[1:]) - 1)
+    if game.is_white_move:
+        return score
+    return -score
+
+
+def root_turns(game: Checkers, previous_move: tuple[str, str, str],
+               continuing_from_previous_move: bool) -> List[tuple]:
+    """Return every way the current player of game can finish their turn, as compound moves,
+    given the arguments of Player.make_move."""
+    if continuing_from_previous_move:
+        return list(find_jump_paths(game, previous_move[2], {}))
+    return game.get_compound_moves()
+
+
+def score_to_table(score: int, ply: int) -> int:
+    """Return score, found ply turns into a search, as it is stored in a transposition table.
+    The score of a win depends on how many turns away it is, so it is stored as the score it
+    has in the position itself, rather than from the start of the search.
+
+    >>> score_from_table(score_to_table(WIN_SCORE - 7, 3), 5)
+    99991
+    """
+    if score > WIN_SCORE // 2:
+        return score + ply
+    elif score < -WIN_SCORE // 2:
+        return score - ply
+    return score
+
+
+def score_from_table(score: int, ply: int) -> int:
+    """Return score, stored in a transposition table by score_to_table, as the score of the
+    position found ply turns into a search."""
+    if score > WIN_SCORE // 2:
+        return score - ply
+    elif score < -WIN_SCORE // 2:
+        return score + ply
+    return score
+
+
+def current_move_count(game: Checkers) -> int:
+    """Return the number of moves made so far in the game being played on game, if it is
+    being played by run_game (see TurnContext), and 0 otherwise."""
+    turn = game.turn
+    if turn is not None and turn.key == game.zobrist_key:
+        return turn.move_count
+    return 0
+
+
+class AlphaBetaSearch:
+    """An iterative-deepening alpha-beta search with a time and node budget for each move.
+
+    Instance Attributes:
+        - time_limit: The most seconds to search each position for, or None for no limit.
+        - node_limit: The most positions to search for each move, or None for no limit.
+        - max_depth: The deepest search, in turns.
+        - nodes: The number of positions searched so far by the current (or last) search.
+        - table: The transposition table the results of the search are kept in, or None if
+          they are not kept.
+        - ordering: The move ordering of the search.
+        - tablebase: The endgame tablebases the search looks positions up in, or None.
+
+    Representation Invariants:
+        - self.time_limit is None or self.time_limit > 0
+        - self.node_limit is None or self.node_limit > 0
+        - self.max_depth >= 1
+    """
+    time_limit: Optional[float]
+    node_limit: Optional[int]
+    max_depth: int
+    nodes: int
+    table: Optional[TranspositionTable]
+    ordering: MoveOrderer
+    tablebase: Optional[Tablebase]
+    # Private Instance Attributes:
+    #   - _deadline: The time.perf_counter() time the current search must stop by, or None.
+    #   - _reached_horizon: Whether the current depth of the search has scored any position
+    #     with evaluate, rather than only finished games. If it hasn't, searching deeper
+    #     wouldn't change anything. While a position is searched, this is only about the
+    #     positions after it.
+    #   - _furthest: The largest number of moves made in any position the current depth of the
+    #     search has scored, or relied on the score of, so the move limit must be after it. Like
+    #     _reached_horizon, while a position is searched this is only about the positions after
+    #     it.
+    #   - _reached_limit: Whether the current depth of the search has scored any position as a
+    #     draw because of the move limit, so its results only hold with the same number of moves
+    #     left. It is kept like _reached_horizon.
+    _deadline: Optional[float]
+    _reached_horizon: bool
+    _furthest: int
+    _reached_limit: bool
+
+    def __init__(self, time_limit: Optional[float] = 0.1, node_limit: Optional[int] = None,
+                 max_depth: int = MAX_DEPTH, table_mb: Optional[float] = TABLE_MB,
+                 tablebase: Optional[Tablebase] = None) -> None:
+        """Make a search with the given budget for each move and a transposition table of
+        about table_mb megabytes, or no table if table_mb is None."""
+        self.time_limit = time_limit
+        self.node_limit = node_limit
+        self.max_depth = max_depth
+        self.nodes = 0
+        self.table = None if table_mb is None else TranspositionTable(table_mb)
+        self.ordering = MoveOrderer()
+        self.tablebase = tablebase
+        self._deadline = None
+        self._reached_horizon = False
+        self._furthest = 0
+        self._reached_limit = False
+
+    def search(self, game: Checkers, previous_move: tuple[str, str, str] = ('', '', ''),
+               continuing_from_previous_move: bool = False) -> SearchResult:
+        """Search the position of game, given the arguments of Player.make_move, until the
+        budget runs out, and return the best turn found. game is left as it was.
+
+        Precondition:
+            - the current player of game has a move they can make
+        """
+        start = time.perf_counter()
+        self.nodes = 0
+        self._deadline = None if self.time_limit is None else start + self.time_limit
+        self.ordering.new_search()
+        table_move = None
+        move_count = current_move_count(game)
+        if self.table is not None:
+            self.table.new_search()
+            entry = self.table.probe(game.zobrist_key)
+            if entry is not None:
+                table_move = entry[MOVE]
+        turns = list(self.ordering.order(root_turns(game, previous_move,
+                                                    continuing_from_previous_move),
+                                         0, game.is_white_move, table_move))
+        best_move, best_score, finished_depth = turns[0], 0, 0
+
+        if len(turns) > 1:
+            for depth in range(1, self.max_depth + 1):
+                self._reached_horizon, self._furthest, self._reached_limit = False, 0, False
+                try:
+                    move, score = self._search_root(game, turns, depth, move_count)
+                except SearchTimeout:
+                    break
+                best_move, best_score, finished_depth = move, score, depth
+                # The best move so far is searched first next time
+                turns.remove(move)
+                turns.insert(0, move)
+                if abs(score) >= WIN_SCORE - self.max_depth or not self._reached_horizon:
+                    # The result of the game is already known
+                    break
+
+        return SearchResult(best_move, best_score, finished_depth, self.nodes,
+                            time.perf_counter() - start)
+
+    def _search_root(self, game: Checkers, turns: List[tuple], depth: int,
+                     move_count: int) -> tuple[tuple, int]:
+        """Return the best of turns and its score, searching depth turns deep."""
+        alpha = -WIN_SCORE - 1
+        best_move = turns[0]
+        for turn in turns:
+            score = -self._play_and_search(game, turn, depth - 1, -WIN_SCORE - 1, -alpha,
+                                           move_count, 1)
+            if score > alpha:
+                alpha, best_move = score, turn
+        return (best_move, alpha)
+
+    def _play_and_search(self, game: Checkers, turn: tuple, depth: int, alpha: int, beta: int,
+                         move_count: int, ply: int) -> int:
+        """Play turn on game, search the position after it, and undo it. Return the score of
+        that position for the player to move in it."""
+        if move_count + len(turn) > game.move_limit:
+            # The game reaches the move limit in the middle of the turn, while the other player
+            # still has pieces (or the turn would have ended), so it is a draw
+            self._reached_limit = True
+            return 0
+        for move in turn:
+            game.push(move)
+        try:
+            return self._negamax(game, depth, alpha, beta, move_count + len(turn), ply)
+        finally:
+            for _ in turn:
+                game.pop()
+
+    def _negamax(self, game: Checkers, depth: int, alpha: int, beta: int, move_count: int,
+                 ply: int) -> int:
+        """Return the score of game for the player to move, searching depth turns deep, where
+        scores of alpha or less and beta or more don't need to be exact."""
+        self.nodes += 1
+        if self.nodes == self.node_limit or self.nodes % CHECK_EVERY == 0 and \
+                self._deadline is not None and time.perf_counter() >= self._deadline:
+            raise SearchTimeout
+        if move_count > self._furthest:
+            self._furthest = move_count
+
+        # The same order of checks as Checkers.get_winner
+        if game.is_white_move and len(game.white_pieces) == 0 or \
+                not game.is_white_move and len(game.black_pieces) == 0:
+            return -(WIN_SCORE - ply)
+        if move_count >= game.move_limit:
+            self._reached_limit = True
+            return 0
+        tablebase = self.tablebase
+        if tablebase is not None and \
+                len(game.white_pieces) + len(game.black_pieces) <= tablebase.max_pieces:
+            found = tablebase.probe(game, move_count)
+            if found is not None:
+                # The result is exact, so the position doesn't need to be searched deeper
+                winner, moves = found
+                if winner == 'draw':
+                    if move_count + moves > game.move_limit:
+                        # It may only be a draw because the win comes too late
+                        self._reached_limit = True
+                    return 0
+                if move_count + moves - 1 > self._furthest:
+                    self._furthest = move_count + moves - 1
+                score = WIN_SCORE - ply - moves
+                return score if (winner == 'white') == game.is_white_move else -score
+
+        table = self.table
+        moves_left = game.move_limit - move_count
+        table_move = None
+        if table is not None and depth > 0:
+            entry = table.probe(game.zobrist_key)
+            if entry is not None:
+                table_move = entry[MOVE]
+            if entry is not None and entry[DEPTH] >= depth and holds_for(entry, moves_left):
+                score = score_from_table(entry[SCORE], ply)
+                bound = entry[BOUND]
+                if bound == EXACT or bound == LOWER_BOUND and score >= beta \
+                        or bound == UPPER_BOUND and score <= alpha:
+                    if entry[DEPTH] < RESOLVED_DEPTH:
+                        self._reached_horizon = True
+                    if entry[NEEDED] is None:
+                        self._reached_limit = True
+                    elif move_count + entry[NEEDED] - 1 > self._furthest:
+                        self._furthest = move_count + entry[NEEDED] - 1
+                    return score
+
+        turns = game.get_compound_moves()
+        if turns == []:
+            return 0
+        if depth == 0:
+            self._reached_horizon = True
+            return evaluate(game)
+
+        reached_horizon, furthest, reached_limit = \
+            self._reached_horizon, self._furthest, self._reached_limit
+        self._reached_horizon, self._furthest, self._reached_limit = False, move_count, False
+        original_alpha = alpha
+        best_score, best_move = -WIN_SCORE - 1, None
+        is_white = game.is_white_move
+        for turn in self.ordering.order(turns, ply, is_white, table_move):
+            score = -self._play_and_search(game, turn, depth - 1, -beta, -alpha, move_count,
+                                           ply + 1)
+            if score > best_score:
+                best_score, best_move = score, turn
+                if score >= beta:
+                    self.ordering.record_cutoff(turn, ply, depth, is_white)
+                    break
+                if score > alpha:
+                    alpha = score
+        resolved = not self._reached_horizon
+        # The fewest moves left that every line searched from here fits in
+        needed = None if self._reached_limit else self._furthest - move_count + 1
+        self._reached_horizon = reached_horizon or self._reached_horizon
+        self._furthest = max(furthest, self._furthest)
+        self._reached_limit = reached_limit or self._reached_limit
+
+        if table is not None:
+            if best_score >= beta:
+                bound = LOWER_BOUND
+            elif best_score <= original_alpha:
+                bound = UPPER_BOUND
+            else:
+                bound = EXACT
+            table.store(game.zobrist_key, RESOLVED_DEPTH if resolved else depth, bound,
+                        score_to_table(best_score, ply), best_move, moves_left, needed)
+        return best_score
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
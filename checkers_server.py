@@ -0,0 +1,464 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains an asyncio server that hosts checkers games between bots running in
+other processes, and the adapter that lets any Player play on it.
+
+The server listens on a TCP port or a Unix socket, and every game is a coroutine on the same
+event loop, so thousands of games can be played at once without a thread for each. Each game
+is played by play_turns, just like run_game, and every move is checked with the engine before
+it is played.
+
+The protocol is one JSON object per line. A move is sent as a list of three positions, such as
+["c4", "d3", "e2"], as a move code (see checkers_moves), or as a list of those for a compound
+move. A bot connects and sends
+
+    {"op": "join", "game": <name>}
+
+and once a second bot joins the game with the same name, the game starts. The first bot to
+join plays white. The server then sends each bot:
+
+    {"op": "start", "game": <name>, "white": <whether this bot plays white>}
+    {"op": "turn", "previous_move": <move>, "continuing": <bool>, "moves": [<move>, ...]}
+        when it is this bot's turn, with its legal moves. The bot replies with
+        {"op": "move", "move": <move>}
+    {"op": "opponent_move", "move": <move>}
+        with every move the other bot makes, exactly as it sent it
+    {"op": "error", "message": <str>}
+        if a message or move was not valid. After an invalid move the turn is sent again,
+        up to MAX_INVALID_MOVES times.
+    {"op": "end", "winner": <"white", "black" or "draw">, "moves": <int>, "reason": <str>}
+
+A bot that disconnects, takes longer than the move timeout or sends too many invalid moves
+loses the game. play_remote (or run_remote_player) connects a Player to a server and plays one
+game with it, keeping its own copy of the board so the player sees the same game as in
+run_game.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import argparse
+import asyncio
+import json
+import random
+from typing import Any, Dict, Generator, List, Optional, Tuple
+from checkers_game_with_pygame_final import Checkers, Player, play_turns, find_turn_moves
+from checkers_moves import is_compound
+
+HOST = '127.0.0.1'
+PORT = 8111
+# How long a bot has to make a move, in seconds.
+MOVE_TIMEOUT = 60.0
+# How many invalid moves a bot can send in one game before it loses.
+MAX_INVALID_MOVES = 3
+# The longest line the server reads, in bytes.
+LINE_LIMIT = 1 << 16
+
+
+class ProtocolError(Exception):
+    """Raised when the other end of a connection sends a message that doesn't follow the
+    protocol."""
+
+
+def move_to_json(move: Any) -> Any:
+    """Return move (a move tuple, a move code or a compound move) as it is sent in a message.
+
+    >>> move_to_json((('c4', 'd3', 'e2'), 5))
+    [['c4', 'd3', 'e2'], 5]
+    """
+    if isinstance(move, int):
+        return move
+    if is_compound(move):
+        return [move_to_json(single_move) for single_move in move]
+    return list(move)
+
+
+def move_from_json(data: Any) -> Any:
+    """Return the move sent in a message as data, as a move tuple, a move code or a compound
+    move. Raise ProtocolError if data isn't a move in any of these forms.
+
+    >>> move_from_json([['c4', 'd3', 'e2'], 5])
+    (('c4', 'd3', 'e2'), 5)
+    """
+    if isinstance(data, int) and not isinstance(data, bool):
+        return data
+    if isinstance(data, list) and len(data) == 3 and all(isinstance(x, str) for x in data):
+        return tuple(data)
+    if isinstance(data, list) and data != [] and all(isinstance(x, (int, list)) for x in data):
+        moves = tuple(move_from_json(x) for x in data)
+        if not any(is_compound(move) for move in moves):
+            return moves
+    raise ProtocolError(f'not a move: {data!r}')
+
+
+async def read_message(reader: asyncio.StreamReader) -> Dict[str, Any]:
+    """Read one message from reader. Raise ConnectionError if the connection has closed, and
+    ProtocolError if the line isn't a JSON object."""
+    line = await reader.readline()
+    if line == b'':
+        raise ConnectionError('connection closed')
+    try:
+        message = json.loads(line)
+    except ValueError as error:
+        raise ProtocolError(f'not JSON: {error}') from None
+    if not isinstance(message, dict):
+        raise ProtocolError('a message must be a JSON object')
+    return message
+
+
+async def write_message(writer: asyncio.StreamWriter, message: Dict[str, Any]) -> None:
+    """Write message to writer as one line of JSON."""
+    writer.write(json.dumps(message).encode() + b'\n')
+    await writer.drain()
+
+
+def check_move(game: Checkers, previous_move: tuple[str, str, str],
+               continuing_from_previous_move: bool, move: Any) -> Optional[str]:
+    """Return why move isn't a move the current player of game can make, given the arguments
+    of Player.make_move, or None if it is. A compound move is checked one single move at a
+    time with push and pop, so game is left as it was.
+    """
+    if is_compound(move):
+        single_moves = list(move)
+    else:
+        single_moves = [move]
+    pushed = 0
+    problem = None
+    for i, sent_move in enumerate(single_moves):
+        if isinstance(sent_move, int):
+            single_move = game.codec.move_of.get(sent_move)
+        else:
+            single_move = sent_move
+        if single_move not in find_turn_moves(game, previous_move,
+                                              continuing_from_previous_move):
+            problem = f'{move_to_json(sent_move)} is not a legal move'
+            break
+        continuing_from_previous_move = game.push(single_move)
+        pushed += 1
+        previous_move = single_move
+        if not continuing_from_previous_move and i < len(single_moves) - 1:
+            problem = 'the compound move continues after the turn is over'
+            break
+    for _ in range(pushed):
+        game.pop()
+    return problem
+
+
+class RemotePlayer:
+    """A bot connected to a GameServer, seen from the server.
+
+    Instance Attributes:
+        - is_white: Whether the bot plays white.
+        - finished: Set to the winner of the bot's game when it is over.
+        - invalid_moves: The number of invalid moves the bot has sent in its game.
+    """
+    is_white: bool
+    finished: asyncio.Future
+    invalid_moves: int
+    # Private Instance Attributes:
+    #   - _reader: Where the bot's messages are read from.
+    #   - _writer: Where messages to the bot are written to.
+    #   - _watch: The read that notices if the bot disconnects while it waits for an
+    #     opponent, or None if it isn't waiting.
+    _reader: asyncio.StreamReader
+    _writer: asyncio.StreamWriter
+    _watch: Optional[asyncio.Future]
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._reader = reader
+        self._writer = writer
+        self._watch = None
+        self.is_white = True
+        self.finished = asyncio.get_running_loop().create_future()
+        self.invalid_moves = 0
+
+    async def wait_for_opponent(self) -> None:
+        """Wait until another bot claims this one as its opponent (see claim). Raise
+        ConnectionError if the bot disconnects first, and ProtocolError if it sends a message,
+        since it has nothing to say before its game starts."""
+        self._watch = asyncio.ensure_future(read_message(self._reader))
+        try:
+            await asyncio.wait([self._watch])
+        finally:
+            if not self._watch.done():
+                self._watch.cancel()
+        if self._watch.cancelled():
+            return
+        message = self._watch.result()
+        raise ProtocolError(f'expected to wait for an opponent, not {message!r}')
+
+    async def claim(self) -> bool:
+        """Stop this bot waiting for an opponent, so a game can be played with it, and return
+        True. Return False if the bot has disconnected or broken the protocol while waiting."""
+        if self._watch is None or self._watch.done():
+            return False
+        self._watch.cancel()
+        await asyncio.wait([self._watch])
+        return self._watch.cancelled()
+
+    async def send(self, message: Dict[str, Any]) -> None:
+        """Send message to the bot."""
+        await write_message(self._writer, message)
+
+    async def make_move(self, game: Checkers, previous_move: tuple[str, str, str],
+                        continuing_from_previous_move: bool, timeout: float) -> Any:
+        """Ask the bot for its move, like Player.make_move, and return it once it is a legal
+        move. Raise ProtocolError if the bot sends too many invalid moves, and
+        asyncio.TimeoutError if it takes longer than timeout seconds for one move.
+        """
+        moves = game.get_turn_moves(previous_move, continuing_from_previous_move)
+        turn = {'op': 'turn', 'previous_move': move_to_json(previous_move),
+                'continuing': continuing_from_previous_move,
+                'moves': [move_to_json(move) for move in moves]}
+        while True:
+            await self.send(turn)
+            message = await asyncio.wait_for(read_message(self._reader), timeout)
+            try:
+                if message.get('op') != 'move':
+                    raise ProtocolError(f'expected a move, not {message!r}')
+                move = move_from_json(message.get('move'))
+                problem = check_move(game, previous_move, continuing_from_previous_move, move)
+            except ProtocolError as error:
+                problem = str(error)
+            if problem is None:
+                return move
+            self.invalid_moves += 1
+            await self.send({'op': 'error', 'message': problem})
+            if self.invalid_moves >= MAX_INVALID_MOVES:
+                raise ProtocolError('too many invalid moves')
+
+    async def close(self) -> None:
+        """Close the connection to the bot."""
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except (ConnectionError, OSError):
+            pass
+
+
+class GameServer:
+    """A server that hosts checkers games between connected bots, all on one event loop.
+
+    Instance Attributes:
+        - move_timeout: How long a bot has to make each move, in seconds.
+        - results: The (name, winner, number of moves, reason) of every finished game.
+        - active_games: The number of games being played right now.
+
+    A bot that disconnects loses, even when it isn't its turn, and the moves made before it
+    left are counted:
+
+    >>> async def black_disconnects() -> tuple:
+    ...     server = GameServer()
+    ...     listener = await server.start(port=0)
+    ...     port = listener.sockets[0].getsockname()[1]
+    ...     white_reader, white_writer = await asyncio.open_connection(HOST, port)
+    ...     await write_message(white_writer, {'op': 'join', 'game': 'g'})
+    ...     while 'g' not in server._waiting:
+    ...         await asyncio.sleep(0.01)
+    ...     black_reader, black_writer = await asyncio.open_connection(HOST, port)
+    ...     await write_message(black_writer, {'op': 'join', 'game': 'g'})
+    ...     await read_message(black_reader)
+    ...     black_writer.close()
+    ...     await read_message(white_reader)
+    ...     turn = await read_message(white_reader)
+    ...     await write_message(white_writer, {'op': 'move', 'move': turn['moves'][0]})
+    ...     end = await read_message(white_reader)
+    ...     listener.close()
+    ...     return ([result[:3] for result in server.results], end['moves'])
+    >>> asyncio.run(black_disconnects())
+    ([('g', 'white', 1)], 1)
+    """
+    move_timeout: float
+    results: List[Tuple[str, str, int, str]]
+    active_games: int
+    # Private Instance Attributes:
+    #   - _waiting: The bot waiting for an opponent in each game that hasn't started yet. A
+    #     bot that disconnects while waiting is removed.
+    _waiting: Dict[str, RemotePlayer]
+
+    def __init__(self, move_timeout: float = MOVE_TIMEOUT) -> None:
+        self.move_timeout = move_timeout
+        self.results = []
+        self.active_games = 0
+        self._waiting = {}
+
+    async def start(self, host: str = HOST, port: int = PORT,
+                    path: Optional[str] = None) -> asyncio.AbstractServer:
+        """Start listening for bots on the Unix socket at path if it is given, and on host and
+        port otherwise, and return the asyncio server."""
+        if path is not None:
+            return await asyncio.start_unix_server(self.handle_connection, path,
+                                                   limit=LINE_LIMIT)
+        return await asyncio.start_server(self.handle_connection, host, port,
+                                          limit=LINE_LIMIT)
+
+    async def handle_connection(self, reader: asyncio.StreamReader,
+                                writer: asyncio.StreamWriter) -> None:
+        """Wait for the bot on a new connection to join a game, and play the game once it has
+        an opponent."""
+        player = RemotePlayer(reader, writer)
+        try:
+            message = await read_message(reader)
+            if message.get('op') != 'join' or not isinstance(message.get('game', ''), str):
+                raise ProtocolError(f'expected to join a game, not {message!r}')
+            name = message.get('game', '')
+            opponent = self._waiting.pop(name, None)
+            if opponent is not None and not await opponent.claim():
+                # It disconnected while waiting, and its own connection is dropping it
+                opponent = None
+            if opponent is None:
+                self._waiting[name] = player
+                try:
+                    await player.wait_for_opponent()
+                    # The game is played by the connection of the second bot to join.
+                    await player.finished
+                finally:
+                    if self._waiting.get(name) is player:
+                        del self._waiting[name]
+            else:
+                player.is_white = False
+                await self.play(name, opponent, player)
+        except ProtocolError as error:
+            try:
+                await player.send({'op': 'error', 'message': str(error)})
+            except (ConnectionError, OSError):
+                pass
+        except (ConnectionError, OSError):
+            pass
+        finally:
+            await player.close()
+
+    async def play(self, name: str, white: RemotePlayer, black: RemotePlayer) -> str:
+        """Play the game called name between white and black, and return the winner."""
+        players = {True: white, False: black}
+        game = Checkers()
+        turns = play_turns(game)
+        winner, num_moves, reason = 'draw', 0, 'game over'
+        # The bot being sent to or read from, which loses if that fails
+        culprit = white
+        self.active_games += 1
+        try:
+            for culprit in (white, black):
+                await culprit.send({'op': 'start', 'game': name, 'white': culprit.is_white})
+            previous_move, is_continued = next(turns)
+            while True:
+                culprit = players[game.is_white_move]
+                try:
+                    move = await culprit.make_move(game, previous_move, is_continued,
+                                                   self.move_timeout)
+                except asyncio.TimeoutError:
+                    reason = 'timeout'
+                    raise
+                culprit = players[not culprit.is_white]
+                await culprit.send({'op': 'opponent_move', 'move': move_to_json(move)})
+                previous_move, is_continued = turns.send(move)
+                # Counted as the moves are played, so a game that is forfeited has its moves too
+                num_moves = game.turn.move_count
+        except StopIteration as game_over:
+            winner, moves = game_over.value
+            num_moves = len(moves)
+        except (ConnectionError, OSError, ProtocolError, asyncio.TimeoutError) as error:
+            winner = 'black' if culprit.is_white else 'white'
+            if reason != 'timeout':
+                reason = f'{"white" if culprit.is_white else "black"} forfeited: {error}'
+        finally:
+            self.active_games -= 1
+
+        self.results.append((name, winner, num_moves, reason))
+        for player in (white, black):
+            try:
+                await player.send({'op': 'end', 'winner': winner, 'moves': num_moves,
+                                   'reason': reason})
+            except (ConnectionError, OSError):
+                pass
+        if not white.finished.done():
+            white.finished.set_result(winner)
+        return winner
+
+
+async def play_remote(player: Player, game_name: str = '', host: str = HOST,
+                      port: int = PORT, path: Optional[str] = None,
+                      rng: Optional[random.Random] = None) -> str:
+    """Connect to a GameServer (on the Unix socket at path if it is given), play the game
+    called game_name with player, and return the winner.
+
+    The player sees the same board, previous moves and continuing captures as in run_game,
+    because the game is also played here by play_turns with the moves the server sends. If
+    rng is given, the player makes its random choices with it.
+    """
+    if path is not None:
+        reader, writer = await asyncio.open_unix_connection(path, limit=LINE_LIMIT)
+    else:
+        reader, writer = await asyncio.open_connection(host, port, limit=LINE_LIMIT)
+    if rng is not None:
+        player.rng = rng
+    game = Checkers()
+    turns = play_turns(game)
+    request = next(turns)
+    try:
+        await write_message(writer, {'op': 'join', 'game': game_name})
+        is_white = True
+        while True:
+            message = await read_message(reader)
+            op = message.get('op')
+            if op == 'start':
+                is_white = message['white']
+            elif op == 'turn':
+                if game.is_white_move != is_white:
+                    raise ProtocolError('the server and this board disagree on whose turn it is')
+                move = player.make_move(game, request[0], request[1])
+                await write_message(writer, {'op': 'move', 'move': move_to_json(move)})
+                request = _send_move(turns, move)
+            elif op == 'opponent_move':
+                request = _send_move(turns, move_from_json(message['move']))
+            elif op == 'end':
+                return message['winner']
+            elif op == 'error':
+                raise ProtocolError(message.get('message'))
+    finally:
+        writer.close()
+
+
+def _send_move(turns: Generator, move: Any) -> Optional[Tuple[tuple, bool]]:
+    """Send move to the game being played by turns (see play_turns), and return what it yields
+    next, or None if the game is over."""
+    try:
+        return turns.send(move)
+    except StopIteration:
+        return None
+
+
+def run_remote_player(player: Player, game_name: str = '', host: str = HOST,
+                      port: int = PORT, path: Optional[str] = None) -> str:
+    """Play one game on a GameServer with player, like play_remote, and return the winner.
+    This is for bots that don't use asyncio themselves."""
+    return asyncio.run(play_remote(player, game_name, host, port, path))
+
+
+async def serve(host: str = HOST, port: int = PORT, path: Optional[str] = None,
+                move_timeout: float = MOVE_TIMEOUT) -> None:
+    """Run a GameServer until it is stopped."""
+    server = await GameServer(move_timeout).start(host, port, path)
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Host checkers games between bots.')
+    parser.add_argument('--host', default=HOST)
+    parser.add_argument('--port', type=int, default=PORT)
+    parser.add_argument('--unix', help='listen on this Unix socket instead of a TCP port')
+    parser.add_argument('--move-timeout', type=float, default=MOVE_TIMEOUT)
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.move_timeout))
+    except KeyboardInterrupt:
+        pass
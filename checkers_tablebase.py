@@ -0,0 +1,636 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains endgame tablebases: the result of every position with only a few
+pieces left, with perfect play from both sides, worked out ahead of time by retrograde analysis.
+
+The positions are split up by their material (see Signature), and each material has a table
+with one entry for every way of placing its pieces on the board and for either player to move,
+numbered by position_index. An entry is the result for the player to move (a win, a loss or a
+draw) and the number of moves the game lasts, so a game with a move limit can tell whether the
+win comes soon enough (see Tablebase.probe). The tables are saved in one small file each, which
+is memory-mapped when it is first probed, so looking a position up only reads one entry.
+
+The tables are generated by generate_tablebases, from the fewest pieces up: a capture or a
+crowning always leads to a material whose table is already finished, so only the moves that
+keep the material the same are solved together. Those are solved backwards from the positions
+whose result is already known, the quickest wins first, like a breadth-first search from the
+end of the game. The rules are the same as run_game's: captures must be made, a piece that is
+crowned in the middle of a multi-jump carries on capturing as a king, a player with no pieces
+left loses and a player with no moves draws. The move limit isn't part of the tables.
+
+Run this module to generate the tablebases for the 6x6 board, for example:
+    python checkers_tablebase.py --pieces 4
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import argparse
+import itertools
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+from checkers_topology import BoardTopology, get_topology, NO_SQUARE
+
+# The directory the tablebase files are saved in and read from by default.
+TABLEBASE_DIR = 'tablebases'
+# The board size the tablebases are made for by default.
+TABLEBASE_DIMENSION = 6
+# The most pieces in the positions of the tablebases generated by default.
+MAX_PIECES = 4
+
+# The result of a position for the player to move, in the lowest RESULT_BITS bits of an entry.
+# The rest of the entry is the number of moves the game lasts. Entries for placements that can't
+# happen (an uncrowned piece on the row it would have been crowned on) are NOT_A_POSITION.
+NOT_A_POSITION = 0
+WIN = 1
+LOSS = 2
+DRAW = 3
+RESULT_BITS = 2
+# The largest number of moves an entry can hold.
+MAX_DISTANCE = (1 << (16 - RESULT_BITS)) - 1
+# The start of every tablebase file, followed by the board size as one byte and three bytes of
+# padding. The entries come after it, as 16-bit little-endian numbers.
+FILE_MAGIC = b'CKTB'
+HEADER_SIZE = 8
+# The most pieces in one group of a Signature that position_index can number.
+MAX_GROUP = 8
+
+# A material: the number of white men, white kings, black men and black kings.
+Signature = Tuple[int, int, int, int]
+# A position as bitmasks of the squares (see BoardTopology) of the white men, white kings,
+# black men and black kings, and whether it is white's move.
+Masks = Tuple[int, int, int, int, bool]
+
+# _BINOMIAL[n][k] is n choose k.
+_BINOMIAL = [[math.comb(n, k) for k in range(MAX_GROUP + 1)] for n in range(129)]
+
+
+def _count_bits(mask: int) -> int:
+    """Return the number of bits set in mask."""
+    return bin(mask).count('1')
+
+
+def signature_of(masks: Masks) -> Signature:
+    """Return the material of the position masks.
+
+    >>> signature_of((0b11, 0b100, 0, 0b1000, True))
+    (2, 1, 0, 1)
+    """
+    return (_count_bits(masks[0]), _count_bits(masks[1]), _count_bits(masks[2]),
+            _count_bits(masks[3]))
+
+
+def signatures(max_pieces: int) -> List[Signature]:
+    """Return every material with at least one piece of each color and at most max_pieces
+    pieces, in the order their tables must be generated in: fewer pieces first, and fewer men
+    first for the same number of pieces, so captures and crownings always lead to a table that
+    comes earlier.
+
+    >>> signatures(2)
+    [(0, 1, 0, 1), (0, 1, 1, 0), (1, 0, 0, 1), (1, 0, 1, 0)]
+    """
+    result = []
+    for counts in itertools.product(range(max_pieces + 1), repeat=4):
+        if counts[0] + counts[1] >= 1 and counts[2] + counts[3] >= 1 \
+                and sum(counts) <= max_pieces:
+            result.append(counts)
+    return sorted(result, key=lambda counts: (sum(counts), counts[0] + counts[2]))
+
+
+def table_size(signature: Signature, num_squares: int) -> int:
+    """Return the number of entries in the table of signature on a board with num_squares
+    squares that pieces can be on.
+
+    >>> table_size((1, 0, 0, 1), 18)
+    612
+    """
+    size = 2
+    free = num_squares
+    for count in signature:
+        size *= _BINOMIAL[free][count]
+        free -= count
+    return size
+
+
+def position_index(masks: Masks, num_squares: int) -> int:
+    """Return the index of the position masks in the table of its material (see signature_of),
+    on a board with num_squares squares that pieces can be on.
+
+    Each group of pieces (white men, white kings, black men, black kings) is numbered by the
+    squares it is on out of the squares the groups before it aren't on, in the combinatorial
+    number system, so every placement of the material has its own index and there are no gaps.
+    The last bit is the player to move.
+
+    >>> position_index((0b1, 0, 0, 0b10, True), 18)
+    0
+    >>> position_index((0b1, 0, 0, 0b10, False), 18)
+    1
+    >>> sorted(position_index((1 << a, 0, 0, 1 << b, True), 18) // 2
+    ...        for a in range(18) for b in range(18) if a != b) == list(range(18 * 17))
+    True
+    """
+    index = 0
+    used = 0
+    free = num_squares
+    for mask in masks[:4]:
+        count = 0
+        rank = 0
+        rest = mask
+        while rest:
+            low = rest & -rest
+            rest ^= low
+            count += 1
+            rank += _BINOMIAL[(low.bit_length() - 1) - _count_bits(used & (low - 1))][count]
+        index = index * _BINOMIAL[free][count] + rank
+        free -= count
+        used |= mask
+    return 2 * index + (not masks[4])
+
+
+def _table_file(directory: str, signature: Signature) -> str:
+    """Return the name of the file the table of signature is saved in."""
+    return os.path.join(directory, 'endgame_{}{}{}{}.tb'.format(*signature))
+
+
+class TablebaseGenerator:
+    """Generates the tablebases of one board size (see the module docstring).
+
+    Instance Attributes:
+        - topology: The squares of the board.
+        - tables: The entries of every table generated so far, by material.
+
+    Representation Invariants:
+        - all(len(self.tables[s]) == table_size(s, len(self.topology.positions))
+              for s in self.tables)
+    """
+    topology: BoardTopology
+    tables: Dict[Signature, array]
+    # Private Instance Attributes:
+    #   - _num_squares: The number of squares pieces can be on.
+    #   - _steps: For each square and direction, the square one step away, or NO_SQUARE.
+    #   - _jumps: For each square and direction, the square a jump lands on, or NO_SQUARE.
+    #   - _man_directions: The directions the uncrowned pieces of each color move in, indexed
+    #     by whether the color is white.
+    #   - _crown_rows: The bitmask of the squares the pieces of each color are crowned on,
+    #     indexed by whether the color is white.
+    _num_squares: int
+    _steps: List[Tuple[int, ...]]
+    _jumps: List[Tuple[int, ...]]
+    _man_directions: Tuple[Tuple[int, ...], Tuple[int, ...]]
+    _crown_rows: Tuple[int, int]
+
+    def __init__(self, dimension: int = TABLEBASE_DIMENSION) -> None:
+        self.topology = get_topology(dimension)
+        self.tables = {}
+        self._num_squares = len(self.topology.positions)
+        self._steps = self.topology.neighbours
+        self._jumps = self.topology.jumps
+        # The same directions as _square_directions in checkers_game_with_pygame_final
+        self._man_directions = ((0, 1), (2, 3))
+        coords = self.topology.coords
+        self._crown_rows = (sum(1 << sq for sq in range(self._num_squares)
+                                if coords[sq][1] == dimension - 1),
+                            sum(1 << sq for sq in range(self._num_squares) if coords[sq][1] == 0))
+
+    def generate(self, directory: str, max_pieces: int = MAX_PIECES,
+                 verbose: bool = False) -> None:
+        """Generate the tables of every material with at most max_pieces pieces that isn't in
+        self.tables yet, and save each one to directory."""
+        os.makedirs(directory, exist_ok=True)
+        for signature in signatures(max_pieces):
+            if signature in self.tables:
+                continue
+            start = time.perf_counter()
+            self.tables[signature] = self.solve(signature)
+            save_table(directory, self.topology.dimension, signature, self.tables[signature])
+            if verbose:
+                entries = self.tables[signature]
+                counts = [0] * 4
+                for entry in entries:
+                    counts[entry & 3] += 1
+                print(f'{signature}: {len(entries)} entries, {counts[WIN]} wins, '
+                      f'{counts[LOSS]} losses, {counts[DRAW]} draws, '
+                      f'{time.perf_counter() - start:.1f} s')
+
+    def placements(self, signature: Signature) -> List[Tuple[int, int, int, int]]:
+        """Return every placement of the pieces of signature (see Masks) where no uncrowned
+        piece is on the row it would have been crowned on."""
+        white_men, white_kings, black_men, black_kings = signature
+        all_squares = range(self._num_squares)
+        white_man_squares = [sq for sq in all_squares if not self._crown_rows[True] >> sq & 1]
+        black_man_squares = [sq for sq in all_squares if not self._crown_rows[False] >> sq & 1]
+        result = []
+        for group_1 in itertools.combinations(white_man_squares, white_men):
+            used_1 = sum(1 << sq for sq in group_1)
+            for group_2 in itertools.combinations(all_squares, white_kings):
+                used_2 = sum(1 << sq for sq in group_2)
+                if used_1 & used_2:
+                    continue
+                for group_3 in itertools.combinations(black_man_squares, black_men):
+                    used_3 = sum(1 << sq for sq in group_3)
+                    if (used_1 | used_2) & used_3:
+                        continue
+                    for group_4 in itertools.combinations(all_squares, black_kings):
+                        used_4 = sum(1 << sq for sq in group_4)
+                        if (used_1 | used_2 | used_3) & used_4 == 0:
+                            result.append((used_1, used_2, used_3, used_4))
+        return result
+
+    def solve(self, signature: Signature) -> array:
+        """Return the entries of the table of signature. The tables of every material that a
+        capture or a crowning from it leads to must already be in self.tables."""
+        num_squares = self._num_squares
+        size = table_size(signature, num_squares)
+        entries = array('H', bytes(2 * size))
+        no_distance = MAX_DISTANCE + 1
+        # For each position: the quickest win from a turn that leaves this table, the slowest
+        # loss so far, whether a turn leads to a draw, and the number of turns that stay in
+        # this table whose result isn't known yet
+        quickest_win = array('H', [no_distance]) * size
+        slowest_loss = array('H', bytes(2 * size))
+        has_draw = bytearray(size)
+        unknown = bytearray(size)
+        valid = bytearray(size)
+        # The turns that stay in this table, as (position after, position before)
+        edge_to = array('I')
+        edge_from = array('I')
+
+        for white_men, white_kings, black_men, black_kings in self.placements(signature):
+            for is_white in (True, False):
+                index = position_index((white_men, white_kings, black_men, black_kings,
+                                        is_white), num_squares)
+                valid[index] = 1
+                if is_white:
+                    turns = self.turns(white_men, white_kings, black_men, black_kings, True)
+                else:
+                    turns = [(m_1, k_1, m_2, k_2, hops) for m_2, k_2, m_1, k_1, hops
+                             in self.turns(black_men, black_kings, white_men, white_kings,
+                                           False)]
+                if turns == []:
+                    entries[index] = DRAW
+                    continue
+                for after_wm, after_wk, after_bm, after_bk, hops in turns:
+                    after = (after_wm, after_wk, after_bm, after_bk, not is_white)
+                    if is_white and after_bm | after_bk == 0 or \
+                            not is_white and after_wm | after_wk == 0:
+                        # The turn captured the last piece of the other player
+                        quickest_win[index] = min(quickest_win[index], hops)
+                        continue
+                    after_index = position_index(after, num_squares)
+                    after_signature = signature_of(after)
+                    if after_signature == signature:
+                        edge_to.append(after_index)
+                        edge_from.append(index)
+                        unknown[index] += 1
+                        continue
+                    entry = self.tables[after_signature][after_index]
+                    result, distance = entry & 3, (entry >> RESULT_BITS) + hops
+                    if result == LOSS:
+                        quickest_win[index] = min(quickest_win[index], distance)
+                    elif result == WIN:
+                        slowest_loss[index] = max(slowest_loss[index], distance)
+                    else:
+                        has_draw[index] = 1
+
+        # The positions before each position, by turns that stay in this table
+        first_before = array('I', bytes(4 * (size + 1)))
+        for after_index in edge_to:
+            first_before[after_index + 1] += 1
+        for index in range(size):
+            first_before[index + 1] += first_before[index]
+        before = array('I', bytes(4 * len(edge_to)))
+        filled = array('I', first_before[:size])
+        for after_index, index in zip(edge_to, edge_from):
+            before[filled[after_index]] = index
+            filled[after_index] += 1
+
+        # The positions whose result becomes known at each distance, as (result, index)
+        pending: Dict[int, List[Tuple[int, int]]] = {}
+        for index in range(size):
+            if not valid[index] or entries[index] != NOT_A_POSITION:
+                continue
+            if quickest_win[index] != no_distance:
+                pending.setdefault(quickest_win[index], []).append((WIN, index))
+            elif unknown[index] == 0 and not has_draw[index]:
+                pending.setdefault(slowest_loss[index], []).append((LOSS, index))
+
+        distance = 0
+        while pending:
+            for result, index in pending.pop(distance, []):
+                if entries[index] != NOT_A_POSITION:
+                    # A quicker result was already found
+                    continue
+                if distance > MAX_DISTANCE:
+                    raise ValueError(f'a game in {signature} lasts too long to be saved')
+                entries[index] = distance << RESULT_BITS | result
+                for edge in range(first_before[index], first_before[index + 1]):
+                    index_before = before[edge]
+                    if entries[index_before] != NOT_A_POSITION:
+                        continue
+                    if result == LOSS:
+                        pending.setdefault(distance + 1, []).append((WIN, index_before))
+                    else:
+                        unknown[index_before] -= 1
+                        slowest_loss[index_before] = max(slowest_loss[index_before],
+                                                         distance + 1)
+                        if unknown[index_before] == 0 and not has_draw[index_before] and \
+                                quickest_win[index_before] == no_distance:
+                            pending.setdefault(slowest_loss[index_before], []).append(
+                                (LOSS, index_before))
+            distance += 1
+
+        # Every other position can't be won by either player
+        for index in range(size):
+            if valid[index] and entries[index] == NOT_A_POSITION:
+                entries[index] = DRAW
+        return entries
+
+    def turns(self, own_men: int, own_kings: int, other_men: int, other_kings: int,
+              is_white: bool) -> List[Tuple[int, int, int, int, int]]:
+        """Return the position after every turn the player with the pieces own_men and
+        own_kings can make, as (own men, own kings, other men, other kings, number of moves).
+        is_white is whether they are white."""
+        results = []
+        steps = self._steps
+        jumps = self._jumps
+        others = other_men | other_kings
+
+        # Captures must be made if there are any
+        for kings, pieces in ((False, own_men), (True, own_kings)):
+            directions = (0, 1, 2, 3) if kings else self._man_directions[is_white]
+            rest = pieces
+            while rest:
+                low = rest & -rest
+                rest ^= low
+                sq = low.bit_length() - 1
+                if any(jumps[sq][d] != NO_SQUARE and others >> steps[sq][d] & 1
+                       for d in directions):
+                    if kings:
+                        self._add_jumps(sq, True, own_men, own_kings ^ low, other_men,
+                                        other_kings, 0, is_white, results)
+                    else:
+                        self._add_jumps(sq, False, own_men ^ low, own_kings, other_men,
+                                        other_kings, 0, is_white, results)
+        if results != []:
+            return results
+
+        empty = ~(own_men | own_kings | others)
+        crown_row = self._crown_rows[is_white]
+        for kings, pieces in ((False, own_men), (True, own_kings)):
+            directions = (0, 1, 2, 3) if kings else self._man_directions[is_white]
+            rest = pieces
+            while rest:
+                low = rest & -rest
+                rest ^= low
+                sq = low.bit_length() - 1
+                for d in directions:
+                    target = steps[sq][d]
+                    if target == NO_SQUARE or not empty >> target & 1:
+                        continue
+                    bit = 1 << target
+                    if kings:
+                        results.append((own_men, own_kings ^ low | bit, other_men, other_kings,
+                                        1))
+                    elif crown_row & bit:
+                        results.append((own_men ^ low, own_kings | bit, other_men, other_kings,
+                                        1))
+                    else:
+                        results.append((own_men ^ low | bit, own_kings, other_men, other_kings,
+                                        1))
+        return results
+
+    def _add_jumps(self, sq: int, is_king: bool, own_men: int, own_kings: int, other_men: int,
+                   other_kings: int, hops: int, is_white: bool,
+                   results: List[Tuple[int, int, int, int, int]]) -> None:
+        """Add every way a piece on sq, which isn't in own_men or own_kings, can finish a
+        multi-jump after hops captures to results. A piece that is crowned carries on capturing
+        as a king."""
+        directions = (0, 1, 2, 3) if is_king else self._man_directions[is_white]
+        occupied = own_men | own_kings | other_men | other_kings
+        jumped = False
+        for d in directions:
+            land = self._jumps[sq][d]
+            if land == NO_SQUARE or occupied >> land & 1:
+                continue
+            over = 1 << self._steps[sq][d]
+            if other_men & over:
+                after_men, after_kings = other_men ^ over, other_kings
+            elif other_kings & over:
+                after_men, after_kings = other_men, other_kings ^ over
+            else:
+                continue
+            jumped = True
+            crowned = is_king or self._crown_rows[is_white] >> land & 1 == 1
+            self._add_jumps(land, crowned, own_men, own_kings, after_men, after_kings, hops + 1,
+                            is_white, results)
+        if not jumped and hops > 0:
+            if is_king:
+                results.append((own_men, own_kings | 1 << sq, other_men, other_kings, hops))
+            else:
+                results.append((own_men | 1 << sq, own_kings, other_men, other_kings, hops))
+
+
+def save_table(directory: str, dimension: int, signature: Signature, entries: array) -> None:
+    """Save the entries of the table of signature, for a board with dimension rows, to its
+    file in directory."""
+    data = array('H', entries)
+    if sys.byteorder != 'little':
+        data.byteswap()
+    with open(_table_file(directory, signature), 'wb') as file:
+        file.write(FILE_MAGIC + bytes([dimension, 0, 0, 0]))
+        file.write(data.tobytes())
+
+
+def generate_tablebases(directory: str = TABLEBASE_DIR, max_pieces: int = MAX_PIECES,
+                        dimension: int = TABLEBASE_DIMENSION, verbose: bool = False) -> None:
+    """Generate the tablebases of every position with at most max_pieces pieces on a board with
+    dimension rows, and save them to directory."""
+    TablebaseGenerator(dimension).generate(directory, max_pieces, verbose)
+
+
+class Tablebase:
+    """The tablebases saved in a directory, which are read from their files as they are needed.
+
+    Instance Attributes:
+        - directory: The directory the tablebase files are in.
+        - dimension: The number of rows of the board the tablebases are for.
+        - max_pieces: The most pieces of any table in directory.
+
+    The result of every position is the best of the results its turns lead to, played with
+    the engine:
+
+    >>> import random, tempfile
+    >>> os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = '1'
+    >>> from checkers_game_with_pygame_final import Checkers, Piece
+    >>> directory = tempfile.TemporaryDirectory()
+    >>> generate_tablebases(directory.name, 3)
+    >>> tablebase, rng = Tablebase(directory.name), random.Random(25)
+    >>> def after(game, turn):
+    ...     for move in turn:
+    ...         game.push(move)
+    ...     found = tablebase.probe(game) or (game.get_winner(0), 0)
+    ...     for _ in turn:
+    ...         game.pop()
+    ...     return (found[0], found[1] + len(turn))
+    >>> def best(game):
+    ...     player = 'white' if game.is_white_move else 'black'
+    ...     results = [after(game, turn) for turn in game.get_compound_moves()]
+    ...     wins = [moves for winner, moves in results if winner == player]
+    ...     if wins != []:
+    ...         return (player, min(wins))
+    ...     if results != [] and all(winner not in (player, 'draw') for winner, _ in results):
+    ...         return (results[0][0], max(moves for _, moves in results))
+    ...     return 'draw'
+    >>> def random_position():
+    ...     sides = ({}, {})
+    ...     for i, pos in enumerate(rng.sample(get_topology(6).positions, 3)):
+    ...         piece = Piece(i == 0 or i == 2 and rng.random() < 0.5, pos)
+    ...         piece.is_crowned = rng.random() < 0.5
+    ...         sides[not piece.white][pos] = piece
+    ...     return Checkers(sides[0], sides[1], rng.random() < 0.5)
+    >>> probed = [(tablebase.probe(game), game) for game in
+    ...           (random_position() for _ in range(300))]
+    >>> all(best(game) == (found if found[0] != 'draw' else 'draw')
+    ...     for found, game in probed if found is not None)
+    True
+    >>> tablebase.close()
+    >>> directory.cleanup()
+    """
+    directory: str
+    dimension: int
+    max_pieces: int
+    # Private Instance Attributes:
+    #   - _topology: The squares of the board.
+    #   - _tables: The memory-mapped file of each table that has been probed, or None if it
+    #     doesn't have a file.
+    _topology: BoardTopology
+    _tables: Dict[Signature, Optional[mmap.mmap]]
+
+    def __init__(self, directory: str = TABLEBASE_DIR,
+                 dimension: int = TABLEBASE_DIMENSION) -> None:
+        self.directory = directory
+        self.dimension = dimension
+        self._topology = get_topology(dimension)
+        self._tables = {}
+        self.max_pieces = 0
+        if os.path.isdir(directory):
+            for name in os.listdir(directory):
+                if name.startswith('endgame_') and name.endswith('.tb'):
+                    self.max_pieces = max(self.max_pieces,
+                                          sum(int(count) for count in name[8:-3]))
+
+    def probe_masks(self, masks: Masks) -> Optional[Tuple[int, int]]:
+        """Return the result for the player to move (WIN, LOSS or DRAW) and the number of moves
+        the game lasts with perfect play, for the position masks, or None if it isn't in the
+        tablebases."""
+        signature = signature_of(masks)
+        if sum(signature) > self.max_pieces:
+            return None
+        if signature not in self._tables:
+            self._tables[signature] = self._open(signature)
+        table = self._tables[signature]
+        if table is None:
+            return None
+        offset = HEADER_SIZE + 2 * position_index(masks, len(self._topology.positions))
+        if offset + 2 > len(table):
+            return None
+        entry = struct.unpack_from('<H', table, offset)[0]
+        if entry & 3 == NOT_A_POSITION:
+            return None
+        return (entry & 3, entry >> RESULT_BITS)
+
+    def probe(self, game, move_count: Optional[int] = None) -> Optional[Tuple[str, int]]:
+        """Return the winner of the game being played on game with perfect play ('white',
+        'black' or 'draw', like Checkers.get_winner), and the number of moves until the game
+        ends, or None if the position isn't in the tablebases. game can be any board with the
+        same attributes as Checkers, and the current player must be starting their turn.
+
+        If move_count, the number of moves made so far, is given, a win that would come after
+        the move limit of game is a draw.
+        """
+        if game.dimension != self.dimension or \
+                len(game.white_pieces) + len(game.black_pieces) > self.max_pieces:
+            return None
+        index_of = self._topology.index_of
+        masks = [0, 0, 0, 0]
+        for group, pieces in ((0, game.white_pieces), (2, game.black_pieces)):
+            for pos, piece in pieces.items():
+                masks[group + piece.is_crowned] |= 1 << index_of[pos]
+        if masks[0] | masks[1] == 0 or masks[2] | masks[3] == 0:
+            return None
+        found = self.probe_masks((masks[0], masks[1], masks[2], masks[3], game.is_white_move))
+        if found is None:
+            return None
+        result, distance = found
+        if result == DRAW or move_count is not None and move_count + distance > game.move_limit:
+            return ('draw', distance)
+        if (result == WIN) == game.is_white_move:
+            return ('white', distance)
+        return ('black', distance)
+
+    def close(self) -> None:
+        """Close the files of the tables."""
+        for table in self._tables.values():
+            if table is not None:
+                table.close()
+        self._tables = {}
+
+    def _open(self, signature: Signature) -> Optional[mmap.mmap]:
+        """Return the memory-mapped file of the table of signature, or None if there isn't a
+        file for it."""
+        filename = _table_file(self.directory, signature)
+        if not os.path.exists(filename):
+            return None
+        with open(filename, 'rb') as file:
+            table = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        if table[:4] != FILE_MAGIC or table[4] != self.dimension:
+            table.close()
+            raise ValueError(f'{filename} is not a tablebase for a {self.dimension}x'
+                             f'{self.dimension} board')
+        return table
+
+
+# The tablebases opened by get_tablebase, by directory and board size.
+_TABLEBASES: Dict[Tuple[str, int], Tablebase] = {}
+
+
+def get_tablebase(dimension: int = TABLEBASE_DIMENSION,
+                  directory: str = TABLEBASE_DIR) -> Tablebase:
+    """Return the tablebases in directory for a board with dimension rows, which are only
+    opened the first time they are asked for."""
+    key = (directory, dimension)
+    if key not in _TABLEBASES:
+        _TABLEBASES[key] = Tablebase(directory, dimension)
+    return _TABLEBASES[key]
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Generate the tablebases from the command line."""
+    parser = argparse.ArgumentParser(description='Generate endgame tablebases.')
+    parser.add_argument('-d', '--directory', default=TABLEBASE_DIR,
+                        help='the directory to save the tablebases in')
+    parser.add_argument('-n', '--pieces', type=int, default=MAX_PIECES,
+                        help='the most pieces in a position of the tablebases')
+    parser.add_argument('--dimension', type=int, default=TABLEBASE_DIMENSION,
+                        help='the number of rows of the board')
+    args = parser.parse_args(argv)
+    generate_tablebases(args.directory, args.pieces, args.dimension, verbose=True)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
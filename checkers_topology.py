@@ -0,0 +1,159 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains the BoardTopology class, which holds precomputed tables about the
+squares of a checkers board: which squares are diagonal to each other, which square a piece
+lands on when it jumps, and how to convert between positions like 'c4' and square numbers.
+
+The tables are built once per board size (see get_topology), so the game never has to do any
+string arithmetic to find its way around the board.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import Dict, List, Optional, Tuple
+
+# Used in the tables for a square that is not on the board.
+NO_SQUARE = -1
+
+# The four diagonal directions as (change in column, change in row), in the same order as
+# Checkers.get_neighbours: top right, top left, bottom right, bottom left.
+DIRECTIONS = ((1, 1), (-1, 1), (1, -1), (-1, -1))
+
+
+class BoardTopology:
+    """The squares of a checkers board that pieces can be on, and how they connect.
+
+    Squares are numbered from 0, going along each row from the left (column 'a') and then up
+    the rows from row 1, skipping the squares that pieces can never be on.
+
+    Instance Attributes:
+        - dimension: The number of rows (and columns) of the board.
+        - white_start: The starting positions of the white pieces, which fill the top
+          dimension // 2 - 1 rows.
+        - black_start: The starting positions of the black pieces, which fill the bottom
+          dimension // 2 - 1 rows.
+        - positions: The position of each square, so positions[i] is the name of square i.
+        - index_of: The square number of each position.
+        - coords: The (column, row) of each square, both starting from 0.
+        - neighbours: For each square, the squares diagonal to it in each of the four
+          DIRECTIONS, or NO_SQUARE if that would be off the board.
+        - jumps: For each square, the square a piece on it would land on after jumping in each
+          of the four DIRECTIONS, or NO_SQUARE if that would be off the board.
+        - between: Maps (start, end) of every possible jump to the square that is jumped over.
+        - jump_masks: For each square and each of the four DIRECTIONS, the pair of bitmasks
+          (1 << square jumped over, 1 << square landed on), or None if that jump would go off
+          the board.
+        - nearby: For each square, a bitmask of itself and the squares one or two diagonal steps
+          away from it. These are the only squares whose pieces can start, jump over, or land
+          on it in a single capture.
+
+    Representation Invariants:
+        - self.dimension % 2 == 0
+        - len(self.positions) == self.dimension * self.dimension // 2
+        - all(self.index_of[self.positions[i]] == i for i in range(len(self.positions)))
+    """
+    dimension: int
+    white_start: List[str]
+    black_start: List[str]
+    positions: List[str]
+    index_of: Dict[str, int]
+    coords: List[Tuple[int, int]]
+    neighbours: List[Tuple[int, int, int, int]]
+    jumps: List[Tuple[int, int, int, int]]
+    between: Dict[Tuple[int, int], int]
+    jump_masks: List[Tuple[Optional[Tuple[int, int]], ...]]
+    nearby: List[int]
+    # Private Instance Attributes:
+    #   - _position_at: The position at each (column, row), or '' if pieces can't be there.
+    _position_at: Dict[Tuple[int, int], str]
+
+    def __init__(self, dimension: int) -> None:
+        self.dimension = dimension
+        self.positions = []
+        self.coords = []
+        self._position_at = {}
+
+        for row in range(dimension):
+            for col in range(dimension):
+                if (row + col) % 2 == 1:
+                    position = chr(ord('a') + col) + str(row + 1)
+                    self.positions.append(position)
+                    self.coords.append((col, row))
+                    self._position_at[(col, row)] = position
+                else:
+                    self._position_at[(col, row)] = ''
+
+        self.index_of = {position: i for i, position in enumerate(self.positions)}
+        start_rows = dimension // 2 - 1
+        self.white_start = [self.positions[i] for i, (_, row) in enumerate(self.coords)
+                            if row >= dimension - start_rows]
+        self.black_start = [self.positions[i] for i, (_, row) in enumerate(self.coords)
+                            if row < start_rows]
+        square_at = {coord: i for i, coord in enumerate(self.coords)}
+
+        self.neighbours = []
+        self.jumps = []
+        self.between = {}
+        for i, (col, row) in enumerate(self.coords):
+            neighbours = []
+            jumps = []
+            for d_col, d_row in DIRECTIONS:
+                over = square_at.get((col + d_col, row + d_row), NO_SQUARE)
+                land = square_at.get((col + 2 * d_col, row + 2 * d_row), NO_SQUARE)
+                neighbours.append(over)
+                jumps.append(land)
+                if land != NO_SQUARE:
+                    self.between[(i, land)] = over
+            self.neighbours.append(tuple(neighbours))
+            self.jumps.append(tuple(jumps))
+
+        self.jump_masks = [tuple((1 << over, 1 << land) if land != NO_SQUARE else None
+                                 for over, land in zip(self.neighbours[i], self.jumps[i]))
+                           for i in range(len(self.positions))]
+        self.nearby = [(1 << i) | sum(1 << sq for sq in self.neighbours[i] + self.jumps[i]
+                                      if sq != NO_SQUARE)
+                       for i in range(len(self.positions))]
+
+    def position_at(self, col: int, row: int) -> str:
+        """Return the position at the given column and row (both starting from 0), or '' if it
+        is off the board or not a square that pieces can be on."""
+        return self._position_at.get((col, row), '')
+
+
+# The topologies that have been built so far, by board size.
+_TOPOLOGIES: Dict[int, BoardTopology] = {}
+
+
+def get_topology(dimension: int) -> BoardTopology:
+    """Return the BoardTopology for a board with the given number of rows and columns.
+    Each topology is only built the first time it is asked for.
+
+    >>> topology = get_topology(6)
+    >>> topology.positions[topology.neighbours[topology.index_of['c4']][0]]
+    'd5'
+    >>> topology.positions[topology.jumps[topology.index_of['c4']][3]]
+    'a2'
+    >>> get_topology(6) is topology
+    True
+    >>> sorted(topology.white_start)
+    ['a6', 'b5', 'c6', 'd5', 'e6', 'f5']
+    >>> len(get_topology(8).black_start), len(get_topology(10).black_start)
+    (12, 20)
+    """
+    if dimension not in _TOPOLOGIES:
+        _TOPOLOGIES[dimension] = BoardTopology(dimension)
+    return _TOPOLOGIES[dimension]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,317 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains the Tournament class, which plays a round-robin tournament between
+types of checkers players and rates them.
+
+Every pair of player types plays the same number of games with each colour assignment, using
+run_game. The games can be played in a pool of processes, and every game has its own random
+number generator (see game_rng), so a tournament gives the same results however many processes
+play it. The players' Elo and Glicko ratings are updated after every game, in the order of the
+games, and the tournament can save checkpoints so that a long run can be stopped and resumed.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import json
+import math
+import multiprocessing
+import os
+from typing import Callable, Dict, List, Optional, Tuple
+from checkers_game_with_pygame_final import Player, run_game, game_rng
+from checkers_game_tree_final import CheckersGameTree
+
+# Makes a new player of one type for a game, given the game tree the AI players use (which may
+# be None). This must be a class or a module-level function, so it can be sent to other
+# processes.
+PlayerFactory = Callable[[Optional[CheckersGameTree]], Player]
+
+ELO_START = 1500.0
+ELO_K = 32.0
+GLICKO_START = 1500.0
+GLICKO_START_RD = 350.0
+GLICKO_MIN_RD = 30.0
+_GLICKO_Q = math.log(10) / 400
+
+
+def elo_update(white: float, black: float, white_score: float) -> Tuple[float, float]:
+    """Return the new Elo ratings of white and black after a game where white scored
+    white_score (1 for a win, 0.5 for a draw and 0 for a loss).
+
+    >>> elo_update(1500.0, 1500.0, 1.0)
+    (1516.0, 1484.0)
+    """
+    expected = 1 / (1 + 10 ** ((black - white) / 400))
+    change = ELO_K * (white_score - expected)
+    return (white + change, black - change)
+
+
+def glicko_update(player: Tuple[float, float], opponent: Tuple[float, float],
+                  score: float) -> Tuple[float, float]:
+    """Return the new Glicko (rating, rating deviation) of player after one game against
+    opponent, where player scored score. Each game is treated as its own rating period, and
+    the deviation never goes below GLICKO_MIN_RD, so ratings can keep moving in long runs.
+
+    >>> rating, rd = glicko_update((1500.0, 350.0), (1500.0, 350.0), 1.0)
+    >>> round(rating), round(rd)
+    (1662, 290)
+    """
+    rating, rd = player
+    opponent_rating, opponent_rd = opponent
+    g = 1 / math.sqrt(1 + 3 * _GLICKO_Q ** 2 * opponent_rd ** 2 / math.pi ** 2)
+    expected = 1 / (1 + 10 ** (-g * (rating - opponent_rating) / 400))
+    d_squared = 1 / (_GLICKO_Q ** 2 * g ** 2 * expected * (1 - expected))
+    precision = 1 / rd ** 2 + 1 / d_squared
+    new_rating = rating + _GLICKO_Q / precision * g * (score - expected)
+    return (new_rating, max(math.sqrt(1 / precision), GLICKO_MIN_RD))
+
+
+class Tournament:
+    """A round-robin tournament between types of checkers players.
+
+    Instance Attributes:
+        - player_names: The names of the player types, in order.
+        - games_per_pairing: The number of games each ordered pair of different player types
+          plays, with the first as white and the second as black.
+        - seed: The seed of the tournament. Game i is played with game_rng(seed, i).
+        - schedule: The (white, black) player names of every game, in the order they are
+          played and rated.
+        - next_game: The index in schedule of the first game that has not been played.
+        - elo: The Elo rating of each player type.
+        - glicko: The Glicko (rating, rating deviation) of each player type.
+        - records: The [wins, losses, draws] of each player type.
+        - pairings: The [white wins, black wins, draws] of each (white, black) pair of
+          player types.
+        - total_moves: The number of moves made in all the games played so far.
+
+    Representation Invariants:
+        - 0 <= self.next_game <= len(self.schedule)
+        - len(self.schedule) == len(self.player_names) * (len(self.player_names) - 1) \
+            * self.games_per_pairing
+    """
+    player_names: List[str]
+    games_per_pairing: int
+    seed: int
+    schedule: List[Tuple[str, str]]
+    next_game: int
+    elo: Dict[str, float]
+    glicko: Dict[str, Tuple[float, float]]
+    records: Dict[str, List[int]]
+    pairings: Dict[Tuple[str, str], List[int]]
+    total_moves: int
+
+    def __init__(self, player_names: List[str], games_per_pairing: int, seed: int = 0) -> None:
+        self.player_names = list(player_names)
+        self.games_per_pairing = games_per_pairing
+        self.seed = seed
+        # Going through the games one round at a time means the ratings are meaningful even
+        # if the tournament is stopped early.
+        self.schedule = [(white, black) for _ in range(games_per_pairing)
+                         for white in self.player_names for black in self.player_names
+                         if white != black]
+        self.next_game = 0
+        self.elo = {name: ELO_START for name in self.player_names}
+        self.glicko = {name: (GLICKO_START, GLICKO_START_RD) for name in self.player_names}
+        self.records = {name: [0, 0, 0] for name in self.player_names}
+        self.pairings = {pair: [0, 0, 0] for pair in set(self.schedule)}
+        self.total_moves = 0
+
+    def is_over(self) -> bool:
+        """Return whether every game of the tournament has been played."""
+        return self.next_game == len(self.schedule)
+
+    def play(self, players: Dict[str, PlayerFactory],
+             game_tree: Optional[CheckersGameTree] = None, processes: int = 1,
+             checkpoint_file: Optional[str] = None, checkpoint_every: int = 100) -> None:
+        """Play the rest of the games of the tournament, rating the players after each game.
+        players maps each of self.player_names to a PlayerFactory, and game_tree is given to
+        every factory.
+
+        If processes is more than 1, the games are played in a pool of that many processes.
+        If checkpoint_file is given and it exists, the tournament is first resumed from it
+        (see load_checkpoint), and a new checkpoint is saved to it every checkpoint_every
+        games and at the end.
+
+        A tournament resumed from a checkpoint ends with the same standings as one played
+        without stopping:
+        >>> import os, tempfile
+        >>> from AI_players_final import random_player, AggressivePlayer, DefensivePlayer
+        >>> players = {'Random': random_player, 'Aggressive': AggressivePlayer,
+        ...            'Defensive': DefensivePlayer}
+        >>> whole = Tournament(list(players), 1)
+        >>> whole.play(players)
+        >>> with tempfile.TemporaryDirectory() as directory:
+        ...     checkpoint = os.path.join(directory, 'tournament.json')
+        ...     stopped = Tournament(list(players), 1)
+        ...     # Only play the first half of the games, as if the run was stopped there
+        ...     stopped.schedule = stopped.schedule[:3]
+        ...     stopped.play(players, checkpoint_file=checkpoint)
+        ...     resumed = Tournament(list(players), 1)
+        ...     resumed.play(players, checkpoint_file=checkpoint)
+        >>> stopped.next_game, resumed.is_over()
+        (3, True)
+        >>> resumed.standings() == whole.standings()
+        True
+        """
+        if checkpoint_file is not None and os.path.exists(checkpoint_file):
+            self.load_checkpoint(checkpoint_file)
+
+        games = [(i, white, black) for i, (white, black) in enumerate(self.schedule)
+                 if i >= self.next_game]
+        worker_args = ({name: players[name] for name in self.player_names}, game_tree,
+                       self.seed)
+
+        if processes > 1:
+            with multiprocessing.Pool(processes, _init_worker, worker_args) as pool:
+                # imap gives the results in the order of the games, so the ratings are the
+                # same however many processes there are.
+                self._record_results(pool.imap(_play_game, games, chunksize=4),
+                                     checkpoint_file, checkpoint_every)
+        else:
+            _init_worker(*worker_args)
+            self._record_results(map(_play_game, games), checkpoint_file, checkpoint_every)
+
+        if checkpoint_file is not None:
+            self.save_checkpoint(checkpoint_file)
+
+    def _record_results(self, results, checkpoint_file: Optional[str],
+                        checkpoint_every: int) -> None:
+        """Record each (game index, winner, number of moves) in results, saving a checkpoint
+        every checkpoint_every games if checkpoint_file is not None."""
+        for i, winner, num_moves in results:
+            self.record_result(i, winner, num_moves)
+            if checkpoint_file is not None and self.next_game % checkpoint_every == 0:
+                self.save_checkpoint(checkpoint_file)
+
+    def record_result(self, i: int, winner: str, num_moves: int) -> None:
+        """Record that game i of the schedule was won by winner ('white', 'black' or 'draw')
+        after num_moves moves, and update the ratings.
+
+        Preconditions:
+            - i == self.next_game
+        """
+        white, black = self.schedule[i]
+        white_score = {'white': 1.0, 'black': 0.0, 'draw': 0.5}[winner]
+        pairing = self.pairings[(white, black)]
+        if winner == 'white':
+            pairing[0] += 1
+            self.records[white][0] += 1
+            self.records[black][1] += 1
+        elif winner == 'black':
+            pairing[1] += 1
+            self.records[white][1] += 1
+            self.records[black][0] += 1
+        else:
+            pairing[2] += 1
+            self.records[white][2] += 1
+            self.records[black][2] += 1
+
+        self.elo[white], self.elo[black] = elo_update(self.elo[white], self.elo[black],
+                                                      white_score)
+        white_glicko, black_glicko = self.glicko[white], self.glicko[black]
+        self.glicko[white] = glicko_update(white_glicko, black_glicko, white_score)
+        self.glicko[black] = glicko_update(black_glicko, white_glicko, 1 - white_score)
+
+        self.total_moves += num_moves
+        self.next_game = i + 1
+
+    def save_checkpoint(self, filename: str) -> None:
+        """Save the state of the tournament to filename as JSON. The file is replaced in one
+        step, so it is never left half written if the program is stopped."""
+        state = {'player_names': self.player_names,
+                 'games_per_pairing': self.games_per_pairing,
+                 'seed': self.seed,
+                 'next_game': self.next_game,
+                 'elo': self.elo,
+                 'glicko': self.glicko,
+                 'records': self.records,
+                 'pairings': [[white, black, results]
+                              for (white, black), results in self.pairings.items()],
+                 'total_moves': self.total_moves}
+        temp_filename = filename + '.tmp'
+        with open(temp_filename, 'w') as file:
+            json.dump(state, file)
+        os.replace(temp_filename, filename)
+
+    def load_checkpoint(self, filename: str) -> None:
+        """Resume the tournament from a checkpoint saved with save_checkpoint.
+
+        Raise ValueError if the checkpoint is from a tournament with different players, a
+        different number of games per pairing or a different seed.
+        """
+        with open(filename) as file:
+            state = json.load(file)
+        if state['player_names'] != self.player_names or \
+                state['games_per_pairing'] != self.games_per_pairing or \
+                state['seed'] != self.seed:
+            raise ValueError(f'{filename} is a checkpoint of a different tournament')
+
+        self.next_game = state['next_game']
+        self.elo = state['elo']
+        self.glicko = {name: tuple(rating) for name, rating in state['glicko'].items()}
+        self.records = state['records']
+        self.pairings = {(white, black): results for white, black, results in state['pairings']}
+        self.total_moves = state['total_moves']
+
+    def standings(self) -> str:
+        """Return a table of the player types, best first by Glicko rating (which settles
+        down faster than Elo), with their records and ratings, followed by the results of
+        every pairing."""
+        lines = [f'{"Player":<20} {"W":>6} {"L":>6} {"D":>6} {"Elo":>7} {"Glicko":>7} {"RD":>5}']
+        for name in sorted(self.player_names, key=lambda n: self.glicko[n][0], reverse=True):
+            wins, losses, draws = self.records[name]
+            rating, rd = self.glicko[name]
+            lines.append(f'{name:<20} {wins:>6} {losses:>6} {draws:>6} '
+                         f'{self.elo[name]:>7.1f} {rating:>7.1f} {rd:>5.1f}')
+
+        lines.append('')
+        lines.append(f'{"White":<20} {"Black":<20} {"White wins":>10} {"Black wins":>10} '
+                     f'{"Draws":>6}')
+        for white in self.player_names:
+            for black in self.player_names:
+                if white != black:
+                    white_wins, black_wins, draws = self.pairings[(white, black)]
+                    lines.append(f'{white:<20} {black:<20} {white_wins:>10} {black_wins:>10} '
+                                 f'{draws:>6}')
+        lines.append('')
+        lines.append(f'{self.next_game} of {len(self.schedule)} games played, '
+                     f'{self.total_moves} moves in total')
+        return '\n'.join(lines)
+
+
+# The players, game tree and seed of the tournament being played in this process, set by
+# _init_worker.
+_WORKER_STATE: Dict[str, object] = {}
+
+
+def _init_worker(players: Dict[str, PlayerFactory], game_tree: Optional[CheckersGameTree],
+                 seed: int) -> None:
+    """Get this process ready to play games of a tournament."""
+    _WORKER_STATE['players'] = players
+    _WORKER_STATE['game_tree'] = game_tree
+    _WORKER_STATE['seed'] = seed
+
+
+def _play_game(game: Tuple[int, str, str]) -> Tuple[int, str, int]:
+    """Play game (index, white player name, black player name) of the tournament with new
+    players, and return (index, winner, number of moves)."""
+    i, white_name, black_name = game
+    players = _WORKER_STATE['players']
+    game_tree = _WORKER_STATE['game_tree']
+    white = players[white_name](game_tree)
+    black = players[black_name](game_tree)
+    winner, moves = run_game(white, black, rng=game_rng(_WORKER_STATE['seed'], i))
+    return (i, winner, len(moves))
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,180 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains a transposition table: a fixed-size store of the results of
+searching checkers positions, so a search that reaches a position it has already searched (by
+playing the same turns in another order, or by kings moving away and back) can reuse the result
+instead of searching it again.
+
+The table is an array of buckets, found from the key of a position. Each bucket has two
+entries. The first keeps the result of the deepest search of a position in the bucket, since
+deep results save the most work, and the second always takes the newest result, so the table
+keeps up with the positions the search is looking at now. Results from earlier searches are
+replaced first, whatever their depth.
+
+Positions are found by their Zobrist key alone, so a position reached after a different number
+of moves finds the same entry. Each entry also says how many moves before the move limit its
+result needs, so it is only used when the result doesn't depend on where the limit is.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+from typing import List, Optional
+
+# The kinds of score stored in an entry: the exact score of the position, or a bound on it when
+# the search was cut off.
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+# The default size of a table, in megabytes.
+TABLE_MB = 16
+# Roughly how many bytes an entry takes up in memory, used to work out how many entries fit in
+# the memory given to a table. An entry is a tuple of a key, a depth, a bound, a score, a move,
+# a search number and two move counts; the move is shared with the search, so it isn't counted.
+ENTRY_BYTES = 220
+
+# The index of each field in an entry.
+KEY = 0
+DEPTH = 1
+BOUND = 2
+SCORE = 3
+MOVE = 4
+AGE = 5
+MOVES_LEFT = 6
+NEEDED = 7
+
+
+def holds_for(entry: tuple, moves_left: int) -> bool:
+    """Return whether the result in entry is the result of its position when there are
+    moves_left moves left before the game is a draw. A position is stored under its Zobrist key
+    alone, so the same position can be reached with a different number of moves left than it
+    was searched with. The result still holds if it was searched with the same number of moves
+    left, or if none of the lines it was worked out from reached the move limit and they all
+    fit in the moves left.
+
+    >>> entry = (5, 4, EXACT, 0, None, 0, 30, 12)
+    >>> holds_for(entry, 30), holds_for(entry, 12), holds_for(entry, 11)
+    (True, True, False)
+    >>> holds_for((5, 4, EXACT, 0, None, 0, 30, None), 31)
+    False
+    """
+    return entry[MOVES_LEFT] == moves_left or \
+        entry[NEEDED] is not None and entry[NEEDED] <= moves_left
+
+
+class TranspositionTable:
+    """A fixed-size table of search results, with two entries in each bucket: one that is
+    replaced by deeper (or newer) searches, and one that is always replaced.
+
+    Each entry is a tuple of the key of the position (its Zobrist key), the depth it was
+    searched to, the kind of score (EXACT, LOWER_BOUND or UPPER_BOUND), the score, the best move
+    found (or None), the number of the search that stored it, the number of moves that were left
+    before the move limit when it was searched, and the fewest moves left the result holds for,
+    or None if it only holds for that many moves left (see holds_for). Entries with the same key
+    are the same position.
+
+    Instance Attributes:
+        - size: The number of buckets.
+        - probes: The number of times the table has been looked in.
+        - hits: The number of times a position has been found in the table.
+        - stores: The number of results stored in the table.
+
+    Representation Invariants:
+        - self.size >= 1
+        - self.hits <= self.probes
+
+    >>> table = TranspositionTable(1)
+    >>> table.store(123, 4, EXACT, 50, (('a6', '', 'b5'),), 40, 9)
+    >>> table.probe(123)[SCORE]
+    50
+    >>> table.probe(124) is None
+    True
+    """
+    size: int
+    probes: int
+    hits: int
+    stores: int
+    # Private Instance Attributes:
+    #   - _deep: The entry of each bucket that is only replaced by a search at least as deep,
+    #     or one from an earlier search.
+    #   - _recent: The entry of each bucket that is always replaced.
+    #   - _age: The number of the current search (see new_search).
+    _deep: List[Optional[tuple]]
+    _recent: List[Optional[tuple]]
+    _age: int
+
+    def __init__(self, memory_mb: float = TABLE_MB) -> None:
+        """Make an empty table that takes up about memory_mb megabytes when it is full."""
+        self.size = max(1, int(memory_mb * 1024 * 1024) // (2 * ENTRY_BYTES))
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self._age = 0
+        self.probes = 0
+        self.hits = 0
+        self.stores = 0
+
+    def new_search(self) -> None:
+        """Start a new search, so the entries stored so far are replaced before newer ones."""
+        self._age += 1
+
+    def clear(self) -> None:
+        """Remove every entry from the table."""
+        self._deep = [None] * self.size
+        self._recent = [None] * self.size
+        self.probes = self.hits = self.stores = 0
+
+    def probe(self, key: int) -> Optional[tuple]:
+        """Return the entry of the position with the given key, or None if it isn't in the
+        table. The deeper of the two entries is checked first."""
+        self.probes += 1
+        index = key % self.size
+        entry = self._deep[index]
+        if entry is None or entry[KEY] != key:
+            entry = self._recent[index]
+            if entry is None or entry[KEY] != key:
+                return None
+        self.hits += 1
+        return entry
+
+    def store(self, key: int, depth: int, bound: int, score: int, move: Optional[tuple],
+              moves_left: int, needed: Optional[int]) -> None:
+        """Store the result of searching the position with the given key to depth, with
+        moves_left moves left before the move limit. needed is the fewest moves left the result
+        holds for, or None if it only holds for moves_left (see holds_for).
+
+        The result goes in the deep entry of its bucket if that entry is empty, is the same
+        position, is from an earlier search or was searched no deeper; the entry it replaces
+        moves to the other entry if it is a different position. Otherwise the result goes in
+        the other entry.
+        """
+        self.stores += 1
+        index = key % self.size
+        entry = (key, depth, bound, score, move, self._age, moves_left, needed)
+        deep = self._deep[index]
+        if deep is None or deep[KEY] == key or deep[AGE] != self._age or deep[DEPTH] <= depth:
+            self._deep[index] = entry
+            if deep is not None and deep[KEY] != key:
+                self._recent[index] = deep
+            elif self._recent[index] is not None and self._recent[index][KEY] == key:
+                # Don't keep an older result for the same position
+                self._recent[index] = None
+        else:
+            self._recent[index] = entry
+
+    def __len__(self) -> int:
+        """Return the number of entries in the table."""
+        return sum(entry is not None for entry in self._deep) + \
+            sum(entry is not None for entry in self._recent)
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,80 @@
+"""
+CSC111 Winter 2021 Final Project: Building A Checkers AI Player
+
+This Python module contains the random numbers used for Zobrist hashing of checkers positions.
+
+The Zobrist key of a position is the XOR of one random 64-bit number for every piece on the
+board (chosen by the piece's square, color and whether it is crowned), and one more number if
+it is white's move. Moving, capturing or crowning a piece only changes a couple of these
+numbers, so a board can keep its key up to date in O(1) time per move, and two boards with the
+same key are almost certainly the same position.
+
+Copyright and Usage Information:
+======================================
+
+This file is provided solely for the use of the CSC111 Teaching team and for the
+use of people who made this file, Mohamed Abdullahi, Benjamin Lee, Eren Findik and Sujoy
+Deb Nath. Any other forms of distribution of this code is strictly prohibited without express
+permission of the aforementioned group.
+
+This file is Copyright (c) 2021 Sujoy Deb Nath, Benjamin Lee, Mohamed Abdullahi and Eren Findik.
+"""
+from __future__ import annotations
+import random
+from typing import Dict, List
+from checkers_topology import get_topology
+
+# The index into ZobristKeys.pieces for each kind of piece.
+WHITE_MAN = 0
+WHITE_KING = 1
+BLACK_MAN = 2
+BLACK_KING = 3
+
+
+class ZobristKeys:
+    """The random numbers used to build the Zobrist keys of positions on one size of board.
+
+    The numbers are always made from the same seed, so the key of a position is the same every
+    time the program is run, and keys can be saved to files.
+
+    Instance Attributes:
+        - pieces: pieces[kind][square] is the number for a piece of the given kind (WHITE_MAN,
+          WHITE_KING, BLACK_MAN or BLACK_KING) on the given square number.
+        - white_to_move: The number that is included when it is white's move.
+    """
+    pieces: List[List[int]]
+    white_to_move: int
+
+    def __init__(self, dimension: int) -> None:
+        num_squares = len(get_topology(dimension).positions)
+        rng = random.Random(dimension)
+        self.pieces = [[rng.getrandbits(64) for _ in range(num_squares)] for _ in range(4)]
+        self.white_to_move = rng.getrandbits(64)
+
+
+def piece_kind(is_white: bool, is_crowned: bool) -> int:
+    """Return the kind of a piece with the given color and crown, as an index into
+    ZobristKeys.pieces.
+
+    >>> piece_kind(False, True) == BLACK_KING
+    True
+    """
+    return 2 * (not is_white) + is_crowned
+
+
+# The keys that have been made so far, by board size.
+_ZOBRIST_KEYS: Dict[int, ZobristKeys] = {}
+
+
+def get_zobrist_keys(dimension: int) -> ZobristKeys:
+    """Return the ZobristKeys for a board with the given number of rows and columns.
+    The keys for each board size are only made the first time they are asked for.
+    """
+    if dimension not in _ZOBRIST_KEYS:
+        _ZOBRIST_KEYS[dimension] = ZobristKeys(dimension)
+    return _ZOBRIST_KEYS[dimension]
+
+
+if __name__ == '__main__':
+    import doctest
+    doctest.testmod()